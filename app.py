@@ -1,150 +1,100 @@
 import time
 
 import asyncio
-import logfire
 from src.core.config import settings
+from src.core.telemetry import configure_telemetry
 
 # ---------------------------------------------------------------------------
-# Configure Logfire for comprehensive observability. This will print a link
-# to the local Logfire Live view and automatically display logs in the
-# console. You can set LOGFIRE_TOKEN or other env vars to forward traces to
-# the hosted Logfire backend if desired.
+# Configure Logfire for comprehensive observability, once for the whole
+# process. Set LOGFIRE_TOKEN to forward traces to the hosted Logfire backend,
+# or TELEMETRY_ENABLED=false to skip importing Logfire for a faster start.
 # ---------------------------------------------------------------------------
-
-# Configure logfire with token support
-logfire_config = {}
-if settings.logfire_token:
-    logfire_config["token"] = settings.logfire_token
-    logfire_config["send_to_logfire"] = True
-    logfire_config["project_name"] = settings.logfire_project_name
-    logfire_config["environment"] = settings.logfire_environment
-else:
-    logfire_config["send_to_logfire"] = False
-    logfire_config["console"] = False  # Disable console output to avoid conflicts
-
-logfire.configure(**logfire_config)
-
-# Capture Pydantic-AI and HTTPX calls which power the agent runtime.
-try:
-    logfire.instrument_pydantic_ai()
-except AttributeError:
-    # Older versions of Logfire may not have this helper; skip gracefully.
-    pass
-
-try:
-    logfire.instrument_httpx()
-except AttributeError:
-    pass
+configure_telemetry("health-agents-collective")
 
 from typing import Callable, Dict
-from src.agents.orchestration_agent import (
-    orchestration_agent,
-    OrchestrationAgentCard,
-)
-from src.agents.triage_agent import (
-    triage_agent,
-    TriageAgentCard,
-)
-from src.agents.fhir_agent.agent import fhir_agent
-from src.agents.fhir_agent.agent_card import FHIRAgentCard
+from src.agents.orchestration_agent.agent import a2a_client as orchestration_a2a_client
 from src.agents.common.tool_client import A2AToolClient
 from src.agents.common.agent import run_agent_in_background
-from src.agents.common.server import create_agent_a2a_server
+from src.agents.servers import (
+    create_fhir_agent_server,
+    create_orchestration_agent_server,
+    create_triage_agent_server,
+)
 from a2a.server.apps import A2AStarletteApplication
-from pydantic_ai import Agent
 
 a2a_client = A2AToolClient()
 
 
-def create_triage_agent_server(host="localhost", port=10020) -> A2AStarletteApplication:
-    """Create A2A server for Triage Agent using the unified wrapper."""
-    return create_agent_a2a_server(
-        agent=triage_agent,
-        name=TriageAgentCard.name,
-        description=TriageAgentCard.description,
-        skills=TriageAgentCard.skills,
-        host=host,
-        port=port,
-        status_message="Processing patient triage assessment...",
-        artifact_name="response",
-    )
-
-
-def create_orchestration_agent_server(
-    host="localhost", port=10024
-) -> A2AStarletteApplication:
-    """Create A2A server for Orchestration Agent using the unified wrapper."""
-    return create_agent_a2a_server(
-        agent=orchestration_agent,
-        name=OrchestrationAgentCard.name,
-        description=OrchestrationAgentCard.description,
-        skills=OrchestrationAgentCard.skills,
-        host=host,
-        port=port,
-        status_message="Coordinating agent communication...",
-        artifact_name="response",
-    )
-
-
-def create_fhir_agent_server(host="localhost", port=10028) -> A2AStarletteApplication:
-    """Create A2A server for FHIR Agent."""
-    return create_agent_a2a_server(
-        agent=fhir_agent,
-        name=FHIRAgentCard.name,
-        description=FHIRAgentCard.description,
-        skills=FHIRAgentCard.skills,
-        host=host,
-        port=port,
-        status_message="Processing FHIR requests...",
-        artifact_name="response",
-    )
-
 agents: list[Dict[str, Callable[[str, int], A2AStarletteApplication]]] = [
     {
         "name": "Triage Agent",
         "agent": create_triage_agent_server,
-        "port": 10020,
+        "port": settings.triage_agent_port,
     },
     {
         "name": "FHIR Agent",
         "agent": create_fhir_agent_server,
-        "port": 10028,
+        "port": settings.fhir_agent_port,
     },
     {
         "name": "Orchestration Agent",
         "agent": create_orchestration_agent_server,
-        "port": 10024,
+        "port": settings.orchestration_agent_port,
     },
 ]
 
-# Start agent servers with corrected function calls
+# Start all agent servers at once, then wait until each reports ready (MCP
+# sessions warm and accepting connections) instead of sleeping a fixed time.
 print("Starting agent servers...\n")
+startup_started = time.perf_counter()
 
-threads = []
-for agent_config in agents:
-    threads.append(
-        run_agent_in_background(agent_config["agent"], agent_config["port"], agent_config["name"])
+servers = [
+    run_agent_in_background(
+        agent_config["agent"], agent_config["port"], agent_config["name"]
     )
+    for agent_config in agents
+]
 
+deadline = startup_started + settings.agent_startup_timeout
+for server in servers:
+    server.wait_ready(max(0.0, deadline - time.perf_counter()))
+servers_ready = time.perf_counter()
 
-# Wait for servers to start
-time.sleep(3)
-
-# Check if threads are alive
-if all(thread.is_alive() for thread in threads):
+if all(server.is_ready for server in servers):
     print("\n✅ Agent servers are running!")
-    for agent_config in agents:
-        print(f"   - {agent_config['name']}: http://127.0.0.1:{agent_config['port']}")
+    for server in servers:
+        print(
+            f"   - {server.name}: http://127.0.0.1:{server.port}"
+            f" (ready in {server.startup_seconds * 1000:.0f} ms)"
+        )
 else:
     print("\n❌ Agent servers failed to start. Check the error messages above.")
+    for server in servers:
+        if not server.is_ready:
+            print(
+                f"   - {server.name} not ready after {settings.agent_startup_timeout:.0f}s"
+            )
 
 
 # Register all remote agents
 for agent in agents:
     a2a_client.add_remote_agent(f"http://localhost:{agent['port']}")
 
-# List all registered agents
-remote_agents = a2a_client.list_remote_agents()
+
+async def warm_agent_cards() -> dict:
+    """Fetch every agent card for this client and the orchestration agent's."""
+    remote_agents, _ = await asyncio.gather(
+        a2a_client.list_remote_agents(),
+        orchestration_a2a_client.list_remote_agents(),
+    )
+    # The cards stay cached; the connections belong to this short-lived loop.
+    await asyncio.gather(a2a_client.aclose(), orchestration_a2a_client.aclose())
+    return remote_agents
+
+
+# List all registered agents (cards are fetched concurrently)
+remote_agents = asyncio.run(warm_agent_cards())
+cards_ready = time.perf_counter()
 for k, v in remote_agents.items():
     print(f"Remote agent url: {k}")
     print(f"Remote agent name: {v['name']}")
@@ -152,6 +102,40 @@ for k, v in remote_agents.items():
     print(f"Remote agent version: {v['version']}")
     print("----\n")
 
+print("⏱️  Startup phases:")
+print(f"   servers ready:    {(servers_ready - startup_started) * 1000:.0f} ms")
+print(f"   agent cards warm: {(cards_ready - servers_ready) * 1000:.0f} ms")
+print(f"   total:            {(cards_ready - startup_started) * 1000:.0f} ms")
+
+
+async def print_task_stream(agent_url: str, message: str) -> None:
+    """Print status updates and response text as the agent streams them."""
+    received_text = False
+    async for event in a2a_client.stream_task(agent_url, message):
+        if event.kind == "task":
+            print(f"\n🎯 Task created: {event.task_id}")
+            print(f"   Status: {event.status}")
+        elif event.kind == "status":
+            print(
+                f"   Status: {event.status}"
+                + (f" - {event.text}" if event.text else "")
+            )
+        elif event.kind == "artifact" and event.text:
+            if not received_text:
+                print("   Response: ", end="")
+            print(event.text, end="", flush=True)
+            received_text = True
+        elif event.kind == "message" and event.text:
+            print(f"   Response: {event.text}")
+            received_text = True
+        elif event.kind == "error":
+            raise RuntimeError(event.text)
+
+    if received_text:
+        print()
+    else:
+        print("   No response received")
+
 
 def interactive_mode_sync():
     """Synchronous interactive REPL loop for continuous user interaction."""
@@ -159,65 +143,62 @@ def interactive_mode_sync():
     print("Available agents:")
     print("  ✅ Triage Agent (port 10020) - Patient assessment and symptom evaluation")
     print("  ✅ FHIR Agent (port 10028) - Patient data retrieval and clinical records")
-    print("  ✅ Orchestration Agent (port 10024) - Master coordinator for agent delegation")
+    print(
+        "  ✅ Orchestration Agent (port 10024) - Master coordinator for agent delegation"
+    )
     print("\nType your questions or requests below. Enter '/quit' to exit.\n")
-    
+
+    # A single loop for the whole session lets the A2A client keep its pooled
+    # connections alive between requests.
+    repl_loop = asyncio.new_event_loop()
+
     while True:
         try:
             # Get user input
             user_input = input("💬 What would you like to do today? ").strip()
-            
+
             # Check for quit command
-            if user_input.lower() == '/quit':
+            if user_input.lower() == "/quit":
                 print("\n👋 Goodbye!")
                 break
-            
+
             # Skip empty input
             if not user_input:
                 continue
-            
+
             # Check registered agents
             print("\n🔍 Checking registered agents...")
             try:
-                remote_agents = a2a_client.list_remote_agents()
+                remote_agents = repl_loop.run_until_complete(
+                    a2a_client.list_remote_agents()
+                )
                 print(f"   📋 {len(remote_agents)} agents available:")
                 for url, info in remote_agents.items():
                     print(f"      - {info['name']}")
             except Exception as e:
                 print(f"   ⚠️  Could not list agents: {e}")
-            
+
             # Send request to orchestration agent
             print("\n🔄 Sending to orchestration agent...")
             try:
-                # Run async create_task in event loop
-                task = asyncio.run(a2a_client.create_task(
-                    "http://localhost:10024", 
-                    user_input
-                ))
-                
-                print(f"\n🎯 Task created: {task.id}")
-                print(f"   Status: {task.status}")
-                
-                if task.artifacts and task.artifacts[0].parts:
-                    response_text = task.artifacts[0].parts[0].text
-                    if response_text:
-                        print(f"   Response: {response_text}")
-                    else:
-                        print("   No response text available")
-                else:
-                    print("   No response received")
-                    
+                # Stream the orchestration agent's progress on the session event loop
+                repl_loop.run_until_complete(
+                    print_task_stream("http://localhost:10024", user_input)
+                )
+
             except Exception as e:
                 print(f"\n❌ Task failed: {e}")
-                print("   The orchestration agent will delegate to appropriate specialized agents")
+                print(
+                    "   The orchestration agent will delegate to appropriate specialized agents"
+                )
                 print("   Try asking specific questions like:")
                 print("   - 'Find patient data for John Smith'")
                 print("   - 'Help me with patient triage'")
                 print("   - 'What agents are available?'")
                 print("   - 'I need to register a new patient'")
-            
+
             print()  # Empty line for readability
-            
+
         except KeyboardInterrupt:
             print("\n\n👋 Goodbye!")
             break
@@ -226,6 +207,10 @@ def interactive_mode_sync():
             print("   Make sure all agents are running on their ports")
             print()
 
+    repl_loop.run_until_complete(a2a_client.aclose())
+    repl_loop.close()
+
+
 async def interactive_mode():
     """Async wrapper for interactive mode."""
     # Run the sync version in a separate thread to avoid input conflicts
@@ -236,20 +221,20 @@ async def interactive_mode():
 async def main():
     """Main function that starts interactive mode."""
     print("🧪 Health Agents Collective - Starting up...")
-    
+
     # Test if agents are available
     try:
         print("🔍 Testing agent connectivity...")
-        
+
         # Check registered remote agents
-        remote_agents = a2a_client.list_remote_agents()
+        remote_agents = await a2a_client.list_remote_agents()
         print(f"✅ Found {len(remote_agents)} registered agents:")
         for url, info in remote_agents.items():
             print(f"   - {info['name']} at {url}")
-        
+
         # Start interactive mode
         await interactive_mode()
-        
+
     except Exception as e:
         print(f"❌ Agent connectivity test failed: {e}")
         print("Please ensure all agent servers are running:")
@@ -0,0 +1,90 @@
+"""
+Compare per-tool-call overhead of the stdio and in-process MCP transports.
+
+By default each round trip is a ``tools/list`` request, which exercises the MCP
+protocol end to end without touching the FHIR server, so the numbers isolate
+transport cost. Pass ``--tool`` and ``--args`` to time a real tool call instead.
+
+Usage:
+    python -m benchmarks.mcp_transport --server fhir --calls 200
+    python -m benchmarks.mcp_transport --server triage --tool get_patient --args '{"patient_id": "123"}'
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from src.mcp_handler import mcp_fhir, mcp_triage
+
+SERVER_FACTORIES = {
+    "fhir": mcp_fhir,
+    "triage": mcp_triage,
+}
+
+
+async def measure(server, calls: int, tool: str | None, args: dict) -> dict:
+    """Start a session, then time ``calls`` sequential round trips."""
+    started = time.perf_counter()
+    async with server:
+        startup = time.perf_counter() - started
+        # One untimed call so lazy imports and caches do not skew the first sample.
+        await server.list_tools()
+
+        samples = []
+        for _ in range(calls):
+            call_started = time.perf_counter()
+            if tool:
+                await server.direct_call_tool(tool, args)
+            else:
+                await server.list_tools()
+            samples.append(time.perf_counter() - call_started)
+
+    samples.sort()
+    return {
+        "startup_ms": startup * 1000,
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "p50_ms": samples[len(samples) // 2] * 1000,
+        "p95_ms": samples[int(len(samples) * 0.95) - 1] * 1000,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--server", choices=sorted(SERVER_FACTORIES), default="fhir")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--tool", help="Tool to call instead of tools/list")
+    parser.add_argument("--args", default="{}", help="JSON arguments for --tool")
+    options = parser.parse_args()
+
+    module = SERVER_FACTORIES[options.server]
+    results = {
+        "stdio": await measure(
+            module.create_stdio_server(),
+            options.calls,
+            options.tool,
+            json.loads(options.args),
+        ),
+        "inprocess": await measure(
+            module.create_inprocess_server(),
+            options.calls,
+            options.tool,
+            json.loads(options.args),
+        ),
+    }
+
+    operation = options.tool or "tools/list"
+    print(f"{options.server} MCP server, {options.calls} x {operation}")
+    print(f"{'transport':<10} {'startup':>10} {'mean':>10} {'p50':>10} {'p95':>10}")
+    for transport, stats in results.items():
+        print(
+            f"{transport:<10} {stats['startup_ms']:>8.1f}ms {stats['mean_ms']:>8.3f}ms "
+            f"{stats['p50_ms']:>8.3f}ms {stats['p95_ms']:>8.3f}ms"
+        )
+    speedup = results["stdio"]["mean_ms"] / results["inprocess"]["mean_ms"]
+    print(f"in-process calls are {speedup:.1f}x faster on average")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
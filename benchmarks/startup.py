@@ -0,0 +1,101 @@
+"""
+Measure startup cost (import time and resident memory) of each process.
+
+Every target is imported in a fresh interpreter, the way the process starts in
+production: ``app`` covers the imports and telemetry setup ``app.py`` does
+before it launches the agent servers, ``fhir-mcp`` and ``triage-mcp`` cover
+the MCP tool server processes. Each run is repeated with telemetry on and off
+(``TELEMETRY_ENABLED``) and the median import time and peak RSS are reported.
+
+Usage:
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --target fhir-mcp --json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+TARGETS = {
+    "app": (
+        "from src.core.telemetry import configure_telemetry\n"
+        "configure_telemetry('health-agents-collective')\n"
+        "import src.agents.orchestration_agent, src.agents.triage_agent\n"
+        "import src.agents.fhir_agent.agent, src.agents.fhir_agent.agent_card\n"
+        "import src.agents.common.server, src.agents.common.tool_client\n"
+    ),
+    "fhir-mcp": (
+        "import src.mcp_handler.fhir_mcp_main\n"
+        "from src.core.telemetry import configure_telemetry\n"
+        "configure_telemetry('fhir-mcp')\n"
+    ),
+    "triage-mcp": (
+        "import src.mcp_handler.triage_mcp_server\n"
+        "from src.core.telemetry import configure_telemetry\n"
+        "configure_telemetry('triage-mcp')\n"
+    ),
+}
+
+# Runs in the child: time the target's imports, then report peak RSS in KiB.
+_PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+exec(compile({code!r}, "<startup>", "exec"))
+elapsed = time.perf_counter() - started
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+# ru_maxrss is KiB on Linux and bytes on macOS.
+print(json.dumps({{"import_s": elapsed, "rss_kib": rss // 1024 if sys.platform == "darwin" else rss}}))
+"""
+
+
+def measure(target: str, telemetry: bool) -> dict:
+    env = {**os.environ, "TELEMETRY_ENABLED": "true" if telemetry else "false"}
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(code=TARGETS[target])],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--target", choices=sorted(TARGETS), action="append")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    options = parser.parse_args()
+
+    results = []
+    for target in options.target or list(TARGETS):
+        for telemetry in (True, False):
+            samples = [measure(target, telemetry) for _ in range(options.runs)]
+            results.append(
+                {
+                    "target": target,
+                    "telemetry": telemetry,
+                    "import_ms": statistics.median(s["import_s"] for s in samples)
+                    * 1000,
+                    "rss_mib": statistics.median(s["rss_kib"] for s in samples) / 1024,
+                }
+            )
+
+    if options.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"median of {options.runs} runs per row")
+    print(f"{'target':<12} {'telemetry':>9} {'import':>11} {'peak RSS':>10}")
+    for row in results:
+        print(
+            f"{row['target']:<12} {'on' if row['telemetry'] else 'off':>9} "
+            f"{row['import_ms']:>9.1f}ms {row['rss_mib']:>7.1f}MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
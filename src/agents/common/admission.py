@@ -0,0 +1,187 @@
+"""
+Admission control for the A2A agent servers.
+
+Every ``message/send`` or ``message/stream`` request starts an LLM run and MCP
+tool calls. Without a limit a burst slows every in-flight request down until
+they all time out. ``AdmissionController`` lets at most ``max_concurrent``
+requests run per agent and queues up to ``max_queue`` more. Beyond that, or
+once a request has waited ``queue_timeout`` seconds, the request is rejected
+with a retryable JSON-RPC error (``AGENT_BUSY_ERROR_CODE``) that carries a
+``retry_after`` hint, also sent as a ``Retry-After`` header.
+
+Other JSON-RPC methods (``tasks/get``, ``tasks/cancel``, ...) and the agent
+card are never queued.
+"""
+
+import asyncio
+import contextlib
+import json
+import math
+import time
+from typing import Any, AsyncIterator, Optional
+
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# JSON-RPC server-error range; the A2A spec uses -32001..-32007.
+AGENT_BUSY_ERROR_CODE = -32029
+
+ADMITTED_METHODS = frozenset({"message/send", "message/stream"})
+
+
+class AgentBusyError(Exception):
+    """The agent is at its concurrency and queue limits."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Agent busy, retry after {retry_after:g}s")
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Concurrency limit with a bounded wait queue and queueing metrics."""
+
+    def __init__(
+        self, max_concurrent: int = 4, max_queue: int = 16, queue_timeout: float = 30.0
+    ):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        self.active = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        # Moving average of how long an admitted request runs, for Retry-After.
+        self._avg_service_time = 1.0
+
+    def retry_after(self) -> float:
+        """Estimated seconds until a slot frees up for a new request."""
+        backlog = (self.queued + 1) / self.max_concurrent
+        return float(max(1, math.ceil(backlog * self._avg_service_time)))
+
+    @contextlib.asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """Hold a slot for the duration of a request, or raise ``AgentBusyError``."""
+        if self._semaphore.locked() and self.queued >= self.max_queue:
+            self.rejected += 1
+            raise AgentBusyError(self.retry_after())
+
+        self.queued += 1
+        enqueued_at = time.monotonic()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise AgentBusyError(self.retry_after()) from None
+        finally:
+            self.queued -= 1
+
+        waited = time.monotonic() - enqueued_at
+        self.admitted += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        self.active += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+            self._avg_service_time = 0.8 * self._avg_service_time + 0.2 * (
+                time.monotonic() - started
+            )
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queue_depth": self.queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.total_wait / self.admitted * 1000, 1)
+            if self.admitted
+            else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 1),
+            "avg_service_ms": round(self._avg_service_time * 1000, 1),
+        }
+
+
+def busy_error(request_id: Any, retry_after: float) -> dict[str, Any]:
+    """JSON-RPC error response for a rejected request."""
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "error": {
+            "code": AGENT_BUSY_ERROR_CODE,
+            "message": "Agent is busy; retry later",
+            "data": {"retry_after": retry_after},
+        },
+    }
+
+
+class AdmissionControlMiddleware:
+    """Gate ``message/send`` and ``message/stream`` through an ``AdmissionController``.
+
+    A rejected ``message/stream`` gets a one-event SSE stream holding the
+    error, so streaming clients see a JSON-RPC error rather than a broken
+    stream.
+    """
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        # Buffer the (small) JSON-RPC body to read its method, then replay it.
+        chunks = []
+        message: Optional[Message] = None
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+        replayed = False
+
+        async def replay() -> Message:
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                if message is not None and message["type"] != "http.request":
+                    return message
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            payload = None
+        method = payload.get("method") if isinstance(payload, dict) else None
+        if method not in ADMITTED_METHODS:
+            await self.app(scope, replay, send)
+            return
+
+        try:
+            async with self.controller.admit():
+                await self.app(scope, replay, send)
+        except AgentBusyError as busy:
+            headers = {"Retry-After": str(math.ceil(busy.retry_after))}
+            error = busy_error(payload.get("id"), busy.retry_after)
+            if method == "message/stream":
+                response: Response = Response(
+                    f"data: {json.dumps(error)}\n\n",
+                    media_type="text/event-stream",
+                    headers=headers,
+                )
+            else:
+                response = JSONResponse(error, headers=headers)
+            await response(scope, replay, send)
@@ -1,13 +1,22 @@
+import asyncio
+import contextlib
+from typing import Optional
+
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events import EventQueue
 from a2a.server.tasks import TaskUpdater
 from a2a.types import Part, TaskState, TextPart
 from a2a.utils import new_agent_text_message, new_task
 from pydantic_ai import Agent
-from google.adk.artifacts import InMemoryArtifactService
-from google.adk.memory.in_memory_memory_service import InMemoryMemoryService
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
+from src.agents.common.mcp_pool import MCPSessionPool
+from src.agents.common.response_cache import (
+    BYPASS_METADATA_KEY,
+    WROTE_DATA_METADATA_KEY,
+    ResponseCache,
+    RunScope,
+    run_scope,
+)
+from src.agents.common.tool_client import A2AToolClient, track_remote_tasks
 from src.core.config import settings
 
 
@@ -17,45 +26,135 @@ class PydanticAgentExecutor(AgentExecutor):
         agent: Agent,
         status_message="Processing request...",
         artifact_name="response",
+        mcp_pool: Optional[MCPSessionPool] = None,
+        response_cache: Optional[ResponseCache] = None,
     ):
-        """Initialize a generic ADK agent executor.
+        """Initialize a generic pydantic-ai agent executor.
 
         Args:
-            agent: The ADK agent instance
+            agent: The pydantic-ai agent instance
             status_message: Message to display while processing
             artifact_name: Name for the response artifact
+            mcp_pool: Long-lived MCP sessions to run against; without one the
+                agent's MCP servers are started and stopped per request
+            response_cache: Cache of completed responses to repeated queries;
+                a run that writes data is not cached
         """
         self.agent = agent
         self.status_message = status_message
         self.artifact_name = artifact_name
-        self.runner = Runner(
-            app_name=agent.name,
-            agent=agent,
-            artifact_service=InMemoryArtifactService(),
-            session_service=InMemorySessionService(),
-            memory_service=InMemoryMemoryService(),
-        )
+        self.mcp_pool = mcp_pool
+        self.response_cache = response_cache
         self._debug_enabled = settings.log_level.lower() in {"debug", "trace"}
+        # Agent runs in flight and the remote tasks each has delegated, by task ID.
+        self._runs: dict[str, asyncio.Task] = {}
+        self._remote_tasks: dict[str, set[tuple[str, str]]] = {}
+        self._cancel_client = A2AToolClient()
+
+    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
+        """Stop a running task, cancel its remote sub-tasks and mark it canceled.
+
+        The agent run is cancelled cooperatively: the in-flight LLM request
+        and MCP tool calls see ``CancelledError`` at their next await.
+        """
+        task_id = context.task_id
+        remote_tasks = list(self._remote_tasks.get(task_id, ()))
+        run = self._runs.get(task_id)
+        if run is not None:
+            run.cancel()
+        if self._debug_enabled:
+            print(
+                f"[{self.agent.name}] cancel {task_id}: run={'yes' if run else 'no'}, "
+                f"remote sub-tasks={len(remote_tasks)}"
+            )
+
+        if remote_tasks:
+            results = await asyncio.gather(
+                *(
+                    asyncio.wait_for(
+                        self._cancel_client.cancel_task(url, remote_id), 10.0
+                    )
+                    for url, remote_id in remote_tasks
+                ),
+                return_exceptions=True,
+            )
+            for (url, remote_id), result in zip(remote_tasks, results):
+                if isinstance(result, Exception) and self._debug_enabled:
+                    print(
+                        f"[{self.agent.name}] could not cancel {remote_id} at {url}: {result!s}"
+                    )
 
-    async def cancel(self, task_id: str) -> None:
-        """Cancel the execution of a specific task."""
-        # Implementation for cancelling tasks
+        updater = TaskUpdater(event_queue, task_id, context.context_id)
+        await updater.cancel()
+
+    async def _run_agent(self, task_id: str, query: str, scope: RunScope):
+        """One agent run, recording the remote tasks it delegates to."""
+        with track_remote_tasks() as remote_tasks, run_scope(scope):
+            self._remote_tasks[task_id] = remote_tasks
+            try:
+                async with self._mcp_sessions():
+                    return await self.agent.run(query)
+            finally:
+                self._remote_tasks.pop(task_id, None)
+
+    def _mcp_sessions(self) -> contextlib.AbstractAsyncContextManager:
+        """Context in which the agent's MCP servers are available."""
+        if self.mcp_pool is not None:
+            return self.mcp_pool.lease()
+        return self.agent.run_mcp_servers()
+
+    @staticmethod
+    def _bypass_requested(context: RequestContext) -> bool:
+        """Whether the request's (or its message's) metadata asks to skip the cache."""
+        message_metadata = context.message.metadata if context.message else None
+        return any(
+            bool((metadata or {}).get(BYPASS_METADATA_KEY))
+            for metadata in (context.metadata, message_metadata)
+        )
+
+    @staticmethod
+    def _run_metadata(scope: RunScope) -> Optional[dict]:
+        """Final status metadata telling the caller whether the run wrote data."""
+        return {WROTE_DATA_METADATA_KEY: True} if scope.wrote_data else None
 
     async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
         query = context.get_user_input()
         task = context.current_task or new_task(context.message)
         await event_queue.enqueue_event(task)
         updater = TaskUpdater(event_queue, task.id, task.context_id)
+        scope = RunScope(bypass=self._bypass_requested(context))
+        cache_key = None
         try:
+            if self.response_cache is not None:
+                if scope.bypass:
+                    self.response_cache.record_bypass()
+                else:
+                    cache_key = self.response_cache.make_key(self.agent.name, query)
+                    cached_text = self.response_cache.get(cache_key)
+                    if cached_text is not None:
+                        if self._debug_enabled:
+                            print(
+                                f"[{self.agent.name}] served from response cache: {query}"
+                            )
+                        await updater.add_artifact(
+                            [Part(root=TextPart(text=cached_text))],
+                            name=self.artifact_name,
+                        )
+                        await updater.complete()
+                        return
             await updater.update_status(
                 TaskState.working,
                 new_agent_text_message(self.status_message, task.context_id, task.id),
             )
-            # Directly invoke the pydantic agent
-            async with self.agent.run_mcp_servers():
-                if self._debug_enabled:
-                    print(f"[{self.agent.name}] received query: {query}")
-                result = await self.agent.run(query)
+            if self._debug_enabled:
+                print(f"[{self.agent.name}] received query: {query}")
+            # Directly invoke the pydantic agent, as a task so it can be cancelled
+            run = asyncio.ensure_future(self._run_agent(task.id, query, scope))
+            self._runs[task.id] = run
+            try:
+                result = await run
+            finally:
+                self._runs.pop(task.id, None)
             # Extract string output from result if needed
             response_text = result.output if hasattr(result, "output") else result
             if self._debug_enabled:
@@ -63,7 +162,11 @@ class PydanticAgentExecutor(AgentExecutor):
             await updater.add_artifact(
                 [Part(root=TextPart(text=response_text))], name=self.artifact_name
             )
-            await updater.complete()
+            await updater.update_status(
+                TaskState.completed, final=True, metadata=self._run_metadata(scope)
+            )
+            if cache_key is not None and not scope.wrote_data:
+                self.response_cache.put(cache_key, response_text)
         except Exception as e:
             if self._debug_enabled:
                 print(f"[{self.agent.name}] error: {e!s}")
@@ -71,4 +174,5 @@ class PydanticAgentExecutor(AgentExecutor):
                 TaskState.failed,
                 new_agent_text_message(f"Error: {e!s}", task.context_id, task.id),
                 final=True,
+                metadata=self._run_metadata(scope),
             )
@@ -0,0 +1,192 @@
+"""
+Long-lived MCP sessions shared by every request an agent server handles.
+
+Entering a pydantic-ai ``MCPServerStdio`` spawns its tool server as a child
+process. Doing that per A2A request means a fresh interpreter (and its imports
+and telemetry setup) before the first tool call, so this pool enters each
+server once at startup, from a dedicated owner task, and keeps it running.
+pydantic-ai reference-counts entered servers, so the ``agent.run(...)`` calls
+made while the pool holds a session reuse it instead of spawning a new process.
+"""
+
+import asyncio
+import contextlib
+from typing import AsyncIterator, Sequence
+
+from pydantic_ai.mcp import MCPServer
+
+
+class _SessionOwner:
+    """Task that enters one MCP server, holds it open and exits it again.
+
+    anyio requires a session's cancel scopes to be exited by the task that
+    entered them, so the session is opened and closed by this dedicated task
+    rather than by whichever task (lifespan, health check) starts or restarts
+    it.
+    """
+
+    def __init__(self, server: MCPServer):
+        self.server = server
+        self._stopping = asyncio.Event()
+        self._entered: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return (
+            self._task is not None and not self._task.done() and self.server.is_running
+        )
+
+    async def start(self) -> None:
+        """Start the owner task and wait until the session is open."""
+        self._task = asyncio.create_task(
+            self._own(), name=f"mcp-session {self.server!r}"
+        )
+        try:
+            await asyncio.shield(self._entered)
+        except BaseException:
+            await self.stop()
+            raise
+
+    async def stop(self) -> None:
+        """Ask the owner task to close the session and wait for it to finish."""
+        self._stopping.set()
+        if self._task is not None:
+            with contextlib.suppress(Exception):
+                await self._task
+
+    async def _own(self) -> None:
+        try:
+            await self.server.__aenter__()
+        except asyncio.CancelledError:
+            self._entered.cancel()
+            raise
+        except Exception as e:
+            self._entered.set_exception(e)
+            return
+        self._entered.set_result(None)
+        try:
+            await self._stopping.wait()
+        finally:
+            with contextlib.suppress(Exception):
+                await self.server.__aexit__(None, None, None)
+
+
+class MCPSessionPool:
+    """Keep an agent's MCP servers running, health-checked and restartable.
+
+    MCP is JSON-RPC, so concurrent tool calls from several agent runs are
+    multiplexed over one session per server. ``max_concurrent_runs`` bounds
+    how many agent runs may use the sessions at once; further requests wait
+    for a free lease.
+    """
+
+    def __init__(
+        self,
+        servers: Sequence[MCPServer],
+        max_concurrent_runs: int = 4,
+        health_check_interval: float = 30.0,
+        health_check_timeout: float = 10.0,
+    ):
+        self.servers = list(servers)
+        self.max_concurrent_runs = max(1, max_concurrent_runs)
+        self.health_check_interval = health_check_interval
+        self.health_check_timeout = health_check_timeout
+        self.restarts = 0
+        self._semaphore = asyncio.Semaphore(self.max_concurrent_runs)
+        self._restart_lock = asyncio.Lock()
+        self._owners: dict[int, _SessionOwner] = {}
+        self._health_task: asyncio.Task | None = None
+        self._started = False
+
+    @property
+    def is_running(self) -> bool:
+        return self._started and all(
+            owner.is_running for owner in self._owners.values()
+        )
+
+    async def start(self) -> None:
+        """Start every MCP server session and the background health check."""
+        async with self._restart_lock:
+            if self._started:
+                return
+            try:
+                for server in self.servers:
+                    owner = _SessionOwner(server)
+                    await owner.start()
+                    self._owners[id(server)] = owner
+            except BaseException:
+                await self._stop_owners()
+                raise
+            self._started = True
+        if self.health_check_interval > 0:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def stop(self) -> None:
+        """Stop the health check and close every MCP server session."""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._health_task
+            self._health_task = None
+        if self._started:
+            self._started = False
+            await self._stop_owners()
+
+    async def _stop_owners(self) -> None:
+        owners = list(self._owners.values())
+        self._owners.clear()
+        for owner in owners:
+            await owner.stop()
+
+    @contextlib.asynccontextmanager
+    async def lease(self) -> AsyncIterator[None]:
+        """Hold a slot on the shared sessions for the duration of an agent run."""
+        if not self._started:
+            await self.start()
+        # Wait out a restart in progress so runs never see a half-open session.
+        async with self._restart_lock:
+            pass
+        async with self._semaphore:
+            yield
+
+    async def check(self) -> bool:
+        """Ping every session and restart those that do not answer."""
+        healthy = True
+        for server in self.servers:
+            try:
+                owner = self._owners.get(id(server))
+                if owner is None or not owner.is_running:
+                    raise RuntimeError("session is not running")
+                await asyncio.wait_for(server.list_tools(), self.health_check_timeout)
+            except Exception as e:
+                healthy = False
+                print(f"[MCP Pool] session {server!r} failed health check: {e!s}")
+                await self._restart(server)
+        return healthy
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            try:
+                await self.check()
+            except Exception as e:
+                # Keep checking; the next round retries the restart.
+                print(f"[MCP Pool] restart failed: {e!s}")
+
+    async def _restart(self, server: MCPServer) -> None:
+        """Replace a crashed session once all in-flight leases have drained."""
+        async with self._restart_lock:
+            for _ in range(self.max_concurrent_runs):
+                await self._semaphore.acquire()
+            try:
+                old_owner = self._owners.pop(id(server), None)
+                if old_owner is not None:
+                    await old_owner.stop()
+                owner = _SessionOwner(server)
+                await owner.start()
+                self._owners[id(server)] = owner
+                self.restarts += 1
+            finally:
+                for _ in range(self.max_concurrent_runs):
+                    self._semaphore.release()
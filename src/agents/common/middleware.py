@@ -0,0 +1,45 @@
+from a2a.utils.constants import AGENT_CARD_WELL_KNOWN_PATH
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class AgentCardCacheMiddleware:
+    """Add ``ETag``/``Cache-Control`` to the agent card and answer revalidations.
+
+    Agent cards are static for the life of a server, so the ETag is computed
+    once up front. Requests carrying a matching ``If-None-Match`` get an empty
+    ``304 Not Modified`` without touching the A2A application.
+    """
+
+    def __init__(self, app: ASGIApp, etag: str, max_age: int):
+        self.app = app
+        self.etag = etag
+        self.max_age = max_age
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or scope["path"] != AGENT_CARD_WELL_KNOWN_PATH
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        cache_headers = {
+            "ETag": self.etag,
+            "Cache-Control": f"public, max-age={self.max_age}",
+        }
+
+        if_none_match = Headers(scope=scope).get("if-none-match", "")
+        if self.etag in (tag.strip() for tag in if_none_match.split(",")):
+            response = Response(status_code=304, headers=cache_headers)
+            await response(scope, receive, send)
+            return
+
+        async def send_with_cache_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).update(cache_headers)
+            await send(message)
+
+        await self.app(scope, receive, send_with_cache_headers)
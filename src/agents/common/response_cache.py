@@ -0,0 +1,181 @@
+"""
+Response cache for repeated agent queries.
+
+The same lookups ("find patients with diabetes", "get patient 123's
+medications") otherwise run the full chain of orchestrator, FHIR agent and LLM
+every time. ``ResponseCache`` keeps completed response artifacts in a bounded
+LRU with a TTL, keyed on the agent name, the normalized query and a
+data-version token, so ``PydanticAgentExecutor`` can answer a repeat without
+running the agent.
+
+Whether a run changed data is decided by what it did, not by the skills an
+agent advertises. The MCP servers mark their write tools with
+``record_writes``, and a call to one of them goes through ``note_write``.
+An agent whose run wrote reports ``WROTE_DATA_METADATA_KEY`` in its final
+task status, so a run that delegated to it is treated as a write as well. A
+run that wrote is not cached and bumps the data version, so earlier answers
+are no longer served; read-only runs and delegations leave the cache alone.
+The version only covers writes seen by this process; with the multi-process
+launcher the TTL bounds staleness, and ``RESPONSE_CACHE_DATA_VERSION`` can be
+changed to drop every entry after the FHIR data is reloaded.
+
+A request whose message metadata sets ``BYPASS_METADATA_KEY`` skips the cache,
+and so do the requests it delegates to other agents.
+"""
+
+import contextlib
+import contextvars
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Collection, Iterator, Optional
+
+from pydantic_ai.mcp import ProcessToolCallback
+
+from src.core.config import settings
+
+# Message metadata flag that skips the cache for a request and its delegations.
+BYPASS_METADATA_KEY = "no_cache"
+
+# Task metadata flag with which an agent reports that its run changed data.
+WROTE_DATA_METADATA_KEY = "wrote_data"
+
+CacheKey = tuple[str, str, str]
+
+# Bumped whenever a write is observed in this process.
+_generation = 0
+_generation_lock = threading.Lock()
+
+
+def data_version() -> str:
+    """Token identifying the current state of the data behind cached answers."""
+    return f"{settings.response_cache_data_version}:{_generation}"
+
+
+def bump_data_version() -> None:
+    """Invalidate every cached response after a write."""
+    global _generation
+    with _generation_lock:
+        _generation += 1
+
+
+@dataclass
+class RunScope:
+    """Cache-relevant facts about the agent run in the current context."""
+
+    bypass: bool = False
+    wrote_data: bool = False
+
+
+_run_scope: contextvars.ContextVar[Optional[RunScope]] = contextvars.ContextVar(
+    "response_cache_run_scope", default=None
+)
+
+
+@contextlib.contextmanager
+def run_scope(scope: RunScope) -> Iterator[RunScope]:
+    """Make ``scope`` the current run's, so delegations can update it."""
+    token = _run_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _run_scope.reset(token)
+
+
+def bypass_active() -> bool:
+    """Whether the current run asked to skip the cache."""
+    scope = _run_scope.get()
+    return scope is not None and scope.bypass
+
+
+def note_write() -> None:
+    """Record that the current run changed data (or may have); see ``record_writes``."""
+    scope = _run_scope.get()
+    if scope is not None:
+        scope.wrote_data = True
+    bump_data_version()
+
+
+def record_writes(write_tools: Collection[str]) -> ProcessToolCallback:
+    """``process_tool_call`` hook noting calls to an MCP server's write tools.
+
+    The write is noted before the call, as a call that fails may still have
+    reached the FHIR server.
+    """
+
+    async def process_tool_call(ctx, call_tool, name, tool_args):
+        if name in write_tools:
+            note_write()
+        return await call_tool(name, tool_args, None)
+
+    return process_tool_call
+
+
+def normalize_query(query: str) -> str:
+    """Lower-case, drop trailing punctuation and collapse whitespace."""
+    text = re.sub(r"\s+", " ", query.lower()).strip()
+    return text.rstrip(" .?!")
+
+
+class ResponseCache:
+    """Bounded, thread-safe LRU of completed response texts with a TTL."""
+
+    def __init__(self, max_entries: int = 256, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[CacheKey, tuple[str, float]]" = OrderedDict()
+        # Agents run on their own threads (and loops) when started from app.py.
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(agent_name: str, query: str) -> CacheKey:
+        return (agent_name, normalize_query(query), data_version())
+
+    def get(self, key: CacheKey) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[1] >= self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: CacheKey, response_text: str) -> None:
+        with self._lock:
+            self._entries[key] = (response_text, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def record_bypass(self) -> None:
+        with self._lock:
+            self.bypassed += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "data_version": data_version(),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "bypassed": self.bypassed,
+                "evictions": self.evictions,
+            }
@@ -1,5 +1,9 @@
 import asyncio
+import contextlib
+import hashlib
 import threading
+import time
+from typing import Callable, Optional, Sequence
 
 import uvicorn
 
@@ -7,14 +11,130 @@ from src.core.config import settings
 
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
+from a2a.server.tasks import TaskStore
 from a2a.types import AgentCapabilities, AgentCard
 from pydantic_ai import Agent
+from pydantic_ai.mcp import MCPServer
+from src.agents.common.admission import AdmissionController, AdmissionControlMiddleware
 from src.agents.common.agent_executor import PydanticAgentExecutor
+from src.agents.common.mcp_pool import MCPSessionPool
+from src.agents.common.middleware import AgentCardCacheMiddleware
+from src.agents.common.response_cache import ResponseCache
+from src.agents.common.task_store import create_task_store
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
 
 servers = []
 
 
+class AgentA2AApplication(A2AStarletteApplication):
+    """A2A Starlette application with the collective's shared HTTP behaviour."""
+
+    def __init__(
+        self,
+        *args,
+        mcp_pool: Optional[MCPSessionPool] = None,
+        task_store: Optional[TaskStore] = None,
+        admission: Optional[AdmissionController] = None,
+        response_cache: Optional[ResponseCache] = None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.mcp_pool = mcp_pool
+        self.task_store = task_store
+        self.admission = admission
+        self.response_cache = response_cache
+        # Set once long-lived resources are started and warm; served by /readyz.
+        self.ready = threading.Event()
+        self.startup_timings: dict[str, float] = {}
+
+    @contextlib.asynccontextmanager
+    async def lifespan(self, _app: Starlette):
+        """Start long-lived resources with the server and release them on shutdown."""
+        # Stores backed by a database (e.g. Postgres) connect up front.
+        start_store = getattr(self.task_store, "start", None)
+        if start_store is not None:
+            started = time.perf_counter()
+            await start_store()
+            self.startup_timings["task_store_ms"] = (
+                time.perf_counter() - started
+            ) * 1000
+        if self.mcp_pool is not None:
+            # Start the sessions and list tools once so the first request is warm.
+            started = time.perf_counter()
+            await self.mcp_pool.start()
+            await self.mcp_pool.check()
+            self.startup_timings["mcp_ms"] = (time.perf_counter() - started) * 1000
+            print(
+                f"   {self.agent_card.name}: MCP sessions warm in "
+                f"{self.startup_timings['mcp_ms']:.0f} ms"
+            )
+        self.ready.set()
+        try:
+            yield
+        finally:
+            self.ready.clear()
+            if self.mcp_pool is not None:
+                await self.mcp_pool.stop()
+            close_store = getattr(self.task_store, "aclose", None)
+            if close_store is not None:
+                await close_store()
+
+    def build(self, **kwargs) -> Starlette:
+        """Build the Starlette app, adding agent card cache validators."""
+        card_json = self.agent_card.model_dump_json(exclude_none=True, by_alias=True)
+        etag = f'"{hashlib.sha256(card_json.encode()).hexdigest()[:32]}"'
+        middleware = [
+            Middleware(
+                AgentCardCacheMiddleware,
+                etag=etag,
+                max_age=settings.agent_card_cache_ttl,
+            ),
+            *kwargs.pop("middleware", []),
+        ]
+        if self.admission is not None:
+            middleware.append(
+                Middleware(AdmissionControlMiddleware, controller=self.admission)
+            )
+        kwargs.setdefault("lifespan", self.lifespan)
+        app = super().build(middleware=middleware, **kwargs)
+        app.add_route("/healthz", self._healthz, methods=["GET"])
+        app.add_route("/readyz", self._readyz, methods=["GET"])
+        return app
+
+    async def _healthz(self, _request: Request) -> JSONResponse:
+        """Liveness: the server process is up and serving HTTP."""
+        return JSONResponse({"status": "ok"})
+
+    async def _readyz(self, _request: Request) -> JSONResponse:
+        """Readiness: startup finished and the MCP sessions are running."""
+        mcp_running = self.mcp_pool.is_running if self.mcp_pool is not None else None
+        ready = self.ready.is_set() and mcp_running is not False
+        return JSONResponse(
+            {
+                "status": "ready" if ready else "starting",
+                "mcp_sessions_running": mcp_running,
+                "startup_timings_ms": self.startup_timings,
+                "admission": self.admission.stats()
+                if self.admission is not None
+                else None,
+                "task_store": (
+                    self.task_store.stats()
+                    if hasattr(self.task_store, "stats")
+                    else None
+                ),
+                "response_cache": (
+                    self.response_cache.stats()
+                    if self.response_cache is not None
+                    else None
+                ),
+            },
+            status_code=200 if ready else 503,
+        )
+
+
 def create_agent_a2a_server(
     agent: Agent,
     name,
@@ -24,11 +144,14 @@ def create_agent_a2a_server(
     port=10020,
     status_message="Processing request...",
     artifact_name="response",
+    mcp_servers: Sequence[MCPServer] = (),
+    max_concurrent_requests: Optional[int] = None,
+    response_cache: bool = False,
 ):
-    """Create an A2A server for any ADK agent.
+    """Create an A2A server for any pydantic-ai agent.
 
     Args:
-        agent: The ADK agent instance
+        agent: The pydantic-ai agent instance
         name: Display name for the agent
         description: Agent description
         skills: List of AgentSkill objects
@@ -36,6 +159,12 @@ def create_agent_a2a_server(
         port: Server port
         status_message: Message shown while processing
         artifact_name: Name for response artifacts
+        mcp_servers: The agent's MCP servers, kept running for the life of the
+            server when ``settings.mcp_persistent_sessions`` is enabled
+        max_concurrent_requests: Agent runs allowed at once; defaults to
+            ``settings.agent_max_concurrent_requests`` (0 disables the limit)
+        response_cache: Serve repeated queries from a response cache when
+            ``settings.response_cache_enabled``; runs that write are not cached
 
     Returns:
         A2AStarletteApplication instance
@@ -55,22 +184,85 @@ def create_agent_a2a_server(
         skills=skills,
     )
 
+    # Long-lived MCP sessions shared by all requests to this agent
+    mcp_pool = None
+    if mcp_servers and settings.mcp_persistent_sessions:
+        mcp_pool = MCPSessionPool(
+            mcp_servers,
+            max_concurrent_runs=settings.mcp_max_concurrent_runs,
+            health_check_interval=settings.mcp_health_check_interval,
+        )
+
+    cache = None
+    if response_cache and settings.response_cache_enabled:
+        cache = ResponseCache(
+            max_entries=settings.response_cache_max_entries,
+            ttl=settings.response_cache_ttl,
+        )
+
     # Create executor with custom parameters
     executor = PydanticAgentExecutor(
-        agent=agent, status_message=status_message, artifact_name=artifact_name
+        agent=agent,
+        status_message=status_message,
+        artifact_name=artifact_name,
+        mcp_pool=mcp_pool,
+        response_cache=cache,
     )
 
+    task_store = create_task_store()
+
+    # Bounded concurrency with a wait queue; overflow is rejected as retryable
+    if max_concurrent_requests is None:
+        max_concurrent_requests = settings.agent_max_concurrent_requests
+    admission = None
+    if max_concurrent_requests > 0:
+        admission = AdmissionController(
+            max_concurrent=max_concurrent_requests,
+            max_queue=settings.agent_max_queued_requests,
+            queue_timeout=settings.agent_queue_timeout,
+        )
     request_handler = DefaultRequestHandler(
         agent_executor=executor,
-        task_store=InMemoryTaskStore(),
+        task_store=task_store,
     )
 
     # Create A2A application
-    return A2AStarletteApplication(agent_card=agent_card, http_handler=request_handler)
+    return AgentA2AApplication(
+        agent_card=agent_card,
+        http_handler=request_handler,
+        mcp_pool=mcp_pool,
+        task_store=task_store,
+        admission=admission,
+        response_cache=cache,
+    )
 
 
-async def run_uvicorn_server(create_agent_function, port):
-    """Run server with proper error handling."""
+class ReadinessServer(uvicorn.Server):
+    """uvicorn server that calls ``on_ready`` once it is accepting connections."""
+
+    def __init__(
+        self, config: uvicorn.Config, on_ready: Optional[Callable[[], None]] = None
+    ):
+        super().__init__(config)
+        self.on_ready = on_ready
+
+    async def startup(self, sockets=None) -> None:
+        # The lifespan (and so the MCP warm-up) completes before sockets bind.
+        await super().startup(sockets=sockets)
+        if self.started and self.on_ready is not None:
+            self.on_ready()
+
+
+async def run_uvicorn_server(
+    create_agent_function, port, on_ready: Optional[Callable[[], None]] = None
+):
+    """Run server with proper error handling.
+
+    Args:
+        create_agent_function: Factory returning the agent's A2A application
+        port: Port to listen on
+        on_ready: Called once the server is warm and accepting connections
+    """
     try:
         print(f"🚀 Starting agent on port {port}...")
         app = create_agent_function(port=port)
@@ -85,25 +277,64 @@ async def run_uvicorn_server(create_agent_function, port):
             loop="asyncio",
             access_log=enable_access_log,
         )
-        server = uvicorn.Server(config)
+        server = ReadinessServer(config, on_ready)
         servers.append(server)
         await server.serve()
     except Exception as e:
         print(f"Agent error: {e}")
 
 
-def run_agent_in_background(create_agent_function, port, name):
+class BackgroundAgentServer:
+    """An agent server running in a background thread, with its readiness signal."""
+
+    def __init__(self, name: str, port: int):
+        self.name = name
+        self.port = port
+        self.thread: Optional[threading.Thread] = None
+        self.started_at = time.perf_counter()
+        self.ready_at: Optional[float] = None
+        # Fires on readiness or when the server thread exits, whichever is first.
+        self._settled = threading.Event()
+
+    def _mark_ready(self) -> None:
+        self.ready_at = time.perf_counter()
+        self._settled.set()
+
+    @property
+    def is_ready(self) -> bool:
+        return (
+            self.ready_at is not None
+            and self.thread is not None
+            and self.thread.is_alive()
+        )
+
+    @property
+    def startup_seconds(self) -> Optional[float]:
+        return self.ready_at - self.started_at if self.ready_at is not None else None
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until the server is ready, its thread died or ``timeout`` passed."""
+        self._settled.wait(timeout)
+        return self.is_ready
+
+
+def run_agent_in_background(create_agent_function, port, name) -> BackgroundAgentServer:
     """Run an agent server in a background thread."""
+    handle = BackgroundAgentServer(name, port)
 
     def run() -> None:
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
         try:
             # Create the coroutine inside the new event loop
-            loop.run_until_complete(run_uvicorn_server(create_agent_function, port))
+            loop.run_until_complete(
+                run_uvicorn_server(create_agent_function, port, handle._mark_ready)
+            )
         except Exception as e:
             print(f"{name} error: {e}")
+        finally:
+            handle._settled.set()
 
-    thread = threading.Thread(target=run, daemon=True)
-    thread.start()
-    return thread
+    handle.thread = threading.Thread(target=run, daemon=True)
+    handle.thread.start()
+    return handle
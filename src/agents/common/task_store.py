@@ -0,0 +1,171 @@
+"""
+Task stores for the A2A agent servers.
+
+The SDK's ``InMemoryTaskStore`` keeps every task, with its history and
+artifacts, for the life of the process. ``BoundedTaskStore`` is a drop-in
+replacement that caps the number of tasks and their serialized size, expires
+finished tasks after a TTL and evicts least-recently-used tasks when over a
+limit. ``create_task_store`` picks the backend from settings, including the
+Postgres store in ``postgres_task_store``.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from a2a.server.context import ServerCallContext
+from a2a.server.tasks import InMemoryTaskStore, TaskStore
+from a2a.types import Task, TaskState
+
+from src.core.config import settings
+
+TERMINAL_STATES = frozenset(
+    {TaskState.completed, TaskState.failed, TaskState.canceled, TaskState.rejected}
+)
+
+
+def is_terminal(task: Task) -> bool:
+    return task.status.state in TERMINAL_STATES
+
+
+@dataclass
+class _StoredTask:
+    task: Task
+    size: int
+    finished_at: Optional[float]
+
+
+class BoundedTaskStore(TaskStore):
+    """In-memory task store with count, byte and TTL limits and LRU eviction.
+
+    Finished tasks are evicted before active ones, so a task that is still
+    being worked on is only dropped when the store is full of active tasks.
+    """
+
+    def __init__(
+        self,
+        max_tasks: int = 1000,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: float = 3600.0,
+    ):
+        self.max_tasks = max_tasks
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._tasks: "OrderedDict[str, _StoredTask]" = OrderedDict()
+        self._bytes = 0
+        self._lock = asyncio.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def _remove(self, task_id: str) -> None:
+        stored = self._tasks.pop(task_id, None)
+        if stored is not None:
+            self._bytes -= stored.size
+
+    def _is_expired(self, stored: _StoredTask, now: float) -> bool:
+        return stored.finished_at is not None and now - stored.finished_at >= self.ttl
+
+    def _expire(self, now: float) -> None:
+        expired = [
+            task_id
+            for task_id, stored in self._tasks.items()
+            if self._is_expired(stored, now)
+        ]
+        for task_id in expired:
+            self._remove(task_id)
+        self.expirations += len(expired)
+
+    def _evict(self, keep: str) -> None:
+        """Evict LRU tasks, finished ones first, until within limits (never ``keep``)."""
+
+        def over_limit() -> bool:
+            return len(self._tasks) > self.max_tasks or self._bytes > self.max_bytes
+
+        for finished_only in (True, False):
+            for task_id in list(self._tasks):
+                if not over_limit():
+                    return
+                stored = self._tasks[task_id]
+                if task_id == keep or (finished_only and stored.finished_at is None):
+                    continue
+                self._remove(task_id)
+                self.evictions += 1
+
+    async def save(
+        self, task: Task, context: Optional[ServerCallContext] = None
+    ) -> None:
+        size = len(task.model_dump_json(exclude_none=True))
+        async with self._lock:
+            now = time.monotonic()
+            previous = self._tasks.get(task.id)
+            finished_at = None
+            if is_terminal(task):
+                finished_at = (
+                    previous.finished_at if previous and previous.finished_at else now
+                )
+            self._remove(task.id)
+            self._tasks[task.id] = _StoredTask(task, size, finished_at)
+            self._bytes += size
+            self._expire(now)
+            self._evict(keep=task.id)
+
+    async def get(
+        self, task_id: str, context: Optional[ServerCallContext] = None
+    ) -> Optional[Task]:
+        async with self._lock:
+            stored = self._tasks.get(task_id)
+            if stored is None:
+                return None
+            if self._is_expired(stored, time.monotonic()):
+                self._remove(task_id)
+                self.expirations += 1
+                return None
+            self._tasks.move_to_end(task_id)
+            return stored.task
+
+    async def delete(
+        self, task_id: str, context: Optional[ServerCallContext] = None
+    ) -> None:
+        async with self._lock:
+            self._remove(task_id)
+
+    def stats(self) -> dict[str, Any]:
+        active = sum(1 for stored in self._tasks.values() if stored.finished_at is None)
+        return {
+            "tasks": len(self._tasks),
+            "active_tasks": active,
+            "bytes": self._bytes,
+            "max_tasks": self.max_tasks,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+def create_task_store() -> TaskStore:
+    """Build the task store selected by ``settings.task_store_backend``."""
+    backend = settings.task_store_backend.lower()
+    if backend == "memory":
+        return InMemoryTaskStore()
+    if backend == "bounded":
+        return BoundedTaskStore(
+            max_tasks=settings.task_store_max_tasks,
+            max_bytes=settings.task_store_max_bytes,
+            ttl=settings.task_store_ttl,
+        )
+    if backend == "postgres":
+        if not settings.task_store_dsn:
+            raise ValueError("TASK_STORE_DSN is required for the postgres task store")
+        from src.agents.common.postgres_task_store import PostgresTaskStore
+
+        return PostgresTaskStore(
+            settings.task_store_dsn,
+            table=settings.task_store_table,
+            min_size=settings.task_store_pool_min_size,
+            max_size=settings.task_store_pool_max_size,
+            flush_interval=settings.task_store_flush_interval,
+        )
+    raise ValueError(f"Unknown task store backend: {settings.task_store_backend!r}")
@@ -1,72 +1,178 @@
+import asyncio
+import contextlib
+import contextvars
 import json
+import random
+import re
+import time
 import uuid
-from typing import Any
+from typing import Any, AsyncIterator, Iterator
 
 import httpx
-import requests
 from src.core.config import settings
-
-# ---------- Logfire instrumentation ----------
-# Try to import Logfire if available. We wrap this in a try/except so that the
-# rest of the library still works when Logfire is not installed or an older
-# version is present (e.g. during CI or minimal deployments).
-
+from src.agents.common.admission import AGENT_BUSY_ERROR_CODE, AgentBusyError
+from src.agents.common.response_cache import (
+    BYPASS_METADATA_KEY,
+    WROTE_DATA_METADATA_KEY,
+    bypass_active,
+    note_write,
+)
+from src.core.telemetry import span
+
+from a2a.client import A2AClient, A2AClientHTTPError
+from a2a.client.errors import A2AClientJSONRPCError
+from a2a.types import (
+    AgentCard,
+    CancelTaskRequest,
+    JSONRPCErrorResponse,
+    Message,
+    MessageSendParams,
+    Part,
+    SendMessageRequest,
+    SendStreamingMessageRequest,
+    Task,
+    TaskArtifactUpdateEvent,
+    TaskIdParams,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+from a2a.utils.constants import AGENT_CARD_WELL_KNOWN_PATH
+
+# HTTP/2 multiplexing needs the optional ``h2`` package (``httpx[http2]``).
 try:
-    import logfire
-
-    if hasattr(logfire, "configure"):
-        # We only need to call configure once per process. If the user has
-        # already configured Logfire (e.g. in ``app.py``) this call will be a
-        # no-op. We still add it here so that the module can be imported and
-        # used stand-alone in other scripts without additional setup.
-        logfire.configure(send_to_logfire=False)
-
-        # Instrument common libraries used by the tool client so that HTTP
-        # traffic appears automatically in Logfire's Live view.
-        for _instr in (
-            getattr(logfire, "instrument_httpx", None),
-            getattr(logfire, "instrument_requests", None),
-        ):
-            if callable(_instr):
-                try:
-                    _instr()
-                except Exception:
-                    # Instrumentation failure shouldn't crash the app.
-                    pass
-
-    # Expose decorator helper only if Logfire import succeeded
-    span = getattr(logfire, "instrument", lambda *a, **k: (lambda f: f))
+    import h2  # noqa: F401
 
+    _HTTP2_AVAILABLE = True
 except ModuleNotFoundError:
-    # Logfire not installed; define a no-op decorator so the rest of the code
-    # still imports and works.
-    def span(*_args, **_kwargs):  # type: ignore
-        def _decorator(func):
-            return func
-
-        return _decorator
+    _HTTP2_AVAILABLE = False
 
 
-# -------------------------------------------------------------
+from pydantic import BaseModel
+from typing import Optional, List
 
-from a2a.client import A2AClient
-from a2a.types import AgentCard, MessageSendParams, SendMessageRequest
 
+def _max_age(cache_control: str | None, default: float) -> float:
+    """Return the ``max-age`` directive of a Cache-Control header, if any."""
+    if cache_control:
+        match = re.search(r"max-age=(\d+)", cache_control)
+        if match:
+            return float(match.group(1))
+    return default
 
-from pydantic import BaseModel
-from typing import Optional, List
 
 class ArtifactPart(BaseModel):
     kind: str
     text: Optional[str] = None
 
+
 class Artifact(BaseModel):
     parts: List[ArtifactPart] = []
 
+
 class TaskResponse(BaseModel):
     id: Optional[str] = None
     status: Optional[str] = None
     artifacts: List[Artifact] = []
+    wrote_data: bool = False
+
+
+class DelegationRequest(BaseModel):
+    agent_url: str
+    message: str
+
+
+class DelegationResult(BaseModel):
+    """Outcome of one branch of a fan-out delegation."""
+
+    agent_url: str
+    message: str
+    status: str  # "completed" | "failed" | "timeout"
+    task: Optional[TaskResponse] = None
+    error: Optional[str] = None
+    elapsed_seconds: float = 0.0
+
+
+class TaskStreamEvent(BaseModel):
+    """One incremental update from a streaming delegation."""
+
+    kind: str  # "task" | "status" | "artifact" | "message" | "error"
+    task_id: Optional[str] = None
+    status: Optional[str] = None
+    text: Optional[str] = None
+    artifact_name: Optional[str] = None
+    append: bool = False
+    final: bool = False
+
+
+def _text_from_parts(parts: List[Part] | None) -> Optional[str]:
+    """Join the text parts of an A2A message or artifact."""
+    texts = [part.root.text for part in parts or [] if isinstance(part.root, TextPart)]
+    return "".join(texts) if texts else None
+
+
+def _to_stream_event(
+    event: Task | Message | TaskStatusUpdateEvent | TaskArtifactUpdateEvent,
+) -> TaskStreamEvent:
+    """Flatten an A2A streaming result into a ``TaskStreamEvent``."""
+    if isinstance(event, TaskStatusUpdateEvent):
+        return TaskStreamEvent(
+            kind="status",
+            task_id=event.task_id,
+            status=event.status.state.value,
+            text=_text_from_parts(
+                event.status.message.parts if event.status.message else None
+            ),
+            final=event.final,
+        )
+    if isinstance(event, TaskArtifactUpdateEvent):
+        return TaskStreamEvent(
+            kind="artifact",
+            task_id=event.task_id,
+            text=_text_from_parts(event.artifact.parts),
+            artifact_name=event.artifact.name,
+            append=bool(event.append),
+            final=bool(event.last_chunk),
+        )
+    if isinstance(event, Task):
+        return TaskStreamEvent(
+            kind="task", task_id=event.id, status=event.status.state.value
+        )
+    return TaskStreamEvent(
+        kind="message",
+        task_id=event.task_id,
+        text=_text_from_parts(event.parts),
+        final=True,
+    )
+
+
+def _raise_if_busy(error: Any) -> None:
+    """Raise ``AgentBusyError`` if a JSON-RPC error is an admission-control rejection."""
+    if getattr(error, "code", None) == AGENT_BUSY_ERROR_CODE:
+        data = error.data if isinstance(error.data, dict) else {}
+        raise AgentBusyError(float(data.get("retry_after") or 0.0))
+
+
+# Remote (agent_url, task_id) pairs started by the current agent run, so that
+# cancelling the run can cancel them too. Set by ``track_remote_tasks``.
+_remote_tasks: contextvars.ContextVar[set[tuple[str, str]] | None] = (
+    contextvars.ContextVar("a2a_remote_tasks", default=None)
+)
+
+
+@contextlib.contextmanager
+def track_remote_tasks() -> Iterator[set[tuple[str, str]]]:
+    """Collect the remote tasks that ``create_task`` calls in this context have in flight.
+
+    Tasks are added once the remote agent reports the task ID and removed when
+    they finish, so the set always holds the delegations still running.
+    """
+    remote_tasks: set[tuple[str, str]] = set()
+    token = _remote_tasks.set(remote_tasks)
+    try:
+        yield remote_tasks
+    finally:
+        _remote_tasks.reset(token)
+
 
 class A2AToolClient:
     """A2A client."""
@@ -78,6 +184,15 @@ class A2AToolClient:
         # Default timeout for requests (in seconds)
         self.default_timeout = default_timeout
         self._debug_enabled = settings.log_level.lower() in {"debug", "trace"}
+        # Long-lived connection pools and A2A clients, one per agent URL. Both
+        # are bound to the event loop they were first used on, so they are
+        # rebuilt if the client is later driven from a different loop.
+        self._http_clients: dict[str, httpx.AsyncClient] = {}
+        self._a2a_clients: dict[str, A2AClient] = {}
+        self._clients_loop: asyncio.AbstractEventLoop | None = None
+        # Agent card validators: ETag per agent URL and monotonic expiry time.
+        self._card_etags: dict[str, str] = {}
+        self._card_expiry: dict[str, float] = {}
 
     def _normalize_url(self, url: str) -> str:
         """Ensure the URL contains a scheme and has no trailing slash."""
@@ -85,6 +200,146 @@ class A2AToolClient:
             url = f"http://{url}"
         return url.rstrip("/")
 
+    # -------------------- Connection pooling --------------------
+
+    def _ensure_loop_bound(self) -> None:
+        """Drop pooled clients that belong to a different event loop.
+
+        Their connections cannot be reused (or closed) from this loop, so they
+        are closed on their own loop if it is still running. Otherwise they
+        are left to the garbage collector, so a caller that is finished with a
+        loop (e.g. ``asyncio.run``) should ``aclose`` the client before it ends.
+        """
+        loop = asyncio.get_running_loop()
+        old_loop = self._clients_loop
+        if old_loop is loop:
+            return
+        stale = list(self._http_clients.values())
+        self._http_clients.clear()
+        self._a2a_clients.clear()
+        self._clients_loop = loop
+        if not stale:
+            return
+        if old_loop is not None and old_loop.is_running():
+            for client in stale:
+                asyncio.run_coroutine_threadsafe(client.aclose(), old_loop)
+        elif self._debug_enabled:
+            print(
+                f"[A2A ToolClient] dropped {len(stale)} connection pool(s) of a closed event loop"
+            )
+
+    def _get_http_client(self, agent_url: str) -> httpx.AsyncClient:
+        """Return the pooled ``httpx.AsyncClient`` for an agent, creating it once."""
+        self._ensure_loop_bound()
+        client = self._http_clients.get(agent_url)
+        if client is None or client.is_closed:
+            timeout_config = httpx.Timeout(
+                timeout=self.default_timeout,
+                connect=10.0,
+                read=self.default_timeout,
+                write=10.0,
+                pool=5.0,
+            )
+            # One pool per agent URL keeps the connection limits per host.
+            limits = httpx.Limits(
+                max_connections=settings.a2a_max_connections_per_host,
+                max_keepalive_connections=settings.a2a_max_keepalive_connections,
+                keepalive_expiry=settings.a2a_keepalive_expiry,
+            )
+            client = httpx.AsyncClient(
+                timeout=timeout_config,
+                limits=limits,
+                http2=settings.a2a_http2 and _HTTP2_AVAILABLE,
+            )
+            self._http_clients[agent_url] = client
+            if self._debug_enabled:
+                print(f"[A2A ToolClient] opened connection pool for {agent_url}")
+        return client
+
+    async def _get_a2a_client(self, agent_url: str) -> A2AClient:
+        """Return a cached ``A2AClient`` for an agent, fetching its card if needed."""
+        httpx_client = self._get_http_client(agent_url)
+        client = self._a2a_clients.get(agent_url)
+        if client is not None:
+            return client
+
+        # Use the cached agent card data, fetching it on first contact
+        agent_card_data = self._agent_info_cache.get(agent_url)
+        if agent_card_data is None:
+            agent_card_data = await self._refresh_agent_card(agent_url)
+        if agent_card_data is None:
+            raise RuntimeError(f"Agent card for {agent_url} is unavailable")
+
+        # Create A2A client with the agent card
+        client = A2AClient(
+            httpx_client=httpx_client, agent_card=AgentCard(**agent_card_data)
+        )
+        self._a2a_clients[agent_url] = client
+        return client
+
+    # -------------------- Agent card cache --------------------
+
+    def _card_is_fresh(self, agent_url: str) -> bool:
+        """Whether the cached card for an agent is still within its TTL."""
+        if self._agent_info_cache.get(agent_url) is None:
+            return False
+        expires_at = self._card_expiry.get(agent_url, 0.0)
+        return time.monotonic() < expires_at
+
+    async def _refresh_agent_card(self, agent_url: str) -> dict[str, Any] | None:
+        """Fetch (or revalidate) an agent card, keeping the stale copy on failure."""
+        cached_card = self._agent_info_cache.get(agent_url)
+        headers = {}
+        if cached_card is not None and agent_url in self._card_etags:
+            headers["If-None-Match"] = self._card_etags[agent_url]
+
+        try:
+            response = await self._get_http_client(agent_url).get(
+                f"{agent_url}{AGENT_CARD_WELL_KNOWN_PATH}",
+                headers=headers,
+                timeout=settings.agent_card_fetch_timeout,
+            )
+            if response.status_code == 304 and cached_card is not None:
+                agent_data = cached_card
+            else:
+                response.raise_for_status()
+                agent_data = response.json()
+                if agent_data != cached_card:
+                    # Rebuild the A2A client from the new card on next use.
+                    self._a2a_clients.pop(agent_url, None)
+                if etag := response.headers.get("ETag"):
+                    self._card_etags[agent_url] = etag
+                if self._debug_enabled:
+                    print(
+                        "[A2A ToolClient] fetched agent card",
+                        agent_data.get("name", agent_url),
+                        agent_data.get("skills", []),
+                    )
+        except Exception as e:
+            print(f"Failed to fetch agent info from {agent_url}: {e}")
+            return cached_card
+
+        self._agent_info_cache[agent_url] = agent_data
+        self._card_expiry[agent_url] = time.monotonic() + _max_age(
+            response.headers.get("Cache-Control"), settings.agent_card_cache_ttl
+        )
+        return agent_data
+
+    async def aclose(self) -> None:
+        """Close every pooled connection. The client can still be reused afterwards."""
+        http_clients = list(self._http_clients.values())
+        self._http_clients.clear()
+        self._a2a_clients.clear()
+        self._clients_loop = None
+        for client in http_clients:
+            await client.aclose()
+
+    async def __aenter__(self) -> "A2AToolClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
     # -------------------- Public API --------------------
 
     @span("A2AToolClient.add_remote_agent", extract_args=True)
@@ -98,141 +353,356 @@ class A2AToolClient:
                 print(f"[A2A ToolClient] registered remote agent: {normalized_url}")
 
     @span("A2AToolClient.list_remote_agents")
-    def list_remote_agents(self) -> list[dict[str, Any]]:
-        """List available remote agents with caching."""
+    async def list_remote_agents(self) -> dict[str, dict[str, Any]]:
+        """List available remote agents, refreshing stale agent cards concurrently."""
         if not self._agent_info_cache:
-            return []
-
-        remote_agents_info = []
-        for remote_connection in self._agent_info_cache:
-            # Use cached data if available
-            if self._agent_info_cache[remote_connection] is not None:
-                remote_agents_info.append(self._agent_info_cache[remote_connection])
-            else:
-                try:
-                    # Fetch and cache agent info
-                    agent_info = requests.get(
-                        f"{remote_connection}/.well-known/agent-card.json"
-                    )
-                    agent_data = agent_info.json()
-                    self._agent_info_cache[remote_connection] = agent_data
-                    remote_agents_info.append(agent_data)
-                    if self._debug_enabled:
-                        print(
-                            "[A2A ToolClient] fetched agent card",
-                            agent_data.get("name", remote_connection),
-                            agent_data.get("skills", []),
-                        )
-                except Exception as e:
-                    print(f"Failed to fetch agent info from {remote_connection}: {e}")
-
-        return self._agent_info_cache
+            return {}
+
+        stale = [url for url in self._agent_info_cache if not self._card_is_fresh(url)]
+        if stale:
+            await asyncio.gather(*(self._refresh_agent_card(url) for url in stale))
+
+        return {
+            url: card
+            for url, card in self._agent_info_cache.items()
+            if card is not None
+        }
+
+    def _message_params(self, message: str) -> MessageSendParams:
+        """Build the message parameters following official structure."""
+        send_message_payload = {
+            "message": {
+                "role": "user",
+                "parts": [{"kind": "text", "text": message}],
+                "messageId": uuid.uuid4().hex,
+            }
+        }
+        if bypass_active():
+            # A request that skipped the response cache skips it downstream too.
+            send_message_payload["message"]["metadata"] = {BYPASS_METADATA_KEY: True}
+        return MessageSendParams(**send_message_payload)
 
     @span("A2AToolClient.create_task", extract_args=True)
     async def create_task(self, agent_url: str, message: str) -> TaskResponse:
-        """Send a message following the official A2A SDK pattern."""
+        """Send a message following the official A2A SDK pattern.
+
+        If the agent is busy (its admission queue is full), the call is
+        retried with jittered exponential backoff that waits at least the
+        agent's ``retry_after`` hint. A delegation whose remote run reports
+        that it wrote data keeps the calling run's response out of the
+        response cache.
+        """
         # Normalise the agent URL first so that downstream libraries always
         # receive a valid absolute URL. This prevents errors such as
         # "Request URL is missing an 'http://' or 'https://' protocol." when
         # a caller accidentally omits the scheme.
         agent_url = self._normalize_url(agent_url)
 
-        # Configure httpx client with timeout
-        timeout_config = httpx.Timeout(
-            timeout=self.default_timeout,
-            connect=10.0,
-            read=self.default_timeout,
-            write=10.0,
-            pool=5.0,
-        )
-
-        async with httpx.AsyncClient(timeout=timeout_config) as httpx_client:
-            # Check if we have cached agent card data
-            if (
-                agent_url in self._agent_info_cache
-                and self._agent_info_cache[agent_url] is not None
-            ):
-                agent_card_data = self._agent_info_cache[agent_url]
-            else:
-                # Fetch the agent card
-                agent_card_response = await httpx_client.get(
-                    f"{agent_url}/.well-known/agent-card.json"
-                )
-                agent_card_data = agent_card_response.json()
+        for attempt in range(settings.a2a_busy_max_retries + 1):
+            try:
+                task = await self._send_message(agent_url, message)
+            except AgentBusyError as busy:
+                if attempt == settings.a2a_busy_max_retries:
+                    raise
+                backoff = settings.a2a_busy_backoff * 2**attempt
+                delay = max(busy.retry_after, backoff) * random.uniform(1.0, 1.5)
                 if self._debug_enabled:
-                    print(f"[A2A ToolClient] fetched agent card for {agent_url}")
-
-            # Create AgentCard from data
-            agent_card = AgentCard(**agent_card_data)
-
-            # Create A2A client with the agent card
-            client = A2AClient(httpx_client=httpx_client, agent_card=agent_card)
+                    print(
+                        f"[A2A ToolClient] {agent_url} busy, retrying in {delay:.1f}s"
+                    )
+                await asyncio.sleep(delay)
+            except Exception:
+                # The remote run may have written before the call broke off.
+                note_write()
+                raise
+            else:
+                if task.wrote_data:
+                    note_write()
+                return task
 
-            # Build the message parameters following official structure
-            send_message_payload = {
-                "message": {
-                    "role": "user",
-                    "parts": [{"kind": "text", "text": message}],
-                    "messageId": uuid.uuid4().hex,
-                }
-            }
+    async def _send_message(self, agent_url: str, message: str) -> TaskResponse:
+        """One delegation attempt; raises ``AgentBusyError`` if the agent rejects it."""
+        client = await self._get_a2a_client(agent_url)
 
-            # Create the request
-            request = SendMessageRequest(
-                id=str(uuid.uuid4()), params=MessageSendParams(**send_message_payload)
-            )
+        if self._debug_enabled:
+            print(f"[A2A ToolClient] -> {agent_url}: {message}")
 
+        # Streaming reports the remote task ID up front, which lets a cancel
+        # of the calling run reach the remote task.
+        if self._supports_streaming(agent_url):
+            task = await self._send_tracked(client, agent_url, message)
             if self._debug_enabled:
-                print(f"[A2A ToolClient] -> {agent_url}: {message}")
+                print(
+                    f"[A2A ToolClient] <- {agent_url}: status={task.status}, artifacts={len(task.artifacts)}"
+                )
+            return task
+
+        # Create the request
+        request = SendMessageRequest(
+            id=str(uuid.uuid4()), params=self._message_params(message)
+        )
 
-            # Send the message with timeout configuration
+        # Send the message with timeout configuration
+        try:
             response = await client.send_message(request)
+        except A2AClientHTTPError as e:
+            if e.status_code in (429, 503):
+                raise AgentBusyError(0.0) from e
+            raise
+        if isinstance(response.root, JSONRPCErrorResponse):
+            _raise_if_busy(response.root.error)
+
+        # Wrap result in TaskResponse model for structured access
+        try:
+            response_dict = response.model_dump(mode="json", exclude_none=True)
+
+            # Handle different response structures from A2A SDK
+            if "result" in response_dict:
+                result_data = response_dict["result"]
+
+                # Handle the case where status is a dictionary with state field
+                if isinstance(result_data.get("status"), dict):
+                    status_dict = result_data["status"]
+                    status_value = status_dict.get("state", "unknown")
+                    result_data["status"] = status_value
+
+                # Ensure artifacts are properly formatted
+                if "artifacts" not in result_data:
+                    result_data["artifacts"] = []
+
+                metadata = result_data.get("metadata") or {}
+                result_data["wrote_data"] = bool(metadata.get(WROTE_DATA_METADATA_KEY))
 
-            # Wrap result in TaskResponse model for structured access
-            try:
-                response_dict = response.model_dump(mode="json", exclude_none=True)
-                
-                # Handle different response structures from A2A SDK
-                if "result" in response_dict:
-                    result_data = response_dict["result"]
-                    
-                    # Handle the case where status is a dictionary with state field
-                    if isinstance(result_data.get("status"), dict):
-                        status_dict = result_data["status"]
-                        status_value = status_dict.get("state", "unknown")
-                        result_data["status"] = status_value
-                    
-                    # Ensure artifacts are properly formatted
-                    if "artifacts" not in result_data:
-                        result_data["artifacts"] = []
-
-                    if self._debug_enabled:
-                        status_val = result_data.get("status")
-                        print(
-                            f"[A2A ToolClient] <- {agent_url}: status={status_val}, artifacts={len(result_data.get('artifacts', []))}"
+                if self._debug_enabled:
+                    status_val = result_data.get("status")
+                    print(
+                        f"[A2A ToolClient] <- {agent_url}: status={status_val}, artifacts={len(result_data.get('artifacts', []))}"
+                    )
+
+                return TaskResponse(**result_data)
+            else:
+                # fallback: create response from available data
+                status = "unknown"
+                if "status" in response_dict:
+                    if isinstance(response_dict["status"], dict):
+                        status = response_dict["status"].get("state", "unknown")
+                    else:
+                        status = response_dict["status"]
+
+                return TaskResponse(
+                    id=response_dict.get("id"),
+                    status=status,
+                    artifacts=response_dict.get("artifacts", []),
+                )
+        except Exception as e:
+            print(f"Error parsing response: {e}")
+            return TaskResponse(id=None, status="error", artifacts=[])
+
+    def _supports_streaming(self, agent_url: str) -> bool:
+        card = self._agent_info_cache.get(agent_url)
+        # Agents of the collective all stream; assume so until a card says otherwise.
+        return card is None or bool((card.get("capabilities") or {}).get("streaming"))
+
+    async def _send_tracked(
+        self, client: A2AClient, agent_url: str, message: str
+    ) -> TaskResponse:
+        """Send over the streaming API and assemble the final task.
+
+        While the task runs, it is registered with ``track_remote_tasks`` (if
+        active) so the calling run can cancel it. A rejection before the
+        remote agent accepted the task raises ``AgentBusyError``.
+        """
+        request = SendStreamingMessageRequest(
+            id=str(uuid.uuid4()), params=self._message_params(message)
+        )
+        remote_tasks = _remote_tasks.get()
+        task_id: Optional[str] = None
+        status = "unknown"
+        artifacts: dict[str, Artifact] = {}
+        wrote_data = False
+        try:
+            async for response in client.send_message_streaming(request):
+                event = response.root.result
+                if isinstance(event, Message):
+                    text = _text_from_parts(event.parts)
+                    return TaskResponse(
+                        id=event.task_id,
+                        status="completed",
+                        artifacts=[
+                            Artifact(parts=[ArtifactPart(kind="text", text=text)])
+                        ],
+                    )
+
+                event_task_id = event.id if isinstance(event, Task) else event.task_id
+                if task_id is None and event_task_id:
+                    task_id = event_task_id
+                    if remote_tasks is not None:
+                        remote_tasks.add((agent_url, task_id))
+
+                if isinstance(event, TaskArtifactUpdateEvent):
+                    text = _text_from_parts(event.artifact.parts) or ""
+                    existing = artifacts.get(event.artifact.artifact_id)
+                    if event.append and existing is not None and existing.parts:
+                        existing.parts[-1].text = (existing.parts[-1].text or "") + text
+                    else:
+                        artifacts[event.artifact.artifact_id] = Artifact(
+                            parts=[ArtifactPart(kind="text", text=text)]
                         )
-                    
-                    return TaskResponse(**result_data)
                 else:
-                    # fallback: create response from available data
-                    status = "unknown"
-                    if "status" in response_dict:
-                        if isinstance(response_dict["status"], dict):
-                            status = response_dict["status"].get("state", "unknown")
-                        else:
-                            status = response_dict["status"]
-                    
-                    return TaskResponse(
-                        id=response_dict.get("id"), 
-                        status=status,
-                        artifacts=response_dict.get("artifacts", [])
+                    status = event.status.state.value
+                    metadata = event.metadata or {}
+                    wrote_data = wrote_data or bool(
+                        metadata.get(WROTE_DATA_METADATA_KEY)
                     )
-            except Exception as e:
-                print(f"Error parsing response: {e}")
-                return TaskResponse(id=None, status="error", artifacts=[])
+                    for artifact in getattr(event, "artifacts", None) or []:
+                        artifacts[artifact.artifact_id] = Artifact(
+                            parts=[
+                                ArtifactPart(
+                                    kind="text", text=_text_from_parts(artifact.parts)
+                                )
+                            ]
+                        )
+        except A2AClientJSONRPCError as e:
+            # The SDK raises JSON-RPC errors from the stream instead of yielding them.
+            _raise_if_busy(e.error)
+            print(f"Error from {agent_url}: {e.error.message}")
+            return TaskResponse(
+                id=task_id,
+                status="error",
+                artifacts=list(artifacts.values()),
+                wrote_data=wrote_data,
+            )
+        except A2AClientHTTPError as e:
+            # Only a rejection before the task started is safe to resend.
+            if task_id is None and e.status_code in (429, 503):
+                raise AgentBusyError(0.0) from e
+            raise
+        finally:
+            if remote_tasks is not None and task_id is not None:
+                remote_tasks.discard((agent_url, task_id))
+        return TaskResponse(
+            id=task_id,
+            status=status,
+            artifacts=list(artifacts.values()),
+            wrote_data=wrote_data,
+        )
+
+    @span("A2AToolClient.cancel_task", extract_args=True)
+    async def cancel_task(self, agent_url: str, task_id: str) -> bool:
+        """Ask a remote agent to cancel one of its tasks; returns whether it accepted."""
+        agent_url = self._normalize_url(agent_url)
+        client = await self._get_a2a_client(agent_url)
+        request = CancelTaskRequest(
+            id=str(uuid.uuid4()), params=TaskIdParams(id=task_id)
+        )
+        if self._debug_enabled:
+            print(f"[A2A ToolClient] -> {agent_url}: cancel {task_id}")
+        response = await client.cancel_task(request)
+        return not isinstance(response.root, JSONRPCErrorResponse)
+
+    async def _run_branch(
+        self, request: DelegationRequest, timeout: float
+    ) -> DelegationResult:
+        """Run one fan-out branch, turning errors and timeouts into a result."""
+        started = time.monotonic()
+        result = DelegationResult(
+            agent_url=request.agent_url, message=request.message, status="completed"
+        )
+        try:
+            result.task = await asyncio.wait_for(
+                self.create_task(request.agent_url, request.message), timeout
+            )
+            if result.task.status in {"failed", "error", "rejected"}:
+                result.status = "failed"
+        except asyncio.TimeoutError:
+            result.status = "timeout"
+            result.error = f"No response within {timeout:g}s"
+        except Exception as e:
+            result.status = "failed"
+            result.error = str(e)
+        result.elapsed_seconds = round(time.monotonic() - started, 3)
+        return result
+
+    # Not wrapped in ``span``: Logfire cannot instrument async generators.
+    async def iter_tasks(
+        self, requests: List[DelegationRequest], timeout: float | None = None
+    ) -> AsyncIterator[DelegationResult]:
+        """Delegate to several agents concurrently, yielding results as they complete."""
+        timeout = timeout or settings.a2a_fanout_branch_timeout
+        branches = [
+            asyncio.ensure_future(self._run_branch(request, timeout))
+            for request in requests
+        ]
+        try:
+            for next_done in asyncio.as_completed(branches):
+                yield await next_done
+        finally:
+            # Stop any branches still running if the caller stops early.
+            for branch in branches:
+                branch.cancel()
+
+    @span("A2AToolClient.create_tasks", extract_args=True)
+    async def create_tasks(
+        self, requests: List[DelegationRequest], timeout: float | None = None
+    ) -> List[DelegationResult]:
+        """Delegate messages to several agents at once and collect every result.
+
+        Each request is an ``agent_url``/``message`` pair. Branches run
+        concurrently with a per-branch timeout, so the call takes as long as
+        the slowest branch. A branch that fails or times out is reported with
+        its status and error instead of failing the whole call. Results are in
+        completion order.
+        """
+        if self._debug_enabled:
+            print(f"[A2A ToolClient] fan-out to {len(requests)} agents")
+        return [result async for result in self.iter_tasks(requests, timeout)]
+
+    # Not wrapped in ``span``: Logfire cannot instrument async generators.
+    async def stream_task(
+        self, agent_url: str, message: str
+    ) -> AsyncIterator[TaskStreamEvent]:
+        """Send a message and yield status updates and artifact text as they arrive.
+
+        Uses the SDK's streaming send (Server-Sent Events), so callers see the
+        remote agent's progress before the task completes. The last event has
+        ``final=True``; JSON-RPC errors are yielded as a final ``error`` event.
+        """
+        agent_url = self._normalize_url(agent_url)
+        client = await self._get_a2a_client(agent_url)
+
+        request = SendStreamingMessageRequest(
+            id=str(uuid.uuid4()), params=self._message_params(message)
+        )
+
+        if self._debug_enabled:
+            print(f"[A2A ToolClient] -> {agent_url} (stream): {message}")
+
+        try:
+            async for response in client.send_message_streaming(request):
+                event = _to_stream_event(response.root.result)
+                if self._debug_enabled:
+                    print(
+                        f"[A2A ToolClient] <- {agent_url} (stream): {event.kind} {event.status or ''}"
+                    )
+                yield event
+        except A2AClientJSONRPCError as e:
+            # The SDK raises JSON-RPC errors from the stream instead of yielding them.
+            yield TaskStreamEvent(
+                kind="error", status="error", text=e.error.message, final=True
+            )
+        except A2AClientHTTPError as e:
+            yield TaskStreamEvent(
+                kind="error", status="error", text=e.message, final=True
+            )
 
     def remove_remote_agent(self, agent_url: str):
         """Remove an agent from the list of available remote agents."""
         normalized_url = self._normalize_url(agent_url)
         if normalized_url in self._agent_info_cache:
             del self._agent_info_cache[normalized_url]
+        self._card_etags.pop(normalized_url, None)
+        self._card_expiry.pop(normalized_url, None)
+        # The pooled connection is left to be garbage collected; closing it
+        # here would require an event loop.
+        self._a2a_clients.pop(normalized_url, None)
+        self._http_clients.pop(normalized_url, None)
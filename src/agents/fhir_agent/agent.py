@@ -2,6 +2,7 @@ from pydantic_ai import Agent, RunContext
 from pydantic_ai.models.openai import OpenAIModel
 from pydantic_ai.providers.openrouter import OpenRouterProvider
 from src.core.config import settings
+from src.core.telemetry import configure_telemetry
 from src.mcp_handler.mcp_fhir import server
 from dotenv import load_dotenv
 
@@ -14,11 +15,8 @@ model = OpenAIModel(
 )
 
 # Create the FHIR agent with MCP server integration
-fhir_agent = Agent(
-    model=model,
-    name="fhir_agent",
-    mcp_servers=[server]
-)
+fhir_agent = Agent(model=model, name="fhir_agent", mcp_servers=[server])
+
 
 @fhir_agent.system_prompt
 def system_prompt(_: RunContext) -> str:
@@ -40,4 +38,7 @@ FHIR Version: R4
 Follow HL7 FHIR resource schemas exactly and ensure all responses are valid JSON conforming to FHIR R4.
 """
 
+
+# Standalone ``uvicorn ...:app`` runs configure telemetry here; a no-op under app.py.
+configure_telemetry("fhir-agent")
 app = fhir_agent.to_a2a()
@@ -1,5 +1,4 @@
 from a2a.types import AgentCard, AgentSkill
-import uuid
 
 FHIRAgentCard = AgentCard(
     name="FHIR Agent",
@@ -11,28 +10,28 @@ FHIRAgentCard = AgentCard(
     capabilities={"streaming": True},
     skills=[
         AgentSkill(
-            id=str(uuid.uuid4()),
+            id="retrieve-patient-data",
             name="Retrieve Patient Data",
             description="Fetch patient demographic and clinical information by ID or by demographic details.",
-            tags=[]
+            tags=[],
         ),
         AgentSkill(
-            id=str(uuid.uuid4()),
+            id="find-patients-by-condition",
             name="Find Patients by Condition",
             description="Discover patients by clinical condition, problem list entry, or other coded criteria.",
-            tags=["search", "conditions"]
+            tags=["search", "conditions"],
         ),
         AgentSkill(
-            id=str(uuid.uuid4()),
+            id="write-clinical-data",
             name="Write Clinical Data",
             description="Write new resources such as Diagnoses, Observations, or Test Results into FHIR.",
-            tags=[]
+            tags=[],
         ),
         AgentSkill(
-            id=str(uuid.uuid4()),
+            id="data-provenance-enforcement",
             name="Data Provenance Enforcement",
             description="Record agent identity, inputs used, and maintain an auditable history for all updates.",
-            tags=[]
+            tags=[],
         ),
     ],
 )
@@ -0,0 +1,186 @@
+"""Memoizing cache for LLM condition search plans.
+
+The same condition phrases ("diabetes", "CHF") come up again and again, and
+each plan costs a full LLM call. Plans are cached under the normalized
+condition text in a bounded in-memory LRU backed by a small SQLite store, so
+they survive restarts. Concurrent requests for the same uncached text share
+one in-flight planner call.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Generic, Optional, TypeVar
+
+from pydantic import BaseModel
+
+PlanT = TypeVar("PlanT", bound=BaseModel)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS plans (
+    key TEXT PRIMARY KEY,
+    plan TEXT NOT NULL,
+    stored_at REAL NOT NULL
+)
+"""
+
+
+def normalize_condition_text(condition_text: str) -> str:
+    """Lower-case, trim punctuation and collapse whitespace so phrasings share a key."""
+    text = re.sub(r"[^\w\s()/-]", " ", condition_text.lower())
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class PlanCache(Generic[PlanT]):
+    """Two-level (memory LRU + SQLite) cache of planner results."""
+
+    def __init__(
+        self,
+        model: type[PlanT],
+        path: Optional[str] = None,
+        max_entries: int = 1024,
+        max_disk_entries: int = 10000,
+        ttl: float = 7 * 24 * 3600,
+    ):
+        self.model = model
+        self.path = path
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl = ttl
+        self._memory: OrderedDict[str, tuple[PlanT, float]] = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        # The planner may run on several event loops when tool servers are in-process.
+        self._lock = threading.Lock()
+        self._inflight: dict[tuple[int, str], asyncio.Future] = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.shared_calls = 0
+
+    def _disk(self) -> Optional[sqlite3.Connection]:
+        if self.path is None:
+            return None
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(
+                self.path, check_same_thread=False, isolation_level=None
+            )
+            self._db.execute(_SCHEMA)
+        return self._db
+
+    def _is_fresh(self, stored_at: float) -> bool:
+        return time.time() - stored_at < self.ttl
+
+    def get(self, key: str) -> Optional[PlanT]:
+        """Return a fresh cached plan from memory, then disk."""
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None and self._is_fresh(cached[1]):
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return cached[0].model_copy(deep=True)
+            self._memory.pop(key, None)
+
+            db = self._disk()
+            row = (
+                db.execute(
+                    "SELECT plan, stored_at FROM plans WHERE key = ?", (key,)
+                ).fetchone()
+                if db
+                else None
+            )
+            if row is not None and self._is_fresh(row[1]):
+                plan = self.model.model_validate_json(row[0])
+                self._remember(key, plan, row[1])
+                self.hits += 1
+                self.disk_hits += 1
+                return plan.model_copy(deep=True)
+
+            self.misses += 1
+            return None
+
+    def _remember(self, key: str, plan: PlanT, stored_at: float) -> None:
+        self._memory[key] = (plan, stored_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def put(self, key: str, plan: PlanT) -> None:
+        stored_at = time.time()
+        with self._lock:
+            self._remember(key, plan, stored_at)
+            db = self._disk()
+            if db is not None:
+                db.execute(
+                    "INSERT OR REPLACE INTO plans (key, plan, stored_at) VALUES (?, ?, ?)",
+                    (key, plan.model_dump_json(), stored_at),
+                )
+                db.execute(
+                    "DELETE FROM plans WHERE stored_at < ? OR key NOT IN"
+                    " (SELECT key FROM plans ORDER BY stored_at DESC LIMIT ?)",
+                    (stored_at - self.ttl, self.max_disk_entries),
+                )
+
+    async def get_or_plan(
+        self,
+        condition_text: str,
+        planner: Callable[[str], Awaitable[PlanT]],
+    ) -> PlanT:
+        """Return the cached plan or run ``planner`` once for all concurrent callers.
+
+        Exceptions from ``planner`` propagate to every waiting caller and are
+        not cached. If the caller running ``planner`` is cancelled, the
+        callers waiting on it are not: one of them runs ``planner`` again.
+        """
+        key = normalize_condition_text(condition_text)
+        plan = self.get(key)
+        if plan is not None:
+            return plan
+
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        while (inflight := self._inflight.get(flight_key)) is not None:
+            self.shared_calls += 1
+            plan = await asyncio.shield(inflight)
+            if plan is not None:
+                return plan.model_copy(deep=True)
+
+        future: asyncio.Future = loop.create_future()
+        self._inflight[flight_key] = future
+        try:
+            plan = await planner(condition_text)
+        except asyncio.CancelledError:
+            # Wake the waiters with no plan so they plan for themselves.
+            future.set_result(None)
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark retrieved so an unshared failure is not reported as unhandled.
+            future.exception()
+            raise
+        else:
+            self.put(key, plan)
+            future.set_result(plan)
+            return plan.model_copy(deep=True)
+        finally:
+            self._inflight.pop(flight_key, None)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "shared_calls": self.shared_calls,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
@@ -1,7 +1,9 @@
 """FHIR search planning utilities powered by an LLM.
 
 This module asks the model to interpret a natural language query and produce
-well-formed FHIR search terms so downstream tools can stay simple.
+well-formed FHIR search terms so downstream tools can stay simple. Common
+conditions are answered from the local terminology index first, and LLM plans
+are memoized in ``plan_cache``, so most queries never reach the model.
 """
 
 from __future__ import annotations
@@ -15,6 +17,8 @@ from pydantic import BaseModel, Field
 from pydantic_ai import Agent
 from pydantic_ai.models.openai import OpenAIModel
 
+from src.agents.fhir_agent.plan_cache import PlanCache
+from src.agents.fhir_agent.terminology import get_terminology_index
 from src.core.config import settings
 
 
@@ -37,6 +41,16 @@ class ConditionSearchPlan(BaseModel):
 
 _PLANNER_AGENT: Optional[Agent] = None
 
+plan_cache: PlanCache[ConditionSearchPlan] = PlanCache(
+    ConditionSearchPlan,
+    path=settings.planner_cache_path if settings.planner_cache_enabled else None,
+    max_entries=settings.planner_cache_max_entries
+    if settings.planner_cache_enabled
+    else 0,
+    max_disk_entries=settings.planner_cache_max_disk_entries,
+    ttl=settings.planner_cache_ttl,
+)
+
 
 def _ensure_planner_agent() -> Optional[Agent]:
     """Create the planner agent lazily when configuration allows it."""
@@ -135,6 +149,17 @@ def _dedupe_terms(terms: List[str]) -> List[str]:
 async def plan_condition_search(condition_text: str) -> ConditionSearchPlan:
     """Return a structured search plan, falling back to heuristics when needed."""
 
+    index = get_terminology_index()
+    concept = index.lookup(condition_text) if index is not None else None
+    if concept is not None:
+        return ConditionSearchPlan(
+            search_terms=index.search_terms(concept),
+            notes=(
+                f"Matched local terminology: {concept['display']} "
+                f"(SNOMED CT {concept['snomed']}, ICD-10 {concept['icd10']})."
+            ),
+        )
+
     agent = _ensure_planner_agent()
     if agent is None:
         return ConditionSearchPlan(
@@ -142,21 +167,23 @@ async def plan_condition_search(condition_text: str) -> ConditionSearchPlan:
             notes="Planner disabled: OPENROUTER_API_KEY not configured.",
         )
 
+    async def run_planner(text: str) -> ConditionSearchPlan:
+        result = await agent.run(text)
+        plan = result.output
+        if plan.resource_type.lower() != "condition":
+            plan.resource_type = "Condition"
+        plan.search_terms = _dedupe_terms(plan.search_terms) or _heuristic_terms(text)
+        return plan
+
+    # Failures are not cached, so the next request retries the planner.
     try:
-        result = await agent.run(condition_text)
+        return await plan_cache.get_or_plan(condition_text, run_planner)
     except Exception as exc:  # pragma: no cover - network/runtime failures
         return ConditionSearchPlan(
             search_terms=_heuristic_terms(condition_text),
             notes=f"Planner failed: {exc}",
         )
 
-    plan = result.output
-    if plan.resource_type.lower() != "condition":
-        plan.resource_type = "Condition"
-
-    plan.search_terms = _dedupe_terms(plan.search_terms) or _heuristic_terms(condition_text)
-    return plan
-
 
 def plan_condition_search_sync(condition_text: str) -> ConditionSearchPlan:
     """Synchronous helper for contexts outside of async loops (e.g. tests)."""
@@ -167,6 +194,8 @@ def plan_condition_search_sync(condition_text: str) -> ConditionSearchPlan:
         loop = None
 
     if loop and loop.is_running():
-        raise RuntimeError("plan_condition_search_sync cannot be called from a running event loop")
+        raise RuntimeError(
+            "plan_condition_search_sync cannot be called from a running event loop"
+        )
 
     return asyncio.run(plan_condition_search(condition_text))
@@ -0,0 +1,155 @@
+"""Local terminology index for common conditions.
+
+A small, loadable table of condition concepts (display string, SNOMED CT and
+ICD-10 codes, abbreviations and lay synonyms) lets the search planner answer
+frequent queries such as "T2DM" or "high blood pressure" without an LLM call.
+
+The index is built on first use from ``data/condition_terms.json`` (or
+``TERMINOLOGY_INDEX_PATH``) into three plain lookups: an exact alias map, a
+sorted alias list for prefix matches and an inverted token index for phrases
+that contain every word of one concept's alias. Lookups are a few dict and
+bisect operations.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Any, List, Optional
+
+from src.core.config import settings
+
+DEFAULT_INDEX_PATH = Path(__file__).parent / "data" / "condition_terms.json"
+
+# Words that carry no clinical meaning in a search request.
+_STOPWORDS = frozenset(
+    {
+        "a",
+        "an",
+        "and",
+        "the",
+        "of",
+        "with",
+        "for",
+        "has",
+        "have",
+        "patient",
+        "patients",
+        "history",
+        "hx",
+        "dx",
+    }
+)
+
+# Prefix matches shorter than this are too ambiguous to trust.
+_MIN_PREFIX_LENGTH = 4
+
+
+def normalize_term(text: str) -> str:
+    """Lower-case, drop apostrophes and turn other punctuation into spaces."""
+    text = text.lower().replace("'", "")
+    return " ".join(re.split(r"[^a-z0-9+.]+", text)).strip()
+
+
+def _tokens(normalized: str) -> List[str]:
+    return [token for token in normalized.split() if token not in _STOPWORDS]
+
+
+class TerminologyIndex:
+    """Exact, prefix and token lookups over a list of condition concepts."""
+
+    def __init__(self, concepts: List[dict[str, Any]]):
+        self.concepts = concepts
+        self._aliases: dict[str, int] = {}
+        self._tokens: dict[str, set[int]] = {}
+        for concept_id, concept in enumerate(concepts):
+            for alias in (concept["display"], *concept.get("synonyms", [])):
+                key = normalize_term(alias)
+                # The first concept to claim an alias keeps it.
+                self._aliases.setdefault(key, concept_id)
+                for token in _tokens(key):
+                    self._tokens.setdefault(token, set()).add(concept_id)
+        self._sorted_aliases = sorted(self._aliases)
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, path: Optional[str | Path] = None) -> "TerminologyIndex":
+        with open(path or DEFAULT_INDEX_PATH, encoding="utf-8") as handle:
+            return cls(json.load(handle)["concepts"])
+
+    def _by_prefix(self, key: str) -> Optional[int]:
+        if len(key) < _MIN_PREFIX_LENGTH:
+            return None
+        start = bisect.bisect_left(self._sorted_aliases, key)
+        found: set[int] = set()
+        for alias in self._sorted_aliases[start:]:
+            if not alias.startswith(key):
+                break
+            found.add(self._aliases[alias])
+            if len(found) > 1:
+                return None
+        return found.pop() if found else None
+
+    def _by_tokens(self, key: str) -> Optional[int]:
+        tokens = _tokens(key)
+        if not tokens or any(token not in self._tokens for token in tokens):
+            return None
+        candidates = set.intersection(*(self._tokens[token] for token in tokens))
+        return candidates.pop() if len(candidates) == 1 else None
+
+    def lookup(self, text: str) -> Optional[dict[str, Any]]:
+        """Return the single concept ``text`` names, or ``None`` if unknown or ambiguous."""
+        key = normalize_term(text)
+        concept_id = self._aliases.get(key)
+        if concept_id is None:
+            concept_id = self._by_prefix(key)
+        if concept_id is None:
+            concept_id = self._by_tokens(key)
+        if concept_id is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self.concepts[concept_id]
+
+    @staticmethod
+    def search_terms(concept: dict[str, Any], limit: int = 5) -> List[str]:
+        """Display string first, then synonyms, as FHIR text search terms."""
+        terms: List[str] = []
+        seen: set[str] = set()
+        for term in (concept["display"], *concept.get("synonyms", [])):
+            if term.lower() not in seen:
+                seen.add(term.lower())
+                terms.append(term)
+        return terms[:limit]
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "concepts": len(self.concepts),
+            "aliases": len(self._aliases),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+_INDEX: Optional[TerminologyIndex] = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_terminology_index() -> Optional[TerminologyIndex]:
+    """Load the index on first use; ``None`` when disabled in settings."""
+
+    global _INDEX
+
+    if not settings.terminology_index_enabled:
+        return None
+    if _INDEX is None:
+        with _INDEX_LOCK:
+            if _INDEX is None:
+                _INDEX = TerminologyIndex.load(settings.terminology_index_path)
+    return _INDEX
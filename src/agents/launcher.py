@@ -0,0 +1,213 @@
+"""
+Multi-process launcher for the agent servers.
+
+``app.py`` runs every agent as a thread in one interpreter, so the agents share
+one GIL. This launcher runs each agent in its own uvicorn process instead,
+optionally with several workers, and supervises them: a crashed agent is
+restarted with exponential backoff until it crashes more than
+``LAUNCHER_MAX_RESTARTS`` times within ``LAUNCHER_RESTART_WINDOW`` seconds.
+
+Host, port and worker count per agent come from settings
+(``TRIAGE_AGENT_PORT``, ``FHIR_AGENT_WORKERS``, ...). uvloop and httptools are
+used when installed and enabled.
+
+More than one worker per agent requires ``TASK_STORE_BACKEND=postgres``: with
+an in-memory store each worker only knows its own tasks, so ``tasks/get`` and
+``tasks/resubscribe`` would fail on the other workers. Even with Postgres,
+``tasks/cancel`` only stops a run when it reaches the worker executing it.
+
+Usage:
+    python -m src.agents.launcher
+    python -m src.agents.launcher --agent fhir --agent triage
+"""
+
+import argparse
+import importlib.util
+import signal
+import subprocess
+import sys
+import time
+from collections import deque
+from typing import Optional
+
+import httpx
+
+from src.core.config import settings
+
+AGENTS = ("triage", "fhir", "orchestration")
+
+
+def _server_options() -> list[str]:
+    loop = (
+        "uvloop"
+        if settings.server_uvloop and importlib.util.find_spec("uvloop")
+        else "asyncio"
+    )
+    http = (
+        "httptools"
+        if settings.server_httptools and importlib.util.find_spec("httptools")
+        else "h11"
+    )
+    return ["--loop", loop, "--http", http, "--log-level", settings.log_level.lower()]
+
+
+class AgentProcess:
+    """One agent's uvicorn process and its restart history."""
+
+    def __init__(self, agent: str):
+        self.agent = agent
+        self.host: str = getattr(settings, f"{agent}_agent_host")
+        self.port: int = getattr(settings, f"{agent}_agent_port")
+        self.workers: int = max(1, getattr(settings, f"{agent}_agent_workers"))
+        self.process: Optional[subprocess.Popen] = None
+        self.crashes: deque[float] = deque()
+        self.restart_at: Optional[float] = None
+
+    @property
+    def command(self) -> list[str]:
+        return [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            f"src.agents.servers:{self.agent}_app",
+            "--factory",
+            "--host",
+            self.host,
+            "--port",
+            str(self.port),
+            "--workers",
+            str(self.workers),
+            *_server_options(),
+        ]
+
+    def start(self) -> None:
+        print(
+            f"🚀 Starting {self.agent} agent on http://{self.host}:{self.port}"
+            f" ({self.workers} worker{'s' if self.workers > 1 else ''})"
+        )
+        self.process = subprocess.Popen(self.command)
+        self.restart_at = None
+
+    def stop(self, timeout: float = 10.0) -> None:
+        if self.process is None or self.process.poll() is not None:
+            return
+        self.process.terminate()
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+    def record_crash(self) -> bool:
+        """Schedule a restart; returns False once the restart budget is spent."""
+        now = time.monotonic()
+        self.crashes.append(now)
+        while self.crashes and now - self.crashes[0] > settings.launcher_restart_window:
+            self.crashes.popleft()
+        if len(self.crashes) > settings.launcher_max_restarts:
+            return False
+        delay = settings.launcher_restart_backoff * 2 ** (len(self.crashes) - 1)
+        self.restart_at = now + min(delay, 60.0)
+        return True
+
+
+def check_workers(processes: list[AgentProcess]) -> list[str]:
+    """Errors for agents whose worker count the task store cannot support."""
+    if settings.task_store_backend.lower() == "postgres":
+        return []
+    return [
+        f"{proc.agent} agent: {proc.workers} workers need TASK_STORE_BACKEND=postgres;"
+        f" the {settings.task_store_backend!r} task store is per worker"
+        for proc in processes
+        if proc.workers > 1
+    ]
+
+
+def wait_until_ready(processes: list[AgentProcess], timeout: float) -> None:
+    """Poll each agent's ``/readyz`` until it answers 200 or the deadline passes."""
+    started = time.perf_counter()
+    deadline = started + timeout
+    pending = list(processes)
+    with httpx.Client(timeout=2.0) as client:
+        while pending and time.perf_counter() < deadline:
+            for proc in list(pending):
+                if proc.process.poll() is not None:
+                    # Exited during startup; the supervisor restarts it.
+                    pending.remove(proc)
+                    print(f"❌ {proc.agent} agent exited during startup")
+                    continue
+                host = "127.0.0.1" if proc.host in ("0.0.0.0", "::") else proc.host
+                try:
+                    response = client.get(f"http://{host}:{proc.port}/readyz")
+                except httpx.HTTPError:
+                    continue
+                if response.status_code == 200:
+                    pending.remove(proc)
+                    elapsed = (time.perf_counter() - started) * 1000
+                    print(f"✅ {proc.agent} agent ready in {elapsed:.0f} ms")
+            time.sleep(0.1)
+    for proc in pending:
+        print(f"❌ {proc.agent} agent not ready after {timeout:.0f}s")
+
+
+def supervise(processes: list[AgentProcess]) -> int:
+    """Restart crashed agents until interrupted; returns the exit code."""
+    stopping = False
+
+    def request_stop(*_args) -> None:
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    exit_code = 0
+    while not stopping:
+        for proc in processes:
+            if stopping:
+                # Ctrl-C reaches the agents too; their exits are not crashes.
+                break
+            if proc.restart_at is not None:
+                if time.monotonic() >= proc.restart_at:
+                    proc.start()
+                continue
+            code = proc.process.poll() if proc.process is not None else None
+            if code is None:
+                continue
+            print(f"⚠️  {proc.agent} agent exited with code {code}")
+            if not proc.record_crash():
+                print(f"❌ {proc.agent} agent crashed too often; stopping all agents")
+                exit_code = 1
+                stopping = True
+                break
+            print(f"   restarting in {proc.restart_at - time.monotonic():.1f}s")
+        time.sleep(0.5)
+    return exit_code
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--agent", choices=AGENTS, action="append", help="Agents to run (default: all)"
+    )
+    options = parser.parse_args()
+
+    processes = [AgentProcess(agent) for agent in options.agent or AGENTS]
+    if errors := check_workers(processes):
+        for error in errors:
+            print(f"❌ {error}")
+        return 2
+    try:
+        for proc in processes:
+            proc.start()
+        wait_until_ready(processes, settings.agent_startup_timeout)
+        return supervise(processes)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        print("\n👋 Stopping agent servers...")
+        for proc in processes:
+            proc.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
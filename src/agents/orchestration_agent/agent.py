@@ -8,13 +8,12 @@ from pydantic_ai.providers.openrouter import OpenRouterProvider
 from src.agents.common.tool_client import A2AToolClient
 from dotenv import load_dotenv
 
-import logfire
 from src.core.config import settings
+from src.core.telemetry import configure_telemetry
 
 load_dotenv(override=True)
 
 
-
 # Configure the AI model
 model = OpenAIModel(
     settings.open_router_model,
@@ -32,15 +31,20 @@ for remote_agent_url in (settings.triage_agent_url, settings.fhir_agent_url):
 agent = Agent(
     model=model,
     name="orchestration_agent",
-    tools=[a2a_client.list_remote_agents, a2a_client.create_task],
+    tools=[
+        a2a_client.list_remote_agents,
+        a2a_client.create_task,
+        a2a_client.create_tasks,
+    ],
 )
 
+
 @agent.system_prompt
 def orchestration_agent_system_prompt(ctx: RunContext) -> str:
     return """You are the central coordinator for the Health Agents Collective. Your role is to:
 
 1. **Understand user requests** and determine which specialized agents to involve
-2. **Delegate to appropriate agents** using the available tools (`list_remote_agents`, `create_task`)
+2. **Delegate to appropriate agents** using the available tools (`list_remote_agents`, `create_task`, `create_tasks`)
 3. **Coordinate between agents** like the FHIR Agent for patient data and Triage Agent for assessments
 4. **Provide clear guidance** on what actions are being taken
 
@@ -57,7 +61,8 @@ def orchestration_agent_system_prompt(ctx: RunContext) -> str:
 **How to delegate:**
 1. Use `list_remote_agents()` to confirm availability.
 2. Use `create_task(agent_url, message)` to delegate tasks (e.g. `create_task("http://localhost:10028", "Find patients with diabetes")`).
-3. Parse the response and provide a clear summary to the user.
+3. When a request needs several agents and their tasks do not depend on each other, use `create_tasks(requests)` with a list of `{agent_url, message}` pairs to run them in parallel. Branches that fail or time out are marked in the results; report them rather than retrying the whole call.
+4. Parse the response and provide a clear summary to the user.
 
 **Example:**
 - User: "What patients do we have with diabetes?"
@@ -66,4 +71,7 @@ def orchestration_agent_system_prompt(ctx: RunContext) -> str:
 
 Always clearly state what you're doing and which agents you're delegating to."""
 
+
+# Standalone ``uvicorn ...:app`` runs configure telemetry here; a no-op under app.py.
+configure_telemetry("orchestration-agent")
 app = agent.to_a2a()
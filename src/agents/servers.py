@@ -0,0 +1,103 @@
+"""
+A2A server factories for each agent in the collective.
+
+``create_*_agent_server`` build the agent's A2A application; ``app.py`` runs
+them as threads in one process. The ``*_app`` functions are uvicorn app
+factories (``uvicorn --factory src.agents.servers:fhir_app``) used by the
+multi-process launcher, one process (or several workers) per agent, with host
+and port taken from settings.
+
+Each factory imports only its own agent, so a worker process does not pay for
+the other agents' imports.
+"""
+
+from a2a.server.apps import A2AStarletteApplication
+from starlette.applications import Starlette
+
+from src.agents.common.server import create_agent_a2a_server
+from src.core.config import settings
+from src.core.telemetry import configure_telemetry
+
+
+def create_triage_agent_server(host="localhost", port=10020) -> A2AStarletteApplication:
+    """Create A2A server for Triage Agent using the unified wrapper."""
+    from src.agents.triage_agent import TriageAgentCard, triage_agent
+    from src.mcp_handler.mcp_triage import server as triage_mcp_server
+
+    return create_agent_a2a_server(
+        agent=triage_agent,
+        name=TriageAgentCard.name,
+        description=TriageAgentCard.description,
+        skills=TriageAgentCard.skills,
+        host=host,
+        port=port,
+        status_message="Processing patient triage assessment...",
+        artifact_name="response",
+        mcp_servers=[triage_mcp_server],
+    )
+
+
+def create_orchestration_agent_server(
+    host="localhost", port=10024
+) -> A2AStarletteApplication:
+    """Create A2A server for Orchestration Agent using the unified wrapper."""
+    from src.agents.orchestration_agent import (
+        OrchestrationAgentCard,
+        orchestration_agent,
+    )
+
+    return create_agent_a2a_server(
+        agent=orchestration_agent,
+        name=OrchestrationAgentCard.name,
+        description=OrchestrationAgentCard.description,
+        skills=OrchestrationAgentCard.skills,
+        host=host,
+        port=port,
+        status_message="Coordinating agent communication...",
+        artifact_name="response",
+        response_cache=True,
+    )
+
+
+def create_fhir_agent_server(host="localhost", port=10028) -> A2AStarletteApplication:
+    """Create A2A server for FHIR Agent."""
+    from src.agents.fhir_agent.agent import fhir_agent
+    from src.agents.fhir_agent.agent_card import FHIRAgentCard
+    from src.mcp_handler.mcp_fhir import server as fhir_mcp_server
+
+    return create_agent_a2a_server(
+        agent=fhir_agent,
+        name=FHIRAgentCard.name,
+        description=FHIRAgentCard.description,
+        skills=FHIRAgentCard.skills,
+        host=host,
+        port=port,
+        status_message="Processing FHIR requests...",
+        artifact_name="response",
+        mcp_servers=[fhir_mcp_server],
+        response_cache=True,
+    )
+
+
+# -------------------- uvicorn app factories --------------------
+
+
+def triage_app() -> Starlette:
+    configure_telemetry("triage-agent")
+    return create_triage_agent_server(
+        settings.triage_agent_host, settings.triage_agent_port
+    ).build()
+
+
+def fhir_app() -> Starlette:
+    configure_telemetry("fhir-agent")
+    return create_fhir_agent_server(
+        settings.fhir_agent_host, settings.fhir_agent_port
+    ).build()
+
+
+def orchestration_app() -> Starlette:
+    configure_telemetry("orchestration-agent")
+    return create_orchestration_agent_server(
+        settings.orchestration_agent_host, settings.orchestration_agent_port
+    ).build()
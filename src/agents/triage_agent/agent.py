@@ -8,28 +8,21 @@ from pydantic_ai.providers.openrouter import OpenRouterProvider
 from src.mcp_handler.mcp_triage import server
 from dotenv import load_dotenv
 
-import logfire
 from src.core.config import settings
-
-logfire.configure()
-logfire.instrument_pydantic_ai()
+from src.core.telemetry import configure_telemetry
 
 load_dotenv(override=True)
 
 
-
 # Configure the AI model
 model = OpenAIModel(
-   settings.open_router_model,
-   provider=OpenRouterProvider(api_key=settings.open_router_api_key),
+    settings.open_router_model,
+    provider=OpenRouterProvider(api_key=settings.open_router_api_key),
 )
 
 # Create the Triage agent with MCP server integration
-triage_agent = Agent(
-    model=model,
-    name="triage_agent",
-    mcp_servers=[server]
-)
+triage_agent = Agent(model=model, name="triage_agent", mcp_servers=[server])
+
 
 @triage_agent.system_prompt
 def triage_agent_system_prompt(ctx: RunContext) -> str:
@@ -59,6 +52,7 @@ Your responsibilities:
    - Create FHIR Patient resource
    - Create FHIR Encounter
    - Create FHIR Observations for each symptom
+   - Prefer the `document_triage` tool, which records the patient, encounter and every symptom in a single call
    - Provide triage recommendations
 
 **Communication Style**:
@@ -79,7 +73,6 @@ Always maintain patient privacy and be culturally sensitive.
 """
 
 
-
 # async def run_triage_agent(task: str) -> str:
 #     async with agent.run_mcp_servers():
 #         result = await agent.run(
@@ -88,4 +81,6 @@ Always maintain patient privacy and be culturally sensitive.
 #         return result.output
 
 
+# Standalone ``uvicorn ...:app`` runs configure telemetry here; a no-op under app.py.
+configure_telemetry("triage-agent")
 app = triage_agent.to_a2a()
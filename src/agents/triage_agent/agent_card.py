@@ -1,5 +1,4 @@
 from a2a.types import AgentCard, AgentSkill
-import uuid
 
 TriageAgentCard = AgentCard(
     name="Triage Agent",
@@ -11,28 +10,28 @@ TriageAgentCard = AgentCard(
     capabilities={"streaming": True},
     skills=[
         AgentSkill(
-            id=str(uuid.uuid4()),
+            id="patient-intake",
             name="Patient Intake",
             description="Collect patient demographics including name, DOB, gender, address, and contact information.",
-            tags=["intake", "demographics"]
+            tags=["intake", "demographics"],
         ),
         AgentSkill(
-            id=str(uuid.uuid4()),
+            id="symptom-assessment",
             name="Symptom Assessment",
             description="Gather detailed information about symptoms, including onset, severity, and aggravating/relieving factors.",
-            tags=["assessment", "symptoms"]
+            tags=["assessment", "symptoms"],
         ),
         AgentSkill(
-            id=str(uuid.uuid4()),
+            id="urgency-assessment",
             name="Urgency Assessment",
             description="Determine the urgency of the patient's condition and recommend appropriate level of care.",
-            tags=["triage", "urgency"]
+            tags=["triage", "urgency"],
         ),
         AgentSkill(
-            id=str(uuid.uuid4()),
+            id="documentation",
             name="Documentation",
             description="Create FHIR resources (Patient, Encounter, Observations) to document the triage assessment.",
-            tags=["documentation", "fhir"]
+            tags=["documentation", "fhir"],
         ),
     ],
-)
\ No newline at end of file
+)
@@ -20,12 +20,53 @@ class Settings(BaseSettings):
 
     # FHIR Server Configuration
     fhir_base_url: str = Field(
-        default_factory=lambda: os.getenv("FHIR_SERVER_URL") or os.getenv("FHIR_BASE_URL") or "https://r4.smarthealthit.org"
+        default_factory=lambda: os.getenv("FHIR_SERVER_URL")
+        or os.getenv("FHIR_BASE_URL")
+        or "https://r4.smarthealthit.org"
     )
     fhir_version: str = "R4"
     fhir_http_timeout: float = Field(
         default_factory=lambda: float(os.getenv("FHIR_HTTP_TIMEOUT", "15"))
     )
+    # Shared FHIR connection pool used by the MCP tool servers
+    fhir_max_connections: int = 20
+    fhir_max_keepalive_connections: int = 10
+    fhir_keepalive_expiry: float = 30.0
+    fhir_http2: bool = True
+    # Search paging: entries per page requested and cap on entries returned by a tool
+    fhir_page_size: int = 50
+    fhir_max_results: int = 200
+    # Read-through cache for FHIR reads made by the MCP tool servers
+    fhir_cache_enabled: bool = True
+    fhir_cache_max_entries: int = 512
+    fhir_cache_ttl: float = 60.0
+    # SQLite file through which tool server processes share write invalidations (None: per process)
+    fhir_cache_invalidation_path: Optional[str] = ".cache/fhir_invalidations.sqlite3"
+    # Write-behind mode: journal FHIR writes locally and flush them in the background
+    fhir_write_behind: bool = False
+    fhir_write_journal_dir: str = ".fhir_write_journal"
+    fhir_write_batch_size: int = 20
+    fhir_write_max_attempts: int = 8
+    fhir_write_flush_interval: float = 2.0
+    # Compaction of tool results returned to the LLM (budget in approximate tokens)
+    tool_result_compaction: bool = True
+    tool_result_max_tokens: int = 4000
+    # How find_patients_by_condition tries planner terms: sequential | concurrent | merge.
+    # concurrent and merge query every term at once, multiplying FHIR load per search.
+    condition_search_mode: str = "sequential"
+    # Opt-in: send the raw condition text to FHIR while the planner runs and keep it if it
+    # finds enough hits (an extra FHIR search per query)
+    condition_speculative_search: bool = False
+    condition_speculative_min_hits: int = 1
+    # Cache of LLM condition search plans (memory LRU + SQLite file that survives restarts)
+    planner_cache_enabled: bool = True
+    planner_cache_path: str = ".cache/condition_plans.sqlite3"
+    planner_cache_max_entries: int = 1024
+    planner_cache_max_disk_entries: int = 10000
+    planner_cache_ttl: float = 7 * 24 * 3600.0
+    # Local terminology index consulted before the LLM planner (path overrides the bundled table)
+    terminology_index_enabled: bool = True
+    terminology_index_path: Optional[str] = None
 
     # Agent Configuration
     agent_name: str = "health-agents-collective"
@@ -35,20 +76,88 @@ class Settings(BaseSettings):
     triage_agent_url: str = "http://localhost:10020"
     fhir_agent_url: str = "http://localhost:10028"
     orchestration_agent_url: str = "http://localhost:10024"
+    # Seconds app.py waits for every agent server to report ready
+    agent_startup_timeout: float = 60.0
+    # Admission control per agent server: concurrent runs, queued requests and max queue wait
+    agent_max_concurrent_requests: int = 4
+    agent_max_queued_requests: int = 16
+    agent_queue_timeout: float = 30.0
+    # Cache of completed agent responses for agents that opt in (never agents with write skills).
+    # Changing the data version drops every cached response, e.g. after reloading FHIR data.
+    response_cache_enabled: bool = False
+    response_cache_max_entries: int = 256
+    response_cache_ttl: float = 300.0
+    response_cache_data_version: str = "1"
+
+    # Agent servers (python -m src.agents.launcher runs each in its own process).
+    # Keep the *_agent_url settings above pointing at these hosts and ports.
+    triage_agent_host: str = "127.0.0.1"
+    triage_agent_port: int = 10020
+    triage_agent_workers: int = 1
+    fhir_agent_host: str = "127.0.0.1"
+    fhir_agent_port: int = 10028
+    fhir_agent_workers: int = 1
+    orchestration_agent_host: str = "127.0.0.1"
+    orchestration_agent_port: int = 10024
+    orchestration_agent_workers: int = 1
+    # Use uvloop / httptools when installed (pip install 'health-agents-collective[fast]')
+    server_uvloop: bool = True
+    server_httptools: bool = True
+    # Supervised restarts: give up on an agent after this many crashes within the window
+    launcher_max_restarts: int = 5
+    launcher_restart_window: float = 300.0
+    launcher_restart_backoff: float = 1.0
 
     # A2A Protocol Configuration
     a2a_enabled: bool = True
     a2a_endpoint: Optional[str] = None
 
+    # A2A Client Connection Pool (per remote agent host)
+    a2a_max_connections_per_host: int = 20
+    a2a_max_keepalive_connections: int = 10
+    a2a_keepalive_expiry: float = 30.0
+    a2a_http2: bool = True
+    a2a_fanout_branch_timeout: float = 90.0
+    # Retries of create_task when the remote agent is busy (jittered backoff, honors Retry-After)
+    a2a_busy_max_retries: int = 4
+    a2a_busy_backoff: float = 0.5
+
+    # Agent Card Caching (server Cache-Control max-age and client TTL, seconds)
+    agent_card_cache_ttl: int = 300
+    agent_card_fetch_timeout: float = 5.0
+
+    # A2A Task Store: "bounded" (evicting, in memory), "memory" (unbounded SDK store)
+    # or "postgres" (shared by replicas, needs task_store_dsn)
+    task_store_backend: str = "bounded"
+    task_store_max_tasks: int = 1000
+    task_store_max_bytes: int = 64 * 1024 * 1024
+    # Completed, failed, canceled and rejected tasks expire after this many seconds
+    task_store_ttl: float = 3600.0
+    task_store_dsn: Optional[str] = None
+    task_store_table: str = "a2a_tasks"
+    task_store_pool_min_size: int = 1
+    task_store_pool_max_size: int = 10
+    # Working-state updates are batched and written at most this often (seconds)
+    task_store_flush_interval: float = 0.2
+
     # MCP Configuration
     mcp_enabled: bool = True
     mcp_server_name: str = "fhir-server"
+    # "stdio" runs each tool server as a child process; "inprocess" mounts it in this process
+    mcp_transport: str = "stdio"
+    # Long-lived MCP sessions: started with the agent server and shared by requests
+    mcp_persistent_sessions: bool = True
+    # Agent runs that may use an agent's MCP sessions at once (one session per tool server)
+    mcp_max_concurrent_runs: int = 4
+    mcp_health_check_interval: float = 30.0
 
     # Logging Configuration
     log_level: str = "INFO"
     log_format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 
     # Logfire Configuration
+    # Set to false to skip importing and configuring Logfire (faster startup)
+    telemetry_enabled: bool = True
     logfire_token: Optional[str] = None
     logfire_project_name: str = "healthcare-agents-collective"
     logfire_environment: str = "development"
@@ -85,19 +194,19 @@ def get_agent_headers() -> dict:
         "Accept": "application/fhir+json",
         "User-Agent": f"{settings.agent_name}/{settings.agent_version}",
     }
-    
+
     if settings.api_key:
         headers["Authorization"] = f"Bearer {settings.api_key}"
-    
+
     return headers
 
 
 def validate_configuration() -> bool:
     """Validate that required configuration is present."""
     required_vars = ["fhir_base_url"]
-    
+
     for var in required_vars:
         if not getattr(settings, var):
             raise ValueError(f"Required configuration variable '{var}' is missing")
-    
+
     return True
@@ -0,0 +1,112 @@
+"""
+Process-wide Logfire setup.
+
+Logfire is configured once per process by the entry point (``app.py``, a
+standalone agent app or an MCP server's ``__main__``) through
+``configure_telemetry``, rather than at import time in every module that
+happens to use it. Logfire itself is imported lazily, so with
+``TELEMETRY_ENABLED=false`` it is never imported at all.
+
+Modules that want spans use ``span``, which defers to ``logfire.instrument``
+once telemetry is configured and otherwise calls the function directly.
+"""
+
+import functools
+import inspect
+import threading
+from typing import Any, Callable, Optional
+
+from src.core.config import settings
+
+_configured = False
+_lock = threading.Lock()
+
+
+def configure_telemetry(service_name: Optional[str] = None) -> bool:
+    """Configure Logfire and instrument pydantic-ai and httpx, once per process.
+
+    Args:
+        service_name: Name reported for this process, e.g. ``"fhir-mcp"``
+
+    Returns:
+        True when telemetry is configured (now or earlier), False when it is
+        disabled or Logfire is not installed.
+    """
+    global _configured
+
+    if not settings.telemetry_enabled:
+        return False
+    with _lock:
+        if _configured:
+            return True
+        try:
+            import logfire
+        except ModuleNotFoundError:
+            return False
+
+        config: dict[str, Any] = {}
+        if settings.logfire_token:
+            config["token"] = settings.logfire_token
+            config["send_to_logfire"] = True
+            config["project_name"] = settings.logfire_project_name
+            config["environment"] = settings.logfire_environment
+        else:
+            config["send_to_logfire"] = False
+            config["console"] = False  # Disable console output to avoid conflicts
+        if service_name:
+            config["service_name"] = service_name
+        logfire.configure(**config)
+
+        # Capture Pydantic-AI and HTTPX calls which power the agent runtime.
+        # Older versions of Logfire may not have these helpers; skip gracefully.
+        for instrument in ("instrument_pydantic_ai", "instrument_httpx"):
+            try:
+                getattr(logfire, instrument)()
+            except Exception:
+                pass
+
+        _configured = True
+        return True
+
+
+def telemetry_configured() -> bool:
+    return _configured
+
+
+def span(*instrument_args, **instrument_kwargs) -> Callable[[Callable], Callable]:
+    """Lazy ``logfire.instrument``: spans only once telemetry is configured.
+
+    Works for sync and async functions (not generators), and keeps the wrapped
+    signature so tool schemas are unchanged.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        instrumented: Optional[Callable] = None
+
+        def resolve() -> Callable:
+            nonlocal instrumented
+            if not _configured:
+                return func
+            if instrumented is None:
+                import logfire
+
+                instrumented = logfire.instrument(
+                    *instrument_args, **instrument_kwargs
+                )(func)
+            return instrumented
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return await resolve()(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return resolve()(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
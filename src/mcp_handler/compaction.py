@@ -0,0 +1,334 @@
+"""
+Compaction of MCP tool results before they reach the model.
+
+Raw FHIR JSON is mostly structure the model does not need: ``meta``, narrative
+``text``, extensions and deeply nested codings. Every tool result goes through
+``compact_output``, which flattens Bundles and resources into short row-like
+records (code, value, unit, date, status, ...) and then enforces a size budget,
+cutting the longest lists and leaving an explicit ``"truncated, N more"``
+marker so the model knows results were dropped. A result with no list left to
+cut is replaced by a truncated preview, so the budget holds for any result.
+"""
+
+import functools
+import json
+from typing import Any, Awaitable, Callable, Optional
+
+from src.core.config import settings
+
+# Rough size of a token in JSON text; good enough to keep prompts bounded.
+BYTES_PER_TOKEN = 4
+
+_DATE_FIELDS = (
+    "effectiveDateTime",
+    "authoredOn",
+    "recordedDate",
+    "onsetDateTime",
+    "issued",
+    "date",
+)
+
+
+def _concept_text(concept: Optional[dict]) -> Optional[str]:
+    """Readable text of a CodeableConcept: its text, else the first coding."""
+    if not concept:
+        return None
+    if concept.get("text"):
+        return concept["text"]
+    for coding in concept.get("coding", []):
+        if coding.get("display") or coding.get("code"):
+            return coding.get("display") or coding.get("code")
+    return None
+
+
+def _concept_code(concept: Optional[dict]) -> Optional[str]:
+    for coding in (concept or {}).get("coding", []):
+        if coding.get("code"):
+            system = coding.get("system", "").rstrip("/").rsplit("/", 1)[-1]
+            return f"{system}|{coding['code']}" if system else coding["code"]
+    return None
+
+
+def _reference(value: Optional[dict]) -> Optional[str]:
+    return (value or {}).get("reference")
+
+
+def _patient_name(resource: dict) -> Optional[str]:
+    for name in resource.get("name", []):
+        if name.get("text"):
+            return name["text"]
+        full = " ".join([*name.get("given", []), name.get("family", "")]).strip()
+        if full:
+            return full
+    return None
+
+
+def _quantity_text(quantity: Optional[dict]) -> Optional[str]:
+    if not quantity or quantity.get("value") is None:
+        return None
+    unit = quantity.get("unit") or quantity.get("code")
+    comparator = quantity.get("comparator", "")
+    return (
+        f"{comparator}{quantity['value']} {unit}"
+        if unit
+        else f"{comparator}{quantity['value']}"
+    )
+
+
+def _range_text(low: Optional[dict], high: Optional[dict]) -> Optional[str]:
+    low_text, high_text = _quantity_text(low), _quantity_text(high)
+    if low_text and high_text:
+        return f"{low_text} - {high_text}"
+    if low_text:
+        return f">= {low_text}"
+    if high_text:
+        return f"<= {high_text}"
+    return None
+
+
+def _value(element: dict) -> tuple[Any, Optional[str]]:
+    """The ``value[x]`` of an Observation or component as ``(value, unit)``.
+
+    Checks each type for presence rather than truthiness, so ``false`` and
+    ``0`` are kept.
+    """
+    quantity = element.get("valueQuantity")
+    if quantity is not None:
+        return quantity.get("value"), quantity.get("unit") or quantity.get("code")
+    if element.get("valueCodeableConcept") is not None:
+        return _concept_text(element["valueCodeableConcept"]), None
+    for field in (
+        "valueString",
+        "valueBoolean",
+        "valueInteger",
+        "valueDateTime",
+        "valueTime",
+    ):
+        if element.get(field) is not None:
+            return element[field], None
+    if element.get("valueRange") is not None:
+        value_range = element["valueRange"]
+        return _range_text(value_range.get("low"), value_range.get("high")), None
+    if element.get("valueRatio") is not None:
+        ratio = element["valueRatio"]
+        numerator = _quantity_text(ratio.get("numerator"))
+        denominator = _quantity_text(ratio.get("denominator"))
+        return f"{numerator or '?'} / {denominator or '?'}", None
+    if element.get("valuePeriod") is not None:
+        period = element["valuePeriod"]
+        return f"{period.get('start', '')} / {period.get('end', '')}", None
+    return None, None
+
+
+def _reference_range(resource: dict) -> Optional[str]:
+    """The first reference range, as its text or ``low - high``."""
+    for reference_range in resource.get("referenceRange", []):
+        text = reference_range.get("text") or _range_text(
+            reference_range.get("low"), reference_range.get("high")
+        )
+        if text:
+            return text
+    return None
+
+
+def compact_resource(resource: dict) -> dict:
+    """Flatten one FHIR resource into a short record without meta, narrative or extensions."""
+    resource_type = resource.get("resourceType")
+    record: dict[str, Any] = {"type": resource_type, "id": resource.get("id")}
+
+    if resource_type == "Patient":
+        record["name"] = _patient_name(resource)
+        record["gender"] = resource.get("gender")
+        record["birthDate"] = resource.get("birthDate")
+        address = (resource.get("address") or [{}])[0]
+        record["city"] = address.get("city")
+        record["state"] = address.get("state")
+        record["telecom"] = [
+            t.get("value") for t in resource.get("telecom", []) if t.get("value")
+        ] or None
+    else:
+        concept = resource.get("code") or resource.get("medicationCodeableConcept")
+        record["code"] = _concept_text(concept)
+        record["coding"] = _concept_code(concept)
+        record["status"] = resource.get("status") or _concept_text(
+            resource.get("clinicalStatus")
+        )
+        record["category"] = _concept_text((resource.get("category") or [None])[0])
+
+        record["value"], record["unit"] = _value(resource)
+        record["interpretation"] = (
+            ", ".join(
+                filter(None, map(_concept_text, resource.get("interpretation", [])))
+            )
+            or None
+        )
+        record["referenceRange"] = _reference_range(resource)
+        components = []
+        for component in resource.get("component", []):
+            value, unit = _value(component)
+            components.append(
+                {
+                    key: item
+                    for key, item in {
+                        "code": _concept_text(component.get("code")),
+                        "value": value,
+                        "unit": unit,
+                        "interpretation": _concept_text(
+                            (component.get("interpretation") or [None])[0]
+                        ),
+                    }.items()
+                    if item is not None
+                }
+            )
+        record["components"] = components or None
+
+        record["date"] = next(
+            (resource[field] for field in _DATE_FIELDS if resource.get(field)),
+            (resource.get("period") or resource.get("effectivePeriod") or {}).get(
+                "start"
+            ),
+        )
+        record["subject"] = _reference(
+            resource.get("subject") or resource.get("patient")
+        )
+        record["encounter"] = _reference(resource.get("encounter"))
+
+        if resource_type == "Encounter":
+            record["class"] = (resource.get("class") or {}).get("code")
+            record["reason"] = _concept_text((resource.get("reasonCode") or [None])[0])
+        if resource_type == "MedicationRequest":
+            record["dosage"] = (resource.get("dosageInstruction") or [{}])[0].get(
+                "text"
+            )
+            record["intent"] = resource.get("intent")
+
+    return {key: value for key, value in record.items() if value is not None}
+
+
+def compact_bundle(bundle: dict) -> dict:
+    """Turn a searchset Bundle into ``{"total", "count", "records"}``."""
+    records = [
+        compact_resource(entry["resource"])
+        for entry in bundle.get("entry", [])
+        if entry.get("resource")
+    ]
+    compacted: dict[str, Any] = {"count": len(records), "records": records}
+    if bundle.get("total") is not None:
+        compacted = {"total": bundle["total"], **compacted}
+    if bundle.get("truncated"):
+        compacted["truncated"] = True
+    return compacted
+
+
+def _size(value: Any) -> int:
+    return len(json.dumps(value, default=str, separators=(",", ":")))
+
+
+def _drop_tail(items: list, overflow: int) -> tuple[list, int]:
+    """Drop items from the end of a list until about ``overflow`` bytes are saved."""
+    items = list(items)
+    dropped = 0
+    while items and overflow > 0:
+        overflow -= _size(items.pop()) + 1
+        dropped += 1
+    return items, dropped
+
+
+def _shrink(value: Any, budget: int) -> Any:
+    """Trim the lists in ``value``, longest top-level ones first, to fit ``budget`` bytes."""
+    overflow = _size(value) - budget
+    if overflow <= 0:
+        return value
+    if isinstance(value, list):
+        marker = len('"truncated, 000000 more",')
+        items, dropped = _drop_tail(value, overflow + marker)
+        return [*items, f"truncated, {dropped} more"] if dropped else items
+    if not isinstance(value, dict):
+        return value
+
+    result = dict(value)
+    list_keys = sorted(
+        (key for key, item in result.items() if isinstance(item, list) and item),
+        key=lambda key: _size(result[key]),
+        reverse=True,
+    )
+    for key in list_keys:
+        overflow = _size(result) - budget
+        if overflow <= 0:
+            return result
+        result[key], dropped = _drop_tail(result[key], overflow)
+        result[f"{key}_truncated"] = f"truncated, {dropped} more"
+
+    # Then look inside nested objects (and what is left of the lists).
+    nested_keys = sorted(
+        (
+            key
+            for key, item in result.items()
+            if isinstance(item, (dict, list)) and item
+        ),
+        key=lambda key: _size(result[key]),
+        reverse=True,
+    )
+    for key in nested_keys:
+        overflow = _size(result) - budget
+        if overflow <= 0:
+            break
+        result[key] = _shrink(result[key], _size(result[key]) - overflow)
+    return result
+
+
+def enforce_budget(result: Any, max_tokens: int) -> Any:
+    """Trim ``result`` until it fits the token budget.
+
+    The longest top-level lists are cut first, then lists nested deeper. Each
+    cut list gets a ``"truncated, N more"`` marker: a sibling
+    ``<key>_truncated`` key inside objects, a last item in a bare list. A
+    result that still does not fit (e.g. one huge string) is replaced by a
+    ``{"truncated", "preview"}`` object holding the start of its JSON.
+    """
+    budget = max_tokens * BYTES_PER_TOKEN
+    if _size(result) <= budget:
+        return result
+
+    result = _shrink(result, budget)
+    if _size(result) <= budget:
+        return result
+
+    text = json.dumps(result, default=str, separators=(",", ":"))
+    cut = {
+        "truncated": f"result exceeds the {max_tokens}-token budget",
+        "preview": text[:budget],
+    }
+    # Escaping can only grow the text, so dropping the excess converges.
+    while cut["preview"] and _size(cut) > budget:
+        cut["preview"] = cut["preview"][: budget - _size(cut)]
+    return cut
+
+
+def compact_result(result: Any, max_tokens: Optional[int] = None) -> Any:
+    """Compact a tool result (Bundle, resource or plain dict) and apply the budget."""
+    if isinstance(result, dict):
+        if result.get("resourceType") == "Bundle":
+            result = compact_bundle(result)
+        elif result.get("resourceType"):
+            result = compact_resource(result)
+    return enforce_budget(result, max_tokens or settings.tool_result_max_tokens)
+
+
+def compact_output(
+    func: Callable[..., Awaitable[Any]],
+) -> Callable[..., Awaitable[Any]]:
+    """Decorate an async MCP tool so its result goes through ``compact_result``.
+
+    The wrapped signature is preserved for FastMCP's schema generation.
+    Compaction can be switched off with ``TOOL_RESULT_COMPACTION=false``.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        result = await func(*args, **kwargs)
+        if not settings.tool_result_compaction:
+            return result
+        return compact_result(result)
+
+    return wrapper
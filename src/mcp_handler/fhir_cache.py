@@ -0,0 +1,337 @@
+"""
+Read-through cache for FHIR reads made by the MCP tool servers.
+
+An agent run often asks for the same patient, observations or medications
+several times. Reads go through a bounded LRU cache with a TTL, keyed by
+resource type, resource ID and the normalized query. Expired entries are
+revalidated with ``If-None-Match`` so an unchanged resource costs a 304
+instead of a full body, and a cached copy is served (stale) when the FHIR
+server cannot be reached. Writes invalidate every entry for the patient they
+touch.
+
+The cache lives in the tool server's process. With the default stdio transport
+the FHIR and triage tool servers are separate processes, so invalidations are
+also published to an ``InvalidationLog``, a small SQLite file shared by every
+tool server process (``FHIR_CACHE_INVALIDATION_PATH``). Each cache applies the
+other processes' invalidations before it serves a read.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import httpx
+
+from src.core.config import settings
+from src.mcp_handler.fhir_client import get_fhir_client
+
+CacheKey = tuple[str, str, tuple[tuple[str, str], ...]]
+
+
+@dataclass
+class CacheEntry:
+    body: dict
+    etag: Optional[str]
+    stored_at: float
+    patient_id: Optional[str]
+
+
+_INVALIDATIONS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS invalidations (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    patient_id TEXT NOT NULL,
+    pid INTEGER NOT NULL,
+    at REAL NOT NULL
+)
+"""
+
+
+class InvalidationLog:
+    """Patient invalidations shared between processes through a SQLite file.
+
+    The file is opened on first use, so importing a tool server creates
+    nothing on disk. Readers skip the query while the file's modification
+    time is unchanged and more than a second old (coarse timestamps can hide
+    a write made in the same tick), so most reads cost one ``stat`` call.
+    """
+
+    def __init__(self, path: str, retention: float = 600.0):
+        self.path = path
+        self.retention = retention
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._last_seq = 0
+        self._mtime = 0
+
+    def open(self) -> None:
+        """Open the log, if not yet open; later invalidations are then seen by ``poll``."""
+        if self._db is None:
+            with self._lock:
+                self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the log; call with ``_lock`` held."""
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            db = sqlite3.connect(
+                self.path, timeout=5.0, check_same_thread=False, isolation_level=None
+            )
+            db.execute(_INVALIDATIONS_SCHEMA)
+            # Earlier invalidations concern no entry: the cache opens the log
+            # before it stores its first one.
+            self._last_seq = db.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM invalidations"
+            ).fetchone()[0]
+            self._mtime = self._stat()
+            self._db = db
+        return self._db
+
+    def _stat(self) -> int:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return 0
+
+    def publish(self, patient_id: str) -> None:
+        now = time.time()
+        with self._lock:
+            db = self._connect()
+            db.execute(
+                "INSERT INTO invalidations (patient_id, pid, at) VALUES (?, ?, ?)",
+                (patient_id, os.getpid(), now),
+            )
+            db.execute(
+                "DELETE FROM invalidations WHERE at < ?", (now - self.retention,)
+            )
+
+    def poll(self) -> list[str]:
+        """Patients invalidated by other processes since the last poll."""
+        if self._db is None:
+            self.open()
+            return []
+        mtime = self._stat()
+        if mtime == self._mtime and time.time_ns() - mtime > 1_000_000_000:
+            return []
+        with self._lock:
+            self._mtime = mtime
+            rows = self._db.execute(
+                "SELECT seq, patient_id, pid FROM invalidations WHERE seq > ? ORDER BY seq",
+                (self._last_seq,),
+            ).fetchall()
+            if rows:
+                self._last_seq = rows[-1][0]
+        return [patient_id for _, patient_id, pid in rows if pid != os.getpid()]
+
+
+class FHIRResourceCache:
+    """Bounded, thread-safe LRU cache of FHIR read responses."""
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl: float = 60.0,
+        invalidation_log: Optional[InvalidationLog] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.invalidation_log = invalidation_log
+        self._entries: "OrderedDict[CacheKey, CacheEntry]" = OrderedDict()
+        # In-process tool servers may be called from several agent threads.
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.stale_hits = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(
+        resource_type: str,
+        resource_id: Optional[str] = None,
+        params: Optional[dict[str, Any]] = None,
+    ) -> CacheKey:
+        """Key on type, ID and the query with sorted keys and trimmed values."""
+
+        def normalize(value: Any) -> str:
+            # Repeated parameters (e.g. a date range) are order-insensitive.
+            if isinstance(value, (list, tuple)):
+                return ",".join(sorted(str(v).strip() for v in value))
+            return str(value).strip()
+
+        query = tuple(
+            sorted(
+                (str(k).strip(), normalize(v))
+                for k, v in (params or {}).items()
+                if v is not None
+            )
+        )
+        return (resource_type, resource_id or "", query)
+
+    def record(self, *counters: str) -> None:
+        """Increment hit/miss counters such as ``"hits"`` or ``"stale_hits"``."""
+        with self._lock:
+            for counter in counters:
+                setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, key: CacheKey) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return time.monotonic() - entry.stored_at < self.ttl
+
+    def put(
+        self,
+        key: CacheKey,
+        body: dict,
+        etag: Optional[str] = None,
+        patient_id: Optional[str] = None,
+    ) -> None:
+        if self.invalidation_log is not None:
+            self.invalidation_log.open()
+        with self._lock:
+            self._entries[key] = CacheEntry(body, etag, time.monotonic(), patient_id)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def touch(self, key: CacheKey) -> None:
+        """Restart the TTL of an entry that the server confirmed unchanged."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.stored_at = time.monotonic()
+
+    def invalidate_patient(self, patient_id: Optional[str]) -> int:
+        """Drop every entry about a patient; returns how many were removed here.
+
+        The invalidation is also published to the other tool server processes.
+        """
+        if not patient_id:
+            return 0
+        if self.invalidation_log is not None:
+            self.invalidation_log.publish(patient_id)
+        return self._drop_patient(patient_id)
+
+    def sync(self) -> None:
+        """Apply invalidations published by other processes."""
+        if self.invalidation_log is None:
+            return
+        for patient_id in self.invalidation_log.poll():
+            self._drop_patient(patient_id)
+
+    def _drop_patient(self, patient_id: str) -> int:
+        with self._lock:
+            stale_keys = [
+                k for k, e in self._entries.items() if e.patient_id == patient_id
+            ]
+            for key in stale_keys:
+                del self._entries[key]
+            self.invalidations += len(stale_keys)
+            return len(stale_keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "revalidations": self.revalidations,
+                "stale_hits": self.stale_hits,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+resource_cache = FHIRResourceCache(
+    max_entries=settings.fhir_cache_max_entries,
+    ttl=settings.fhir_cache_ttl,
+    invalidation_log=(
+        InvalidationLog(
+            settings.fhir_cache_invalidation_path,
+            retention=max(600.0, 10 * settings.fhir_cache_ttl),
+        )
+        if settings.fhir_cache_enabled and settings.fhir_cache_invalidation_path
+        else None
+    ),
+)
+
+
+async def cached_read(
+    resource_type: str,
+    resource_id: Optional[str] = None,
+    params: Optional[dict[str, Any]] = None,
+    patient_id: Optional[str] = None,
+) -> dict:
+    """Read a resource or search Bundle through the shared cache.
+
+    Args:
+        resource_type: FHIR resource type, e.g. ``"Observation"``
+        resource_id: Logical ID for a read; ``None`` for a search
+        params: Search parameters
+        patient_id: Patient the result belongs to, used for write invalidation
+    """
+    path = f"{resource_type}/{resource_id}" if resource_id else resource_type
+    client = get_fhir_client()
+    if not settings.fhir_cache_enabled:
+        return await client.get(path, params=params)
+
+    cache = resource_cache
+    cache.sync()
+    key = cache.make_key(resource_type, resource_id, params)
+    entry = cache.get(key)
+    if entry is not None and cache.is_fresh(entry):
+        cache.record("hits")
+        return entry.body
+
+    headers = (
+        {"If-None-Match": entry.etag} if entry is not None and entry.etag else None
+    )
+    try:
+        response = await client.request("GET", path, params=params, headers=headers)
+    except (httpx.TransportError, httpx.HTTPStatusError) as e:
+        server_down = (
+            isinstance(e, httpx.TransportError) or e.response.status_code >= 500
+        )
+        if entry is not None and server_down:
+            cache.record("stale_hits")
+            return entry.body
+        raise
+
+    if response.status_code == 304 and entry is not None:
+        cache.record("hits", "revalidations")
+        cache.touch(key)
+        return entry.body
+
+    cache.record("misses")
+    body = response.json()
+    cache.put(key, body, response.headers.get("ETag"), patient_id)
+    return body
+
+
+def patient_id_of(resource: dict) -> Optional[str]:
+    """Return the patient a resource is (or refers to), if any."""
+    if resource.get("resourceType") == "Patient":
+        return resource.get("id")
+    for field in ("subject", "patient"):
+        reference = (resource.get(field) or {}).get("reference", "")
+        if reference.startswith("Patient/"):
+            return reference.split("/", 1)[1]
+    return None
@@ -0,0 +1,183 @@
+"""
+Shared async HTTP client for the FHIR-backed MCP tool servers.
+
+All tools talk to the same FHIR server, so they share one pooled
+``httpx.AsyncClient`` (keep-alive, optional HTTP/2, bounded concurrency and the
+standard agent headers) instead of opening a connection per call. Pools are
+bound to an event loop, so one client is kept per running loop; this matters
+when the tool servers are mounted in-process by agents on different threads.
+"""
+
+import asyncio
+import weakref
+from typing import Any, AsyncIterator, Callable, Optional
+
+import httpx
+
+from src.core.config import get_agent_headers, settings
+
+# HTTP/2 multiplexing needs the optional ``h2`` package (``httpx[http2]``).
+try:
+    import h2  # noqa: F401
+
+    _HTTP2_AVAILABLE = True
+except ModuleNotFoundError:
+    _HTTP2_AVAILABLE = False
+
+
+class FHIRClient:
+    """Thin async wrapper over a pooled ``httpx.AsyncClient`` for a FHIR base URL."""
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+    ):
+        self.base_url = (base_url or settings.fhir_base_url).strip().rstrip("/")
+        self._client = httpx.AsyncClient(
+            base_url=f"{self.base_url}/",
+            headers=get_agent_headers(),
+            timeout=timeout or settings.fhir_http_timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections or settings.fhir_max_connections,
+                max_keepalive_connections=settings.fhir_max_keepalive_connections,
+                keepalive_expiry=settings.fhir_keepalive_expiry,
+            ),
+            http2=settings.fhir_http2 and _HTTP2_AVAILABLE,
+        )
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Optional[dict[str, Any]] = None,
+        json: Optional[dict[str, Any]] = None,
+        headers: Optional[dict[str, str]] = None,
+    ) -> httpx.Response:
+        """Send a request relative to the base URL (absolute URLs pass through)."""
+        response = await self._client.request(
+            method, path, params=params, json=json, headers=headers
+        )
+        # 304 only answers a conditional request; the caller holds the body.
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response
+
+    async def get(self, path: str, params: Optional[dict[str, Any]] = None) -> dict:
+        """GET a resource or search Bundle and return its JSON body."""
+        response = await self.request("GET", path, params=params)
+        return response.json()
+
+    async def post(self, path: str, resource: dict[str, Any]) -> dict:
+        """POST a resource and return the server's JSON response."""
+        response = await self.request("POST", path, json=resource)
+        return response.json()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, FHIRClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_fhir_client() -> FHIRClient:
+    """Return the shared FHIR client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = FHIRClient()
+        _clients[loop] = client
+    return client
+
+
+def logical_id(location: str) -> Optional[str]:
+    """Logical ID from a Location header or transaction-response location (Type/id/_history/n)."""
+    parts = location.split("/_history")[0].rstrip("/").split("/")
+    return parts[-1] if len(parts) > 1 else None
+
+
+def next_link(bundle: dict) -> Optional[str]:
+    """Return the ``link[rel=next]`` URL of a searchset Bundle, if any."""
+    for link in bundle.get("link", []):
+        if link.get("relation") == "next" and link.get("url"):
+            return link["url"]
+    return None
+
+
+def _is_match(entry: dict) -> bool:
+    # ``_include``d resources have search.mode "include" and do not count
+    # towards result caps.
+    return entry.get("search", {}).get("mode", "match") == "match"
+
+
+async def iter_bundle_pages(first_page: dict) -> AsyncIterator[dict]:
+    """Yield a searchset Bundle and then each following page, fetched lazily.
+
+    Only the current page is held in memory. Paging stops quietly if the
+    server has expired the search (404/410 on a next link).
+    """
+    page: Optional[dict] = first_page
+    while page is not None:
+        yield page
+        url = next_link(page)
+        if url is None:
+            return
+        try:
+            page = await get_fhir_client().get(url)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code in (404, 410):
+                return
+            raise
+
+
+async def iter_bundle_entries(
+    first_page: dict,
+    limit: Optional[int] = None,
+    stop: Optional[Callable[[dict], bool]] = None,
+) -> AsyncIterator[dict]:
+    """Yield the entries of a search across all of its pages.
+
+    Args:
+        first_page: The first searchset Bundle (its ``_count`` sets the page size)
+        limit: Stop after this many matched entries (included resources are
+            still yielded but not counted)
+        stop: Predicate called on each entry; paging ends once it returns True
+    """
+    matched = 0
+    async for page in iter_bundle_pages(first_page):
+        for entry in page.get("entry", []):
+            if _is_match(entry):
+                if limit is not None and matched >= limit:
+                    return
+                matched += 1
+            yield entry
+            if stop is not None and stop(entry):
+                return
+        # Do not fetch another page once the cap is reached.
+        if limit is not None and matched >= limit:
+            return
+
+
+async def collect_bundle(
+    first_page: dict,
+    limit: Optional[int] = None,
+    stop: Optional[Callable[[dict], bool]] = None,
+) -> dict:
+    """Gather a paged search into a single searchset Bundle of at most ``limit`` matches."""
+    entries = [entry async for entry in iter_bundle_entries(first_page, limit, stop)]
+    matched = sum(1 for entry in entries if _is_match(entry))
+    total = first_page.get("total")
+    bundle = {
+        "resourceType": "Bundle",
+        "type": "searchset",
+        "entry": entries,
+    }
+    if total is not None:
+        bundle["total"] = total
+    if total is not None and total > matched:
+        bundle["truncated"] = True
+    return bundle
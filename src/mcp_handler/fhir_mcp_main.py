@@ -1,89 +1,355 @@
 import asyncio
+from typing import List, Optional
+
 from mcp.server.fastmcp import FastMCP
-import os
-import requests
 
 from src.agents.fhir_agent.search_planner import (
     ConditionSearchPlan,
+    plan_cache,
     plan_condition_search,
 )
+from src.agents.fhir_agent.terminology import get_terminology_index
 
 from src.core.config import settings
-import logfire
-
-logfire.configure()
-logfire.instrument_pydantic_ai()
+from src.mcp_handler.compaction import compact_output
+from src.mcp_handler.fhir_cache import cached_read, patient_id_of, resource_cache
+from src.mcp_handler.fhir_client import collect_bundle, get_fhir_client
+from src.mcp_handler.write_queue import WriteBehindQueue
 
-DEFAULT_TIMEOUT = settings.fhir_http_timeout
+# Journal for write_resource when FHIR_WRITE_BEHIND is enabled
+write_queue = WriteBehindQueue("fhir")
 
-FHIR_SERVER_URL = settings.fhir_base_url.strip()
+# Initialize local MCP server instance; its lifespan flushes writes journalled by an earlier run
+mcp = FastMCP("FHIR-MCP", lifespan=write_queue.lifespan)
 
-# Initialize local MCP server instance
-mcp = FastMCP("FHIR-MCP")
 
 @mcp.tool()
-def find_patient(patient_id: str) -> dict:
+@compact_output
+async def find_patient(patient_id: str) -> dict:
     """Retrieve a FHIR Patient resource by ID."""
-    url = f"{FHIR_SERVER_URL}/Patient/{patient_id}"
-    response = requests.get(url, timeout=DEFAULT_TIMEOUT)
-    response.raise_for_status()
-    return response.json()
+    return await cached_read("Patient", patient_id, patient_id=patient_id)
+
 
 @mcp.tool()
-def find_patient_by_name(first_name: str, last_name: str) -> dict:
+@compact_output
+async def find_patient_by_name(first_name: str, last_name: str) -> dict:
     """Search for a patient by first and last name."""
-    url = f"{FHIR_SERVER_URL}/Patient?given={first_name}&family={last_name}"
-    response = requests.get(url, timeout=DEFAULT_TIMEOUT)
-    response.raise_for_status()
-    return response.json()
+    return await get_fhir_client().get(
+        "Patient", params={"given": first_name, "family": last_name}
+    )
+
+
+def _patient_search_params(
+    patient_id: str,
+    date_param: str,
+    category: Optional[str] = None,
+    code: Optional[str] = None,
+    status: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    sort: Optional[str] = None,
+    elements: Optional[List[str]] = None,
+    summary: Optional[str] = None,
+    page_size: Optional[int] = None,
+) -> dict:
+    """Build FHIR search parameters so the server filters and trims results."""
+    params: dict = {
+        "patient": patient_id,
+        "_count": page_size or settings.fhir_page_size,
+    }
+    if category:
+        params["category"] = category
+    if code:
+        params["code"] = code
+    if status:
+        params["status"] = status
+    date_range = [f"ge{date_from}"] if date_from else []
+    if date_to:
+        date_range.append(f"le{date_to}")
+    if date_range:
+        params[date_param] = date_range
+    if sort:
+        params["_sort"] = sort
+    if elements:
+        params["_elements"] = ",".join(elements)
+    elif summary:
+        params["_summary"] = summary
+    return params
+
 
 @mcp.tool()
-def find_observations_by_patient_id(patient_id: str) -> dict:
-    """Retrieve all Observation resources for a given patient."""
-    url = f"{FHIR_SERVER_URL}/Observation?patient={patient_id}"
-    response = requests.get(url, timeout=DEFAULT_TIMEOUT)
-    response.raise_for_status()
-    return response.json()
+@compact_output
+async def find_observations_by_patient_id(
+    patient_id: str,
+    category: Optional[str] = None,
+    code: Optional[str] = None,
+    status: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    sort: Optional[str] = None,
+    elements: Optional[List[str]] = None,
+    summary: Optional[str] = None,
+    page_size: Optional[int] = None,
+    max_results: Optional[int] = None,
+) -> dict:
+    """Retrieve Observation resources for a given patient.
+
+    Narrow the search on the server to keep responses small:
+    ``category`` (e.g. "vital-signs", "laboratory"), ``code`` (e.g.
+    "http://loinc.org|4548-4" or "4548-4"), ``status`` (e.g. "final"),
+    ``date_from``/``date_to`` (YYYY-MM-DD, inclusive), ``sort`` (e.g. "-date"
+    for newest first), ``elements`` to return only some fields (e.g.
+    ["code", "valueQuantity", "effectiveDateTime"]) or ``summary``
+    ("true", "data", "count").
+
+    Follows the search's next links page by page (``page_size`` entries per
+    request) until ``max_results`` observations have been collected.
+    """
+    params = _patient_search_params(
+        patient_id,
+        "date",
+        category,
+        code,
+        status,
+        date_from,
+        date_to,
+        sort,
+        elements,
+        summary,
+        page_size,
+    )
+    first_page = await cached_read("Observation", params=params, patient_id=patient_id)
+    return await collect_bundle(
+        first_page, limit=max_results or settings.fhir_max_results
+    )
+
 
 @mcp.tool()
-def find_medication_requests_by_patient_id(patient_id: str) -> dict:
-    """Retrieve all MedicationRequest resources for a given patient."""
-    url = f"{FHIR_SERVER_URL}/MedicationRequest?patient={patient_id}"
-    response = requests.get(url, timeout=DEFAULT_TIMEOUT)
-    response.raise_for_status()
-    return response.json()
+@compact_output
+async def find_medication_requests_by_patient_id(
+    patient_id: str,
+    category: Optional[str] = None,
+    code: Optional[str] = None,
+    status: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    sort: Optional[str] = None,
+    elements: Optional[List[str]] = None,
+    summary: Optional[str] = None,
+    page_size: Optional[int] = None,
+    max_results: Optional[int] = None,
+) -> dict:
+    """Retrieve MedicationRequest resources for a given patient.
+
+    Narrow the search on the server to keep responses small:
+    ``category`` (e.g. "outpatient"), ``code`` (medication code, e.g. an
+    RxNorm code), ``status`` (e.g. "active"), ``date_from``/``date_to``
+    (authored on, YYYY-MM-DD, inclusive), ``sort`` (e.g. "-authoredon"),
+    ``elements`` to return only some fields (e.g.
+    ["medicationCodeableConcept", "status", "authoredOn"]) or ``summary``
+    ("true", "data", "count").
+
+    Follows the search's next links page by page (``page_size`` entries per
+    request) until ``max_results`` medication requests have been collected.
+    """
+    params = _patient_search_params(
+        patient_id,
+        "authoredon",
+        category,
+        code,
+        status,
+        date_from,
+        date_to,
+        sort,
+        elements,
+        summary,
+        page_size,
+    )
+    first_page = await cached_read(
+        "MedicationRequest", params=params, patient_id=patient_id
+    )
+    return await collect_bundle(
+        first_page, limit=max_results or settings.fhir_max_results
+    )
+
+
+async def _search_conditions(term: str, max_results: int) -> dict:
+    """Run one Condition text search, including the referenced patients.
+
+    Pages through the results until ``max_results`` conditions are found.
+    """
+    params = {
+        "code:text": term,
+        "_include": "Condition:subject",
+        "_count": min(max_results, settings.fhir_page_size),
+    }
+    first_page = await get_fhir_client().get("Condition", params=params)
+    return await collect_bundle(first_page, limit=max_results)
+
+
+async def _first_hit_sequential(
+    terms: list[str], max_results: int
+) -> tuple[dict, list[str]]:
+    """Try terms one at a time, stopping at the first with results."""
+    payload: dict = {}
+    matched_term = terms[0]
+    for term in terms:
+        payload = await _search_conditions(term, max_results)
+        matched_term = term
+        if payload.get("total", 0):
+            break
+    return payload, [matched_term]
+
+
+async def _first_hit_concurrent(
+    terms: list[str], max_results: int
+) -> tuple[dict, list[str]]:
+    """Query every term at once but keep the planner's priority order.
+
+    Results are awaited in term order, so a lower-priority hit never beats a
+    higher-priority one. As soon as a term has hits, the lower-priority
+    queries still in flight are cancelled.
+    """
+    searches = [
+        asyncio.ensure_future(_search_conditions(term, max_results)) for term in terms
+    ]
+    payload: dict = {}
+    matched_term = terms[0]
+    try:
+        for term, search in zip(terms, searches):
+            payload = await search
+            matched_term = term
+            if payload.get("total", 0):
+                break
+    finally:
+        for search in searches:
+            search.cancel()
+    return payload, [matched_term]
+
+
+async def _merge_all_terms(
+    terms: list[str], max_results: int
+) -> tuple[dict, list[str]]:
+    """Query every term at once and merge the hits, deduplicated by resource."""
+    payloads = await asyncio.gather(
+        *(_search_conditions(term, max_results) for term in terms)
+    )
+    entries = []
+    seen: set[tuple[str, str]] = set()
+    matched_terms = []
+    for term, payload in zip(terms, payloads):
+        if payload.get("total", 0) or payload.get("entry"):
+            matched_terms.append(term)
+        for entry in payload.get("entry", []):
+            resource = entry.get("resource", {})
+            key = (resource.get("resourceType", ""), resource.get("id", ""))
+            if key in seen:
+                continue
+            seen.add(key)
+            entries.append(entry)
+    total = sum(1 for resource_type, _ in seen if resource_type == "Condition")
+    return {"total": total, "entry": entries}, matched_terms or [terms[0]]
+
+
+_CONDITION_SEARCHES = {
+    "sequential": _first_hit_sequential,
+    "concurrent": _first_hit_concurrent,
+    "merge": _merge_all_terms,
+}
+
+
+def _condition_hits(payload: dict) -> int:
+    return sum(
+        1
+        for entry in payload.get("entry", [])
+        if entry.get("resource", {}).get("resourceType") == "Condition"
+    )
+
+
+async def _plan_with_speculation(
+    condition_text: str, max_results: int, min_hits: int
+) -> tuple[Optional[ConditionSearchPlan], Optional[dict], Optional[int]]:
+    """Race a raw-text Condition search against the planner.
+
+    Returns ``(plan, payload, speculative_hits)``; ``speculative_hits`` is
+    ``None`` if the planner finished first. When the raw search
+    finishes first with at least ``min_hits`` conditions, the planner is
+    cancelled and ``plan`` is ``None``. Otherwise the raw search is dropped
+    and ``payload`` is ``None``, so the caller searches with the plan.
+    """
+    planning = asyncio.ensure_future(plan_condition_search(condition_text))
+    speculative = asyncio.ensure_future(_search_conditions(condition_text, max_results))
+    try:
+        await asyncio.wait({planning, speculative}, return_when=asyncio.FIRST_COMPLETED)
+        if speculative.done():
+            payload = speculative.result() if not speculative.exception() else {}
+            hits = _condition_hits(payload)
+            if hits >= min_hits:
+                return None, payload, hits
+        else:
+            hits = None
+        return await planning, None, hits
+    finally:
+        planning.cancel()
+        speculative.cancel()
+
 
 @mcp.tool()
-async def find_patients_by_condition(condition_text: str, max_results: int = 20) -> dict:
+@compact_output
+async def find_patients_by_condition(
+    condition_text: str,
+    max_results: int = 20,
+    search_mode: Optional[str] = None,
+    speculative: Optional[bool] = None,
+) -> dict:
     """Find patients who have conditions matching the provided text.
 
     This uses an LLM-backed planner to derive optimal search terms before querying
     the FHIR endpoint. The original user text is preserved in the summary for
     provenance.
+
+    ``search_mode`` controls how the planner's terms are tried:
+    ``"sequential"`` queries one term at a time, ``"concurrent"`` queries all
+    terms at once and returns the highest-priority term with hits, and
+    ``"merge"`` returns the deduplicated hits of every term (better recall).
+    Defaults to the ``CONDITION_SEARCH_MODE`` setting.
+
+    With ``speculative`` (default ``CONDITION_SPECULATIVE_SEARCH``) the raw
+    ``condition_text`` is searched while the planner runs; if that search
+    returns first with enough hits it is used and the planner is cancelled.
+    ``summary.search_path`` records whether the ``"speculative"`` or the
+    ``"planner"`` path produced the result.
     """
 
-    plan: ConditionSearchPlan = await plan_condition_search(condition_text)
-
-    search_terms = plan.search_terms if plan.search_terms else [condition_text]
-
-    payload = {}
-    matched_term = search_terms[0]
-    for term in search_terms:
-        params = {
-            "code:text": term,
-            "_include": "Condition:subject",
-            "_count": max_results,
-        }
-        url = f"{FHIR_SERVER_URL}/Condition"
-        def _do_request() -> dict:
-            response = requests.get(url, params=params, timeout=DEFAULT_TIMEOUT)
-            response.raise_for_status()
-            return response.json()
-
-        payload = await asyncio.to_thread(_do_request)
-        matched_term = term
-        if payload.get("total", 0):
-            break
+    mode = (search_mode or settings.condition_search_mode).lower()
+    if mode not in _CONDITION_SEARCHES:
+        mode = "sequential"
+
+    if (
+        speculative
+        if speculative is not None
+        else settings.condition_speculative_search
+    ):
+        plan, payload, speculative_hits = await _plan_with_speculation(
+            condition_text, max_results, settings.condition_speculative_min_hits
+        )
+    else:
+        plan, payload, speculative_hits = (
+            await plan_condition_search(condition_text),
+            None,
+            None,
+        )
+
+    if payload is not None:
+        search_path = "speculative"
+        matched_terms = [condition_text]
+    else:
+        search_path = "planner"
+        search_terms = plan.search_terms if plan.search_terms else [condition_text]
+        payload, matched_terms = await _CONDITION_SEARCHES[mode](
+            search_terms, max_results
+        )
+    matched_term = matched_terms[0]
 
     condition_entries = []
     patient_records: dict[str, dict] = {}
@@ -140,20 +406,53 @@ async def find_patients_by_condition(condition_text: str, max_results: int = 20)
             "total_conditions": payload.get("total", 0),
             "patients_found": len(unique_refs),
             "matched_search_term": matched_term,
-            "search_plan": plan.model_dump(mode="json"),
+            "matched_search_terms": matched_terms,
+            "search_mode": mode,
+            "search_path": search_path,
+            "speculative_hits": speculative_hits,
+            "search_plan": plan.model_dump(mode="json") if plan is not None else None,
         },
         "patients": unique_refs,
         "conditions": condition_entries,
     }
 
+
+@mcp.tool()
+@compact_output
+async def write_resource(resource_type: str, resource: dict) -> dict:
+    """Write a new FHIR resource (e.g., Observation, DiagnosticReport) to the server.
+
+    In write-behind mode the resource is queued and returned at once with a
+    provisional ``pending-...`` ID; check it with ``fhir_write_status``.
+    """
+    if settings.fhir_write_behind:
+        return await write_queue.enqueue(
+            resource_type, resource, patient_id_of(resource)
+        )
+    created = await get_fhir_client().post(resource_type, resource)
+    resource_cache.invalidate_patient(patient_id_of(resource) or patient_id_of(created))
+    return created
+
+
 @mcp.tool()
-def write_resource(resource_type: str, resource: dict) -> dict:
-    """Write a new FHIR resource (e.g., Observation, DiagnosticReport) to the server."""
-    url = f"{FHIR_SERVER_URL}/{resource_type}"
-    headers = {"Content-Type": "application/fhir+json"}
-    response = requests.post(url, headers=headers, json=resource, timeout=DEFAULT_TIMEOUT)
-    response.raise_for_status()
-    return response.json()
+async def fhir_write_status(provisional_id: Optional[str] = None) -> dict:
+    """Report pending and failed write-behind writes, or the state of one provisional ID."""
+    return await write_queue.status(provisional_id)
+
+
+@mcp.tool()
+def fhir_cache_stats() -> dict:
+    """Report hit/miss counters and size of the FHIR read and search plan caches."""
+    index = get_terminology_index()
+    return {
+        **resource_cache.stats(),
+        "search_plans": plan_cache.stats(),
+        "terminology": index.stats() if index is not None else None,
+    }
+
 
 if __name__ == "__main__":
+    from src.core.telemetry import configure_telemetry
+
+    configure_telemetry("fhir-mcp")
     mcp.run(transport="stdio")
@@ -2,23 +2,48 @@
 MCP server configuration for FHIR integration.
 
 This module provides the MCP server configuration for connecting to FHIR servers.
+Set ``MCP_TRANSPORT=inprocess`` to mount the tool server in the agent's process
+instead of spawning it as a stdio child process.
 """
 
 import os
 import sys
-from pydantic_ai.mcp import MCPServerStdio
+from pydantic_ai.mcp import MCPServer, MCPServerStdio
 
+from src.agents.common.response_cache import record_writes
 from src.core.config import settings
 
 # Pull the FHIR endpoint from configuration
 fhir_server_url = settings.fhir_base_url
 
-# Create MCP server for FHIR using the real launcher module.
-server = MCPServerStdio(
-    command=sys.executable,
-    args=["-m", "src.mcp_handler.fhir_mcp_main"],
-    env={
-        "FHIR_SERVER_URL": fhir_server_url.rstrip("/"),
-        "FHIR_VERSION": os.getenv("FHIR_VERSION", "R4"),
-    },
-)
\ No newline at end of file
+# Tools that change data; calling one keeps the agent run out of the response cache
+WRITE_TOOLS = frozenset({"write_resource"})
+
+
+def create_stdio_server() -> MCPServerStdio:
+    """Run the FHIR tools in a child process reached over stdio."""
+    return MCPServerStdio(
+        command=sys.executable,
+        args=["-m", "src.mcp_handler.fhir_mcp_main"],
+        env={
+            "FHIR_SERVER_URL": fhir_server_url.rstrip("/"),
+            "FHIR_VERSION": os.getenv("FHIR_VERSION", "R4"),
+        },
+        process_tool_call=record_writes(WRITE_TOOLS),
+    )
+
+
+def create_inprocess_server() -> MCPServer:
+    """Mount the FHIR FastMCP instance in this process."""
+    from src.mcp_handler.fhir_mcp_main import mcp
+    from src.mcp_handler.mcp_inprocess import MCPServerInProcess
+
+    return MCPServerInProcess(mcp, process_tool_call=record_writes(WRITE_TOOLS))
+
+
+# Create MCP server for FHIR using the configured transport.
+server = (
+    create_inprocess_server()
+    if settings.mcp_transport == "inprocess"
+    else create_stdio_server()
+)
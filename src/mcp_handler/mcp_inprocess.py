@@ -0,0 +1,50 @@
+"""
+In-process MCP transport for the FastMCP tool servers.
+
+``MCPServerStdio`` reaches a tool server through a child process, paying for
+JSON serialization over a pipe and a process hop on every call. When the agents
+and tool servers share one Python process (as they do under ``app.py``), this
+transport runs the FastMCP server on in-memory streams in the caller's event
+loop instead. The MCP protocol is unchanged, so agents cannot tell the
+difference; as over stdio, an unexpected handler error is returned to the
+agent as an MCP error rather than ending the session.
+"""
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import anyio
+from mcp.server.fastmcp import FastMCP
+from mcp.shared.memory import create_client_server_memory_streams
+from pydantic_ai.mcp import MCPServer
+
+
+class MCPServerInProcess(MCPServer):
+    """Serve a FastMCP instance to pydantic-ai over in-memory streams."""
+
+    def __init__(self, mcp_server: FastMCP, **kwargs):
+        self.mcp_server = mcp_server
+        super().__init__(**kwargs)
+
+    @asynccontextmanager
+    async def client_streams(self) -> AsyncIterator[tuple]:
+        lowlevel_server = self.mcp_server._mcp_server
+        async with create_client_server_memory_streams() as (
+            client_streams,
+            server_streams,
+        ):
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(
+                    lambda: lowlevel_server.run(
+                        server_streams[0],
+                        server_streams[1],
+                        lowlevel_server.create_initialization_options(),
+                    )
+                )
+                try:
+                    yield client_streams
+                finally:
+                    tg.cancel_scope.cancel()
+
+    def __repr__(self) -> str:
+        return f"MCPServerInProcess({self.mcp_server.name!r})"
@@ -2,24 +2,56 @@
 MCP server configuration for Triage agent.
 
 This module provides the MCP server configuration for the healthcare triage system.
+Set ``MCP_TRANSPORT=inprocess`` to mount the tool server in the agent's process
+instead of spawning it as a stdio child process.
 """
 
 import os
 import sys
-from pydantic_ai.mcp import MCPServerStdio
+from pydantic_ai.mcp import MCPServer, MCPServerStdio
 
+from src.agents.common.response_cache import record_writes
 from src.core.config import settings
 
 # Pull the FHIR endpoint from configuration
 fhir_server_url = settings.fhir_base_url
 
-# Triage MCP server
-server = MCPServerStdio(
-    command=sys.executable,
-    args=["-m", "src.mcp_handler.triage_mcp_server"],
-    env={
-        "FHIR_SERVER_URL": fhir_server_url.rstrip("/"),
-        "TRIAGE_MODE": "healthcare",
-        "FHIR_INTEGRATION": "true"
+# Tools that change data; calling one keeps the agent run out of the response cache
+WRITE_TOOLS = frozenset(
+    {
+        "create_patient",
+        "create_encounter",
+        "create_observation",
+        "document_triage",
     }
-)
\ No newline at end of file
+)
+
+
+def create_stdio_server() -> MCPServerStdio:
+    """Run the triage tools in a child process reached over stdio."""
+    return MCPServerStdio(
+        command=sys.executable,
+        args=["-m", "src.mcp_handler.triage_mcp_server"],
+        env={
+            "FHIR_SERVER_URL": fhir_server_url.rstrip("/"),
+            "TRIAGE_MODE": "healthcare",
+            "FHIR_INTEGRATION": "true",
+        },
+        process_tool_call=record_writes(WRITE_TOOLS),
+    )
+
+
+def create_inprocess_server() -> MCPServer:
+    """Mount the triage FastMCP instance in this process."""
+    from src.mcp_handler.mcp_inprocess import MCPServerInProcess
+    from src.mcp_handler.triage_mcp_server import mcp
+
+    return MCPServerInProcess(mcp, process_tool_call=record_writes(WRITE_TOOLS))
+
+
+# Triage MCP server, using the configured transport
+server = (
+    create_inprocess_server()
+    if settings.mcp_transport == "inprocess"
+    else create_stdio_server()
+)
@@ -1,83 +1,94 @@
-import os
-import requests
+import uuid
 from datetime import datetime
 from typing import Optional, List, Dict, Any
+from urllib.parse import urlencode
+
+import httpx
 from mcp.server.fastmcp import FastMCP
+from pydantic import BaseModel, Field
 
 from src.core.config import settings
-import logfire
+from src.mcp_handler.compaction import compact_output
+from src.mcp_handler.fhir_cache import cached_read, resource_cache
+from src.mcp_handler.fhir_client import collect_bundle, get_fhir_client, logical_id
+from src.mcp_handler.write_queue import WriteBehindQueue
 
-logfire.configure()
+# Journal for the create_* tools when FHIR_WRITE_BEHIND is enabled
+write_queue = WriteBehindQueue("triage")
 
-# Initialize FastMCP server
-mcp = FastMCP("Triage-MCP")
+# Initialize FastMCP server; its lifespan flushes writes journalled by an earlier run
+mcp = FastMCP("Triage-MCP", lifespan=write_queue.lifespan)
 
-DEFAULT_TIMEOUT = settings.fhir_http_timeout
-FHIR_SERVER_URL = settings.fhir_base_url.strip()
 
 @mcp.tool()
-def search_patient(name: str, birth_date: Optional[str] = None) -> Dict[str, Any]:
+@compact_output
+async def search_patient(
+    name: str,
+    birth_date: Optional[str] = None,
+    page_size: Optional[int] = None,
+    max_results: Optional[int] = None,
+) -> Dict[str, Any]:
     """
     Search for a patient by name and optionally birth date.
-    
+
     Args:
         name: Patient's name (first or last)
         birth_date: Optional birth date in YYYY-MM-DD format
+        page_size: Patients requested per page of results
+        max_results: Stop paging once this many patients are found
     """
-    params = {"name": name}
+    params = {"name": name, "_count": page_size or settings.fhir_page_size}
     if birth_date:
         params["birthdate"] = birth_date
-        
-    url = f"{FHIR_SERVER_URL}/Patient"
-    response = requests.get(url, params=params, timeout=DEFAULT_TIMEOUT)
-    response.raise_for_status()
-    return response.json()
+
+    first_page = await get_fhir_client().get("Patient", params=params)
+    return await collect_bundle(
+        first_page, limit=max_results or settings.fhir_max_results
+    )
+
 
 @mcp.tool()
-def get_patient(patient_id: str) -> Dict[str, Any]:
+@compact_output
+async def get_patient(patient_id: str) -> Dict[str, Any]:
     """
     Retrieve a patient by their FHIR ID.
-    
+
     Args:
         patient_id: The logical ID of the patient
     """
-    url = f"{FHIR_SERVER_URL}/Patient/{patient_id}"
-    response = requests.get(url, timeout=DEFAULT_TIMEOUT)
-    response.raise_for_status()
-    return response.json()
+    return await cached_read("Patient", patient_id, patient_id=patient_id)
 
-@mcp.tool()
-def create_patient(
+
+class SymptomObservation(BaseModel):
+    """A symptom to record as an Observation in ``document_triage``."""
+
+    code_text: str = Field(
+        ..., description='Description of the symptom (e.g., "Abdominal pain")'
+    )
+    value_string: Optional[str] = Field(
+        default=None, description="Text result, e.g. severity or duration"
+    )
+    value_quantity: Optional[Dict[str, Any]] = Field(
+        default=None, description="Quantity result (value, unit)"
+    )
+
+
+def _patient_resource(
     first_name: str,
     last_name: str,
     birth_date: str,
     gender: str,
     address: Optional[Dict[str, str]] = None,
-    telecom: Optional[List[Dict[str, str]]] = None
+    telecom: Optional[List[Dict[str, str]]] = None,
 ) -> Dict[str, Any]:
-    """
-    Create a new Patient resource.
-    
-    Args:
-        first_name: Given name
-        last_name: Family name
-        birth_date: Date of birth (YYYY-MM-DD)
-        gender: male | female | other | unknown
-        address: Optional address dict (line, city, state, postalCode)
-        telecom: Optional list of contact details (system, value, use)
-    """
     resource = {
         "resourceType": "Patient",
-        "name": [{
-            "use": "official",
-            "family": last_name,
-            "given": [first_name]
-        }],
+        "name": [{"use": "official", "family": last_name, "given": [first_name]}],
         "gender": gender,
         "birthDate": birth_date,
-        "active": True
+        "active": True,
     }
-    
+
     if address:
         addr_obj = {
             "use": "home",
@@ -85,72 +96,142 @@ def create_patient(
             "city": address.get("city", ""),
             "state": address.get("state", ""),
             "postalCode": address.get("postalCode", ""),
-            "country": address.get("country", "US")
+            "country": address.get("country", "US"),
         }
         resource["address"] = [addr_obj]
-        
+
     if telecom:
         resource["telecom"] = telecom
+    return resource
+
+
+def _encounter_resource(
+    patient_reference: str,
+    status: str = "triaged",
+    class_code: str = "EMER",
+    reason: Optional[str] = None,
+) -> Dict[str, Any]:
+    resource = {
+        "resourceType": "Encounter",
+        "status": status,
+        "class": {
+            "system": "http://terminology.hl7.org/CodeSystem/v3-ActCode",
+            "code": class_code,
+        },
+        "subject": {"reference": patient_reference},
+        "period": {"start": datetime.now().isoformat()},
+    }
+
+    if reason:
+        resource["reasonCode"] = [{"text": reason}]
+    return resource
+
+
+def _observation_resource(
+    patient_reference: str,
+    code_text: str,
+    value_string: Optional[str] = None,
+    value_quantity: Optional[Dict[str, Any]] = None,
+    encounter_reference: Optional[str] = None,
+) -> Dict[str, Any]:
+    resource = {
+        "resourceType": "Observation",
+        "status": "preliminary",
+        "category": [
+            {
+                "coding": [
+                    {
+                        "system": "http://terminology.hl7.org/CodeSystem/observation-category",
+                        "code": "exam",
+                        "display": "Exam",
+                    }
+                ]
+            }
+        ],
+        "code": {"text": code_text},
+        "subject": {"reference": patient_reference},
+        "effectiveDateTime": datetime.now().isoformat(),
+    }
+
+    if encounter_reference:
+        resource["encounter"] = {"reference": encounter_reference}
+
+    if value_string:
+        resource["valueString"] = value_string
+    elif value_quantity:
+        resource["valueQuantity"] = value_quantity
+    return resource
 
-    url = f"{FHIR_SERVER_URL}/Patient"
-    headers = {"Content-Type": "application/fhir+json"}
-    response = requests.post(url, headers=headers, json=resource, timeout=DEFAULT_TIMEOUT)
-    response.raise_for_status()
-    return response.json()
 
 @mcp.tool()
-def create_encounter(
+@compact_output
+async def create_patient(
+    first_name: str,
+    last_name: str,
+    birth_date: str,
+    gender: str,
+    address: Optional[Dict[str, str]] = None,
+    telecom: Optional[List[Dict[str, str]]] = None,
+) -> Dict[str, Any]:
+    """
+    Create a new Patient resource.
+
+    Args:
+        first_name: Given name
+        last_name: Family name
+        birth_date: Date of birth (YYYY-MM-DD)
+        gender: male | female | other | unknown
+        address: Optional address dict (line, city, state, postalCode)
+        telecom: Optional list of contact details (system, value, use)
+    """
+    resource = _patient_resource(
+        first_name, last_name, birth_date, gender, address, telecom
+    )
+    if settings.fhir_write_behind:
+        return await write_queue.enqueue("Patient", resource)
+    created = await get_fhir_client().post("Patient", resource)
+    resource_cache.invalidate_patient(created.get("id"))
+    return created
+
+
+@mcp.tool()
+@compact_output
+async def create_encounter(
     patient_id: str,
     status: str = "triaged",
     class_code: str = "EMER",
-    reason: Optional[str] = None
+    reason: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     Create a new Encounter resource.
-    
+
     Args:
         patient_id: Reference to the patient
         status: planned | arrived | triaged | in-progress | onleave | finished | cancelled
         class_code: AMB (ambulatory) | EMER (emergency) | IMP (inpatient)
         reason: Reason for the encounter
     """
-    resource = {
-        "resourceType": "Encounter",
-        "status": status,
-        "class": {
-            "system": "http://terminology.hl7.org/CodeSystem/v3-ActCode",
-            "code": class_code
-        },
-        "subject": {
-            "reference": f"Patient/{patient_id}"
-        },
-        "period": {
-            "start": datetime.now().isoformat()
-        }
-    }
-    
-    if reason:
-        resource["reasonCode"] = [{
-            "text": reason
-        }]
+    patient_id = await write_queue.resolve_id(patient_id)
+    resource = _encounter_resource(f"Patient/{patient_id}", status, class_code, reason)
+    if settings.fhir_write_behind:
+        return await write_queue.enqueue("Encounter", resource, patient_id)
+    created = await get_fhir_client().post("Encounter", resource)
+    resource_cache.invalidate_patient(patient_id)
+    return created
 
-    url = f"{FHIR_SERVER_URL}/Encounter"
-    headers = {"Content-Type": "application/fhir+json"}
-    response = requests.post(url, headers=headers, json=resource, timeout=DEFAULT_TIMEOUT)
-    response.raise_for_status()
-    return response.json()
 
 @mcp.tool()
-def create_observation(
+@compact_output
+async def create_observation(
     patient_id: str,
     code_text: str,
     value_string: Optional[str] = None,
     value_quantity: Optional[Dict[str, Any]] = None,
-    encounter_id: Optional[str] = None
+    encounter_id: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     Create a new Observation resource (e.g., for symptoms).
-    
+
     Args:
         patient_id: Reference to the patient
         code_text: Description of the observation (e.g., "Abdominal pain")
@@ -158,40 +239,171 @@ def create_observation(
         value_quantity: Quantity result (value, unit)
         encounter_id: Optional reference to the encounter
     """
-    resource = {
-        "resourceType": "Observation",
-        "status": "preliminary",
-        "category": [{
-            "coding": [{
-                "system": "http://terminology.hl7.org/CodeSystem/observation-category",
-                "code": "exam",
-                "display": "Exam"
-            }]
-        }],
-        "code": {
-            "text": code_text
+    patient_id = await write_queue.resolve_id(patient_id)
+    if encounter_id:
+        encounter_id = await write_queue.resolve_id(encounter_id)
+    resource = _observation_resource(
+        f"Patient/{patient_id}",
+        code_text,
+        value_string,
+        value_quantity,
+        f"Encounter/{encounter_id}" if encounter_id else None,
+    )
+    if settings.fhir_write_behind:
+        return await write_queue.enqueue("Observation", resource, patient_id)
+    created = await get_fhir_client().post("Observation", resource)
+    resource_cache.invalidate_patient(patient_id)
+    return created
+
+
+def _transaction_error(result: Any, expected_entries: int) -> Optional[Dict[str, Any]]:
+    """Structured error unless ``result`` is a complete transaction-response Bundle."""
+    if not isinstance(result, dict):
+        return {"error": "Unexpected FHIR transaction response", "issues": []}
+    if result.get("resourceType") == "OperationOutcome":
+        issues = [
+            issue.get("diagnostics")
+            or (issue.get("details") or {}).get("text")
+            or issue.get("code")
+            for issue in result.get("issue", [])
+        ]
+        return {"error": "FHIR transaction failed", "issues": [i for i in issues if i]}
+    entries = result.get("entry")
+    if result.get("resourceType") != "Bundle" or not isinstance(entries, list):
+        return {
+            "error": f"Unexpected FHIR transaction response: {result.get('resourceType')}",
+            "issues": [],
+        }
+    if len(entries) != expected_entries:
+        return {
+            "error": f"FHIR transaction returned {len(entries)} of {expected_entries} entries",
+            "issues": [],
+        }
+    return None
+
+
+@mcp.tool()
+@compact_output
+async def document_triage(
+    first_name: str,
+    last_name: str,
+    birth_date: str,
+    gender: str,
+    symptoms: List[SymptomObservation],
+    address: Optional[Dict[str, str]] = None,
+    telecom: Optional[List[Dict[str, str]]] = None,
+    encounter_status: str = "triaged",
+    class_code: str = "EMER",
+    reason: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Record a whole triage in one FHIR transaction: the patient, the encounter
+    and one Observation per symptom. Prefer this over separate search/create
+    calls.
+
+    The patient is created only if no patient with the same name and birth
+    date exists (conditional create); otherwise the existing one is used.
+
+    Args:
+        first_name: Given name
+        last_name: Family name
+        birth_date: Date of birth (YYYY-MM-DD)
+        gender: male | female | other | unknown
+        symptoms: Symptoms to record (code_text plus value_string or value_quantity)
+        address: Optional address dict (line, city, state, postalCode)
+        telecom: Optional list of contact details (system, value, use)
+        encounter_status: planned | arrived | triaged | in-progress | onleave | finished | cancelled
+        class_code: AMB (ambulatory) | EMER (emergency) | IMP (inpatient)
+        reason: Reason for the encounter
+    """
+    patient_url = f"urn:uuid:{uuid.uuid4()}"
+    encounter_url = f"urn:uuid:{uuid.uuid4()}"
+    entries = [
+        {
+            "fullUrl": patient_url,
+            "resource": _patient_resource(
+                first_name, last_name, birth_date, gender, address, telecom
+            ),
+            "request": {
+                "method": "POST",
+                "url": "Patient",
+                "ifNoneExist": urlencode(
+                    {"family": last_name, "given": first_name, "birthdate": birth_date}
+                ),
+            },
         },
-        "subject": {
-            "reference": f"Patient/{patient_id}"
+        {
+            "fullUrl": encounter_url,
+            "resource": _encounter_resource(
+                patient_url, encounter_status, class_code, reason
+            ),
+            "request": {"method": "POST", "url": "Encounter"},
         },
-        "effectiveDateTime": datetime.now().isoformat()
+    ]
+    for symptom in symptoms:
+        entries.append(
+            {
+                "fullUrl": f"urn:uuid:{uuid.uuid4()}",
+                "resource": _observation_resource(
+                    patient_url,
+                    symptom.code_text,
+                    symptom.value_string,
+                    symptom.value_quantity,
+                    encounter_url,
+                ),
+                "request": {"method": "POST", "url": "Observation"},
+            }
+        )
+
+    bundle = {"resourceType": "Bundle", "type": "transaction", "entry": entries}
+    # Transactions are posted to the server's base URL.
+    try:
+        result = await get_fhir_client().post("", bundle)
+    except httpx.HTTPStatusError as e:
+        # A rejected transaction comes back as a 4xx/5xx with an OperationOutcome.
+        try:
+            result = e.response.json()
+        except ValueError:
+            result = None
+        if not isinstance(result, dict) or (
+            result.get("resourceType") != "OperationOutcome"
+        ):
+            return {
+                "error": f"FHIR transaction failed with HTTP {e.response.status_code}",
+                "issues": [],
+            }
+
+    if error := _transaction_error(result, len(entries)):
+        return error
+
+    responses = [entry.get("response") or {} for entry in result["entry"]]
+    patient_response, encounter_response, *observation_responses = responses
+    patient_id = logical_id(patient_response.get("location", ""))
+    resource_cache.invalidate_patient(patient_id)
+    return {
+        "patient_id": patient_id,
+        "patient_created": patient_response.get("status", "").startswith("201"),
+        "encounter_id": logical_id(encounter_response.get("location", "")),
+        "observation_ids": [
+            logical_id(response.get("location", ""))
+            for response in observation_responses
+        ],
     }
-    
-    if encounter_id:
-        resource["encounter"] = {
-            "reference": f"Encounter/{encounter_id}"
-        }
-        
-    if value_string:
-        resource["valueString"] = value_string
-    elif value_quantity:
-        resource["valueQuantity"] = value_quantity
 
-    url = f"{FHIR_SERVER_URL}/Observation"
-    headers = {"Content-Type": "application/fhir+json"}
-    response = requests.post(url, headers=headers, json=resource, timeout=DEFAULT_TIMEOUT)
-    response.raise_for_status()
-    return response.json()
+
+@mcp.tool()
+async def fhir_write_status(provisional_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Report pending and failed write-behind writes, or the state of one provisional ID.
+
+    Args:
+        provisional_id: Optional ``pending-...`` ID returned by a create tool
+    """
+    return await write_queue.status(provisional_id)
+
 
 if __name__ == "__main__":
+    from src.core.telemetry import configure_telemetry
+
+    configure_telemetry("triage-mcp")
     mcp.run(transport="stdio")
@@ -0,0 +1,393 @@
+"""
+Durable write-behind queue for FHIR writes made by the MCP tool servers.
+
+With ``FHIR_WRITE_BEHIND=true`` a write tool journals the resource in a local
+SQLite file and returns a provisional ID (``pending-<hex>``) at once, instead
+of blocking the agent run on the FHIR server. A background worker flushes the
+journal as FHIR ``batch`` Bundles:
+
+* each write carries an idempotency identifier and is sent as a conditional
+  create, so a retried write never creates a duplicate;
+* at most one write per patient is in a batch, and a patient's writes are sent
+  in the order they were made, so dependent writes (an Encounter for a new
+  Patient) go after the resource they reference;
+* references to provisional IDs are rewritten to the server IDs once the
+  referenced write is flushed;
+* transport errors, 429 and 5xx are retried with backoff, other errors mark
+  the write as failed. A write waiting out its backoff holds back the later
+  writes for the same patient.
+
+Journal access runs in a worker thread so it never blocks the event loop.
+Use ``lifespan`` as the tool server's FastMCP lifespan so writes left in the
+journal by an earlier run are flushed as soon as the server starts.
+``status()`` reports pending and failed writes for the status tools.
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, AsyncIterator, Optional
+
+import httpx
+
+from src.core.config import settings
+from src.mcp_handler.fhir_cache import resource_cache
+from src.mcp_handler.fhir_client import get_fhir_client, logical_id
+
+IDEMPOTENCY_SYSTEM = "urn:ietf:rfc:3986"
+PENDING_TAG_SYSTEM = "https://health-agents-collective/write-behind"
+_PROVISIONAL_ID = re.compile(r"pending-[0-9a-f]{32}")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS writes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    provisional_id TEXT UNIQUE NOT NULL,
+    idempotency_key TEXT UNIQUE NOT NULL,
+    patient_key TEXT,
+    resource_type TEXT NOT NULL,
+    body TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    server_id TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+class WriteBehindQueue:
+    """SQLite-journalled FHIR write queue with a background flush worker."""
+
+    def __init__(
+        self,
+        name: str,
+        path: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+    ):
+        self.path = path or os.path.join(
+            settings.fhir_write_journal_dir, f"{name}-writes.sqlite3"
+        )
+        self.batch_size = batch_size or settings.fhir_write_batch_size
+        self.max_attempts = max_attempts or settings.fhir_write_max_attempts
+        self.flush_interval = flush_interval or settings.fhir_write_flush_interval
+        self._db: Optional[sqlite3.Connection] = None
+        # Tool calls may arrive from several agent threads when mounted in-process.
+        self._lock = threading.Lock()
+        self._worker: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    # -------------------- Journal --------------------
+
+    def _execute(self, sql: str, params: tuple = ()) -> list[sqlite3.Row]:
+        with self._lock:
+            if self._db is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                db = sqlite3.connect(
+                    self.path, check_same_thread=False, isolation_level=None
+                )
+                db.row_factory = sqlite3.Row
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute(_SCHEMA)
+                # Writes that were being sent when the process stopped are retried.
+                db.execute(
+                    "UPDATE writes SET status = 'pending' WHERE status = 'inflight'"
+                )
+                self._db = db
+            return self._db.execute(sql, params).fetchall()
+
+    async def _run(self, sql: str, params: tuple = ()) -> list[sqlite3.Row]:
+        return await asyncio.to_thread(self._execute, sql, params)
+
+    async def enqueue(
+        self, resource_type: str, resource: dict, patient_id: Optional[str] = None
+    ) -> dict:
+        """Journal a write and return the resource with its provisional ID."""
+        key = uuid.uuid4().hex
+        provisional_id = f"pending-{key}"
+        resource = {**resource, "resourceType": resource_type}
+        resource["identifier"] = [
+            *resource.get("identifier", []),
+            {"system": IDEMPOTENCY_SYSTEM, "value": f"urn:uuid:{uuid.UUID(key)}"},
+        ]
+        if resource_type == "Patient":
+            patient_id = provisional_id
+        now = time.time()
+        await self._run(
+            "INSERT INTO writes (provisional_id, idempotency_key, patient_key, resource_type,"
+            " body, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                provisional_id,
+                key,
+                patient_id,
+                resource_type,
+                json.dumps(resource),
+                now,
+                now,
+            ),
+        )
+        self._ensure_worker()
+        return {
+            **resource,
+            "id": provisional_id,
+            "meta": {"tag": [{"system": PENDING_TAG_SYSTEM, "code": "pending"}]},
+        }
+
+    async def resolve_id(self, resource_id: str) -> str:
+        """Map a provisional ID to its server ID once flushed (else return it unchanged)."""
+        if not _PROVISIONAL_ID.fullmatch(resource_id or ""):
+            return resource_id
+        rows = await self._run(
+            "SELECT server_id FROM writes WHERE provisional_id = ?", (resource_id,)
+        )
+        return rows[0]["server_id"] if rows and rows[0]["server_id"] else resource_id
+
+    async def status(self, provisional_id: Optional[str] = None) -> dict[str, Any]:
+        """Counts by state plus details of pending and failed writes."""
+        return await asyncio.to_thread(self._status, provisional_id)
+
+    def _status(self, provisional_id: Optional[str]) -> dict[str, Any]:
+        columns = "provisional_id, resource_type, status, attempts, last_error, server_id, created_at"
+        if provisional_id:
+            rows = self._execute(
+                f"SELECT {columns} FROM writes WHERE provisional_id = ?",
+                (provisional_id,),
+            )
+            return (
+                dict(rows[0])
+                if rows
+                else {"provisional_id": provisional_id, "status": "unknown"}
+            )
+
+        counts = {
+            row["status"]: row["n"]
+            for row in self._execute(
+                "SELECT status, COUNT(*) AS n FROM writes GROUP BY status"
+            )
+        }
+        outstanding = self._execute(
+            f"SELECT {columns} FROM writes WHERE status IN ('pending', 'inflight', 'failed')"
+            " ORDER BY id LIMIT 50"
+        )
+        return {
+            "pending": counts.get("pending", 0) + counts.get("inflight", 0),
+            "failed": counts.get("failed", 0),
+            "done": counts.get("done", 0),
+            "writes": [dict(row) for row in outstanding],
+        }
+
+    # -------------------- Flushing --------------------
+
+    @contextlib.asynccontextmanager
+    async def lifespan(self, _server: Any) -> AsyncIterator[None]:
+        """FastMCP lifespan: flush journalled writes from the start, stop on exit."""
+        await self.start()
+        try:
+            yield
+        finally:
+            await self.stop()
+
+    async def start(self) -> None:
+        """Start the flush worker if the journal holds writes from an earlier run."""
+        if not os.path.exists(self.path):
+            return
+        rows = await self._run(
+            "SELECT 1 FROM writes WHERE status IN ('pending', 'inflight') LIMIT 1"
+        )
+        if rows:
+            self._ensure_worker()
+
+    async def stop(self) -> None:
+        """Stop the flush worker; unsent writes stay journalled for the next start."""
+        worker, self._worker = self._worker, None
+        if (
+            worker is None
+            or worker.done()
+            or worker.get_loop() is not asyncio.get_running_loop()
+        ):
+            return
+        worker.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await worker
+
+    def _ensure_worker(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if (
+            self._worker is None
+            or self._worker.done()
+            or self._worker.get_loop() is not loop
+        ):
+            self._wakeup = asyncio.Event()
+            self._worker = loop.create_task(self._flush_loop())
+        self._wakeup.set()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                sent = await self.flush()
+            except Exception as e:
+                print(f"[WriteBehind] flush failed: {e!s}")
+                sent = 0
+            if sent:
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _resolve_references(self, row: sqlite3.Row) -> Optional[dict]:
+        """Swap provisional IDs for server IDs; ``None`` while one is not flushed yet.
+
+        A write that references a failed write fails too.
+        """
+        body = row["body"]
+        for provisional_id in set(_PROVISIONAL_ID.findall(body)):
+            if provisional_id == row["provisional_id"]:
+                continue
+            referenced = self._execute(
+                "SELECT status, server_id FROM writes WHERE provisional_id = ?",
+                (provisional_id,),
+            )
+            if referenced and referenced[0]["status"] == "failed":
+                self._reschedule(
+                    row, f"Referenced write {provisional_id} failed", retryable=False
+                )
+                return None
+            if not referenced or not referenced[0]["server_id"]:
+                return None
+            body = body.replace(provisional_id, referenced[0]["server_id"])
+        return json.loads(body)
+
+    def _reschedule(self, row: sqlite3.Row, error: str, retryable: bool = True) -> None:
+        attempts = row["attempts"] + 1
+        failed = not retryable or attempts >= self.max_attempts
+        self._execute(
+            "UPDATE writes SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ?,"
+            " updated_at = ? WHERE id = ?",
+            (
+                "failed" if failed else "pending",
+                attempts,
+                time.time() + min(60.0, 2.0**attempts),
+                error,
+                time.time(),
+                row["id"],
+            ),
+        )
+
+    def _claim_batch(self) -> list[tuple[sqlite3.Row, dict]]:
+        """Pick the next writes to send and mark them in flight."""
+        rows = self._execute(
+            "SELECT * FROM writes WHERE status = 'pending' ORDER BY id"
+        )
+        now = time.time()
+        batch: list[tuple[sqlite3.Row, dict]] = []
+        blocked_patients: set[str] = set()
+        for row in rows:
+            # A patient's earliest pending write goes first; while it waits (for
+            # its backoff or a referenced write) the patient's later writes wait
+            # too, and one write per patient per batch keeps them in order.
+            patient_key = row["patient_key"] or f"write-{row['id']}"
+            if patient_key in blocked_patients:
+                continue
+            blocked_patients.add(patient_key)
+            if row["next_attempt_at"] > now:
+                continue
+            resource = self._resolve_references(row)
+            if resource is None:
+                continue
+            batch.append((row, resource))
+            if len(batch) >= self.batch_size:
+                break
+        if batch:
+            placeholders = ",".join("?" for _ in batch)
+            self._execute(
+                f"UPDATE writes SET status = 'inflight' WHERE id IN ({placeholders})",
+                tuple(row["id"] for row, _ in batch),
+            )
+        return batch
+
+    def _record_results(
+        self, batch: list[tuple[sqlite3.Row, dict]], result: dict
+    ) -> None:
+        entries = result.get("entry", [])
+        for index, (row, resource) in enumerate(batch):
+            response = (
+                entries[index].get("response", {}) if index < len(entries) else {}
+            )
+            status = response.get("status", "")
+            if status.startswith("2"):
+                server_id = logical_id(response.get("location", ""))
+                self._execute(
+                    "UPDATE writes SET status = 'done', server_id = ?, last_error = NULL,"
+                    " updated_at = ? WHERE id = ?",
+                    (server_id, time.time(), row["id"]),
+                )
+                patient_ref = (resource.get("subject") or {}).get("reference", "")
+                resource_cache.invalidate_patient(
+                    server_id
+                    if row["resource_type"] == "Patient"
+                    else patient_ref.split("/")[-1]
+                )
+            else:
+                # A missing entry response is treated like a server error.
+                retryable = not status or status.startswith(("5", "429"))
+                outcome = response.get("outcome", {}).get("issue", [{}])[0]
+                self._reschedule(
+                    row, f"{status} {outcome.get('diagnostics', '')}".strip(), retryable
+                )
+
+    def _reschedule_batch(
+        self, batch: list[tuple[sqlite3.Row, dict]], error: str, retryable: bool
+    ) -> None:
+        for row, _ in batch:
+            self._reschedule(row, error, retryable)
+
+    async def flush(self) -> int:
+        """Send one batch of ready writes; returns how many were attempted."""
+        batch = await asyncio.to_thread(self._claim_batch)
+        if not batch:
+            return 0
+
+        bundle = {
+            "resourceType": "Bundle",
+            "type": "batch",
+            "entry": [
+                {
+                    "resource": resource,
+                    "request": {
+                        "method": "POST",
+                        "url": row["resource_type"],
+                        "ifNoneExist": (
+                            f"identifier={IDEMPOTENCY_SYSTEM}|urn:uuid:{uuid.UUID(row['idempotency_key'])}"
+                        ),
+                    },
+                }
+                for row, resource in batch
+            ],
+        }
+
+        try:
+            result = await get_fhir_client().post("", bundle)
+        except (httpx.TransportError, httpx.HTTPStatusError) as e:
+            # A 4xx other than 429 rejects the Bundle itself; resending cannot help.
+            retryable = isinstance(e, httpx.TransportError) or (
+                e.response.status_code == 429 or e.response.status_code >= 500
+            )
+            await asyncio.to_thread(self._reschedule_batch, batch, str(e), retryable)
+            return len(batch)
+
+        await asyncio.to_thread(self._record_results, batch, result)
+        return len(batch)
@@ -0,0 +1,11 @@
+import pytest
+
+from src.mcp_handler import fhir_cache
+
+
+@pytest.fixture(autouse=True)
+def invalidation_log(tmp_path, monkeypatch):
+    """Keep the shared FHIR cache's invalidation log out of the working directory."""
+    log = fhir_cache.InvalidationLog(str(tmp_path / "fhir_invalidations.sqlite3"))
+    monkeypatch.setattr(fhir_cache.resource_cache, "invalidation_log", log)
+    return log
@@ -0,0 +1,19 @@
+"""Minimal stdio MCP server for the session pool tests; writes its PID to argv[1]."""
+
+import os
+import sys
+
+from mcp.server.fastmcp import FastMCP
+
+mcp = FastMCP("Echo-MCP")
+
+
+@mcp.tool()
+def echo(text: str) -> str:
+    return text
+
+
+if __name__ == "__main__":
+    with open(sys.argv[1], "w") as pid_file:
+        pid_file.write(str(os.getpid()))
+    mcp.run()
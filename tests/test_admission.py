@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from src.agents.common.admission import AdmissionController, AgentBusyError
+
+
+async def test_requests_queue_behind_a_full_controller():
+    controller = AdmissionController(max_concurrent=1, max_queue=1)
+    order = []
+
+    async def run(name: str) -> None:
+        async with controller.admit():
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(run("a"), run("b"))
+
+    assert order == ["a", "b"]
+    assert controller.stats()["admitted"] == 2
+    assert controller.stats()["max_wait_ms"] > 0
+
+
+async def test_rejects_when_the_queue_is_full():
+    controller = AdmissionController(max_concurrent=1, max_queue=0)
+
+    async with controller.admit():
+        with pytest.raises(AgentBusyError) as busy:
+            async with controller.admit():
+                pass
+
+    assert busy.value.retry_after >= 1
+    assert controller.stats()["rejected"] == 1
+    assert controller.stats()["active"] == 0
+
+
+async def test_rejects_after_the_queue_timeout():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=0.01)
+
+    async with controller.admit():
+        with pytest.raises(AgentBusyError):
+            async with controller.admit():
+                pass
+
+    assert controller.stats()["queue_depth"] == 0
+    async with controller.admit():  # the slot is free again
+        pass
+    assert controller.stats()["admitted"] == 2
@@ -0,0 +1,129 @@
+import pytest
+
+from src.mcp_handler.compaction import (
+    BYTES_PER_TOKEN,
+    _size,
+    compact_resource,
+    enforce_budget,
+)
+
+
+def test_result_within_budget_is_unchanged():
+    result = {"patients": [{"id": "1"}], "total": 1}
+    assert enforce_budget(result, max_tokens=1000) is result
+
+
+def test_bare_list_is_trimmed_with_marker():
+    result = [{"id": str(i)} for i in range(1000)]
+
+    trimmed = enforce_budget(result, max_tokens=50)
+
+    assert _size(trimmed) <= 50 * BYTES_PER_TOKEN
+    assert trimmed[:-1] == result[: len(trimmed) - 1]
+    assert trimmed[-1] == f"truncated, {1001 - len(trimmed)} more"
+
+
+def test_longest_list_is_trimmed_to_fit_with_marker():
+    result = {
+        "observations": [{"id": str(i), "value": "x" * 50} for i in range(100)],
+        "conditions": [{"id": "c1"}],
+        "patient": "Jane Doe",
+    }
+
+    trimmed = enforce_budget(result, max_tokens=500)
+
+    assert _size(trimmed) <= 500 * BYTES_PER_TOKEN + 64
+    kept = len(trimmed["observations"])
+    assert 0 < kept < 100
+    assert trimmed["observations"] == result["observations"][:kept]
+    assert trimmed["observations_truncated"] == f"truncated, {100 - kept} more"
+    assert trimmed["conditions"] == result["conditions"]
+    assert "conditions_truncated" not in trimmed
+    # The input is not modified.
+    assert len(result["observations"]) == 100
+
+
+@pytest.mark.parametrize(
+    "result",
+    [
+        {"patient": {"observations": [{"value": "x" * 50} for _ in range(100)]}},
+        {"summary": {"matched_terms": ["term"] * 200, "note": "n"}, "records": []},
+        {"narrative": "x" * 10_000},
+        "x" * 10_000,
+    ],
+    ids=["nested-list", "nested-dict", "long-string", "bare-string"],
+)
+def test_budget_holds_for_nested_and_non_list_results(result):
+    trimmed = enforce_budget(result, max_tokens=100)
+
+    assert _size(trimmed) <= 100 * BYTES_PER_TOKEN
+    assert "truncated" in str(trimmed)
+
+
+def test_nested_list_is_trimmed_in_place():
+    result = {"patient": {"id": "1", "observations": list(range(500))}}
+
+    trimmed = enforce_budget(result, max_tokens=100)
+
+    assert trimmed["patient"]["id"] == "1"
+    assert trimmed["patient"]["observations_truncated"].startswith("truncated, ")
+
+
+def test_false_and_zero_values_are_kept():
+    pregnant = {
+        "resourceType": "Observation",
+        "code": {"text": "Pregnant"},
+        "valueBoolean": False,
+    }
+    count = {
+        "resourceType": "Observation",
+        "code": {"text": "Falls"},
+        "valueInteger": 0,
+    }
+
+    assert compact_resource(pregnant)["value"] is False
+    assert compact_resource(count)["value"] == 0
+
+
+def test_lab_result_keeps_interpretation_and_reference_range():
+    observation = {
+        "resourceType": "Observation",
+        "code": {"text": "Potassium"},
+        "valueQuantity": {"value": 6.1, "unit": "mmol/L"},
+        "interpretation": [{"coding": [{"code": "H", "display": "High"}]}],
+        "referenceRange": [
+            {
+                "low": {"value": 3.5, "unit": "mmol/L"},
+                "high": {"value": 5.1, "unit": "mmol/L"},
+            }
+        ],
+    }
+
+    record = compact_resource(observation)
+
+    assert record["value"] == 6.1 and record["unit"] == "mmol/L"
+    assert record["interpretation"] == "High"
+    assert record["referenceRange"] == "3.5 mmol/L - 5.1 mmol/L"
+
+
+@pytest.mark.parametrize(
+    "field, value, expected",
+    [
+        ("valueRange", {"low": {"value": 1, "unit": "h"}}, ">= 1 h"),
+        (
+            "valueRatio",
+            {"numerator": {"value": 1}, "denominator": {"value": 128}},
+            "1 / 128",
+        ),
+        ("valueDateTime", "2024-05-01", "2024-05-01"),
+        (
+            "valuePeriod",
+            {"start": "2024-05-01", "end": "2024-05-03"},
+            "2024-05-01 / 2024-05-03",
+        ),
+    ],
+)
+def test_other_value_types_are_kept(field, value, expected):
+    observation = {"resourceType": "Observation", "code": {"text": "x"}, field: value}
+
+    assert compact_resource(observation)["value"] == expected
@@ -0,0 +1,100 @@
+import subprocess
+import sys
+
+from src.mcp_handler.fhir_cache import FHIRResourceCache, InvalidationLog
+
+
+def test_make_key_ignores_param_order_and_whitespace():
+    key = FHIRResourceCache.make_key(
+        "Observation", params={"patient": " 123", "code": ["b", "a"], "date": None}
+    )
+    assert key == FHIRResourceCache.make_key(
+        "Observation", params={"code": ["a", "b"], "patient": "123"}
+    )
+
+
+def test_lru_eviction():
+    cache = FHIRResourceCache(max_entries=2)
+    keys = [FHIRResourceCache.make_key("Patient", str(i)) for i in range(3)]
+    cache.put(keys[0], {"id": "0"})
+    cache.put(keys[1], {"id": "1"})
+    cache.get(keys[0])  # most recently used now
+    cache.put(keys[2], {"id": "2"})
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]).body == {"id": "0"}
+    assert cache.evictions == 1
+
+
+def test_ttl_and_touch(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("src.mcp_handler.fhir_cache.time.monotonic", lambda: now[0])
+    cache = FHIRResourceCache(ttl=10.0)
+    key = FHIRResourceCache.make_key("Patient", "1")
+    cache.put(key, {"id": "1"}, etag='W/"1"')
+
+    now[0] += 11
+    entry = cache.get(key)
+    assert not cache.is_fresh(entry)
+    cache.touch(key)
+    assert cache.is_fresh(cache.get(key))
+
+
+def test_invalidate_patient_drops_only_that_patient():
+    cache = FHIRResourceCache()
+    cache.put(FHIRResourceCache.make_key("Patient", "1"), {}, patient_id="1")
+    cache.put(
+        FHIRResourceCache.make_key("Observation", params={"patient": "1"}),
+        {},
+        patient_id="1",
+    )
+    cache.put(FHIRResourceCache.make_key("Patient", "2"), {}, patient_id="2")
+
+    assert cache.invalidate_patient("1") == 2
+    assert cache.stats()["entries"] == 1
+    assert cache.invalidate_patient(None) == 0
+
+
+def test_invalidations_from_another_process_are_applied(tmp_path):
+    path = str(tmp_path / "invalidations.sqlite3")
+    cache = FHIRResourceCache(invalidation_log=InvalidationLog(path))
+    key = FHIRResourceCache.make_key("Patient", "1")
+    cache.put(key, {"id": "1"}, patient_id="1")
+    cache.put(FHIRResourceCache.make_key("Patient", "2"), {"id": "2"}, patient_id="2")
+
+    subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys; from src.mcp_handler.fhir_cache import InvalidationLog;"
+            "InvalidationLog(sys.argv[1]).publish('1')",
+            path,
+        ],
+        check=True,
+    )
+    cache.sync()
+
+    assert cache.get(key) is None
+    assert cache.stats()["entries"] == 1
+    assert cache.invalidations == 1
+
+
+def test_own_invalidations_are_not_applied_twice(tmp_path):
+    cache = FHIRResourceCache(
+        invalidation_log=InvalidationLog(str(tmp_path / "invalidations.sqlite3"))
+    )
+    cache.put(FHIRResourceCache.make_key("Patient", "1"), {}, patient_id="1")
+
+    assert cache.invalidate_patient("1") == 1
+    cache.sync()
+    assert cache.invalidations == 1
+
+
+def test_invalidation_log_is_created_on_first_use(tmp_path):
+    path = tmp_path / "cache" / "invalidations.sqlite3"
+    cache = FHIRResourceCache(invalidation_log=InvalidationLog(str(path)))
+    assert not path.parent.exists()
+
+    cache.sync()
+
+    assert path.exists()
@@ -0,0 +1,14 @@
+from src.agents import launcher
+from src.agents.launcher import AgentProcess, check_workers
+
+
+def test_multiple_workers_need_the_postgres_task_store(monkeypatch):
+    monkeypatch.setattr(launcher.settings, "fhir_agent_workers", 4)
+    processes = [AgentProcess("fhir"), AgentProcess("triage")]
+
+    monkeypatch.setattr(launcher.settings, "task_store_backend", "bounded")
+    errors = check_workers(processes)
+    assert len(errors) == 1 and errors[0].startswith("fhir agent: 4 workers")
+
+    monkeypatch.setattr(launcher.settings, "task_store_backend", "postgres")
+    assert check_workers(processes) == []
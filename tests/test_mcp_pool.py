@@ -0,0 +1,73 @@
+import asyncio
+import os
+import signal
+import sys
+from pathlib import Path
+
+from pydantic_ai.mcp import MCPServerStdio
+
+from src.agents.common.mcp_pool import MCPSessionPool
+
+
+def echo_server(pid_file: Path) -> MCPServerStdio:
+    return MCPServerStdio(
+        command=sys.executable,
+        args=[str(Path(__file__).with_name("mcp_echo_server.py")), str(pid_file)],
+        cwd=os.getcwd(),
+    )
+
+
+async def test_restart_from_another_task_after_child_dies(tmp_path):
+    pid_file = tmp_path / "pid"
+    server = echo_server(pid_file)
+    pool = MCPSessionPool([server], health_check_interval=0, health_check_timeout=5)
+    started = asyncio.Event()
+    shutdown = asyncio.Event()
+
+    async def lifespan():
+        # Mirrors the server lifespan: start, serve until shutdown, stop.
+        await pool.start()
+        started.set()
+        await shutdown.wait()
+        await pool.stop()
+
+    lifespan_task = asyncio.create_task(lifespan())
+    await started.wait()
+    first_pid = int(pid_file.read_text())
+
+    os.kill(first_pid, signal.SIGKILL)
+    await asyncio.sleep(0.2)
+
+    # The health check loop runs in its own task.
+    assert await asyncio.create_task(pool.check()) is False
+    assert pool.restarts == 1
+    assert pool.is_running
+    assert int(pid_file.read_text()) != first_pid
+
+    async with pool.lease():
+        tools = await server.list_tools()
+    assert [tool.name for tool in tools] == ["echo"]
+
+    shutdown.set()
+    await asyncio.wait_for(lifespan_task, 10)
+    assert not server.is_running
+
+
+async def test_leases_are_bounded_by_max_concurrent_runs(tmp_path):
+    pool = MCPSessionPool(
+        [echo_server(tmp_path / "pid")], max_concurrent_runs=2, health_check_interval=0
+    )
+    await pool.start()
+    active = peak = 0
+
+    async def run():
+        nonlocal active, peak
+        async with pool.lease():
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.05)
+            active -= 1
+
+    await asyncio.gather(*(run() for _ in range(5)))
+    await pool.stop()
+    assert peak == 2
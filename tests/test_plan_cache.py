@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+from pydantic import BaseModel
+
+from src.agents.fhir_agent.plan_cache import PlanCache, normalize_condition_text
+
+
+class Plan(BaseModel):
+    terms: list[str]
+
+
+def test_normalize_condition_text():
+    assert normalize_condition_text("  Type-2   Diabetes!! ") == "type-2 diabetes"
+
+
+def test_memory_lru_eviction():
+    cache = PlanCache(Plan, max_entries=2)
+    cache.put("a", Plan(terms=["a"]))
+    cache.put("b", Plan(terms=["b"]))
+    cache.get("a")
+    cache.put("c", Plan(terms=["c"]))
+
+    assert cache.get("b") is None
+    assert cache.get("a").terms == ["a"]
+    assert cache.get("c").terms == ["c"]
+
+
+def test_plans_survive_restart_through_disk(tmp_path):
+    path = str(tmp_path / "plans.sqlite3")
+    PlanCache(Plan, path=path).put("diabetes", Plan(terms=["E11"]))
+
+    reopened = PlanCache(Plan, path=path)
+
+    assert reopened.get("diabetes").terms == ["E11"]
+    assert reopened.stats()["disk_hits"] == 1
+
+
+def test_expired_plans_are_misses(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("src.agents.fhir_agent.plan_cache.time.time", lambda: now[0])
+    cache = PlanCache(Plan, path=str(tmp_path / "plans.sqlite3"), ttl=60)
+    cache.put("diabetes", Plan(terms=["E11"]))
+
+    now[0] += 61
+
+    assert cache.get("diabetes") is None
+
+
+def test_returned_plans_are_copies():
+    cache = PlanCache(Plan)
+    cache.put("diabetes", Plan(terms=["E11"]))
+    cache.get("diabetes").terms.append("changed")
+
+    assert cache.get("diabetes").terms == ["E11"]
+
+
+async def test_concurrent_callers_share_one_planner_call():
+    cache = PlanCache(Plan)
+    calls = 0
+
+    async def planner(text):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return Plan(terms=[text])
+
+    plans = await asyncio.gather(
+        *(cache.get_or_plan("Diabetes", planner) for _ in range(5))
+    )
+
+    assert calls == 1
+    assert all(plan.terms == ["Diabetes"] for plan in plans)
+    assert cache.stats()["shared_calls"] == 4
+    assert (await cache.get_or_plan("diabetes.", planner)).terms == ["Diabetes"]
+    assert calls == 1
+
+
+async def test_planner_failures_are_not_cached():
+    cache = PlanCache(Plan)
+
+    async def failing(text):
+        raise RuntimeError("LLM unavailable")
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_plan("diabetes", failing)
+
+    async def planner(text):
+        return Plan(terms=["E11"])
+
+    assert (await cache.get_or_plan("diabetes", planner)).terms == ["E11"]
+
+
+async def test_cancelling_the_planning_caller_does_not_cancel_waiters():
+    cache = PlanCache(Plan)
+    calls = 0
+
+    async def planner(text):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05 if calls == 1 else 0)
+        return Plan(terms=[text])
+
+    owner = asyncio.create_task(cache.get_or_plan("diabetes", planner))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.get_or_plan("diabetes", planner))
+    await asyncio.sleep(0)
+    owner.cancel()
+
+    assert (await waiter).terms == ["diabetes"]
+    assert owner.cancelled()
+    assert calls == 2
@@ -0,0 +1,79 @@
+"""Integration tests for ``PostgresTaskStore``; set ``TASK_STORE_DSN`` to run them."""
+
+import os
+import uuid
+
+import pytest
+from a2a.types import Task, TaskState, TaskStatus
+
+pytest.importorskip("asyncpg")
+
+from src.agents.common.postgres_task_store import PostgresTaskStore  # noqa: E402
+
+DSN = os.getenv("TASK_STORE_DSN")
+
+pytestmark = pytest.mark.skipif(not DSN, reason="TASK_STORE_DSN is not set")
+
+
+def make_task(task_id: str, state=TaskState.working, context_id="ctx") -> Task:
+    return Task(id=task_id, context_id=context_id, status=TaskStatus(state=state))
+
+
+@pytest.fixture
+async def store():
+    table = f"a2a_tasks_test_{uuid.uuid4().hex[:8]}"
+    store = PostgresTaskStore(DSN, table=table, flush_interval=60)
+    await store.start()
+    yield store
+    store._pending.clear()
+    await store._pool.execute(f"DROP TABLE IF EXISTS {table}")
+    await store.aclose()
+
+
+async def test_save_and_get_round_trip(store):
+    await store.save(make_task("t1", TaskState.submitted))
+
+    assert (await store.get("t1")).status.state == TaskState.submitted
+    assert await store.get("missing") is None
+
+
+async def test_working_updates_are_buffered_until_flush(store):
+    await store.save(make_task("t1", TaskState.submitted))
+    await store.save(make_task("t1"))
+
+    # Visible in this process at once, in the table after the flush.
+    assert (await store.get("t1")).status.state == TaskState.working
+    assert (
+        await store._pool.fetchval(f"SELECT state FROM {store.table} WHERE id = 't1'")
+        == TaskState.submitted.value
+    )
+    assert await store.flush() == 1
+    assert (
+        await store._pool.fetchval(f"SELECT state FROM {store.table} WHERE id = 't1'")
+        == TaskState.working.value
+    )
+
+
+async def test_list_context_returns_the_conversation_oldest_first(store):
+    await store.save(make_task("t1", TaskState.completed, context_id="c1"))
+    await store.save(make_task("t2", context_id="c1"))
+    await store.save(make_task("t3", TaskState.completed, context_id="c2"))
+
+    tasks = await store.list_context("c1")
+
+    assert [task.id for task in tasks] == ["t1", "t2"]
+
+
+async def test_late_batch_does_not_undo_a_newer_write_through(store):
+    await store.save(make_task("t1"))
+    # The batch is taken for executemany before the next update arrives ...
+    late_batch = dict(store._pending)
+    store._pending.clear()
+    await store.save(make_task("t1", TaskState.input_required))
+    # ... and lands after it.
+    await store._pool.executemany(
+        store._batch_sql,
+        [store._row(task, version) for task, version in late_batch.values()],
+    )
+
+    assert (await store.get("t1")).status.state == TaskState.input_required
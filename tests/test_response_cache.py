@@ -0,0 +1,188 @@
+import asyncio
+
+import httpx
+import pytest
+from a2a.server.apps import A2AStarletteApplication
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore
+from a2a.types import AgentCard
+from pydantic_ai import Agent
+from pydantic_ai.models.test import TestModel
+
+from src.agents.common import response_cache as response_cache_module
+from src.agents.common.agent_executor import PydanticAgentExecutor
+from src.agents.common.response_cache import (
+    ResponseCache,
+    RunScope,
+    data_version,
+    note_write,
+    record_writes,
+    run_scope,
+)
+from src.agents.common.tool_client import A2AToolClient
+
+FHIR_URL = "http://fhir-agent"
+ORCHESTRATOR_URL = "http://orchestrator"
+
+
+def test_make_key_normalizes_the_query():
+    assert ResponseCache.make_key("FHIR", "Find patients  with Diabetes?") == (
+        ResponseCache.make_key("FHIR", "find patients with diabetes")
+    )
+
+
+def test_lru_eviction():
+    cache = ResponseCache(max_entries=2)
+    keys = [ResponseCache.make_key("agent", f"query {i}") for i in range(3)]
+    cache.put(keys[0], "0")
+    cache.put(keys[1], "1")
+    cache.get(keys[0])  # most recently used now
+    cache.put(keys[2], "2")
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == "0"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_entries_are_dropped(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache_module.time, "monotonic", lambda: now[0])
+    cache = ResponseCache(ttl=10.0)
+    key = ResponseCache.make_key("agent", "query")
+    cache.put(key, "answer")
+
+    now[0] += 11
+    assert cache.get(key) is None
+
+
+async def test_record_writes_notes_only_write_tools():
+    hook = record_writes({"write_resource"})
+
+    async def call_tool(name, tool_args, metadata):
+        return {"called": name}
+
+    version = data_version()
+    with run_scope(RunScope()) as scope:
+        await hook(None, call_tool, "find_patient", {})
+        assert not scope.wrote_data and data_version() == version
+        assert await hook(None, call_tool, "write_resource", {}) == {
+            "called": "write_resource"
+        }
+
+    assert scope.wrote_data
+    assert data_version() != version
+
+
+def agent_app(agent: Agent, url: str, streaming: bool, cache=None):
+    card = AgentCard(
+        name=agent.name,
+        description=f"{agent.name} used by the response cache tests",
+        url=f"{url}/",
+        version="1.0.0",
+        defaultInputModes=["text"],
+        defaultOutputModes=["text"],
+        capabilities={"streaming": streaming},
+        skills=[],
+    )
+    executor = PydanticAgentExecutor(agent, response_cache=cache)
+    app = A2AStarletteApplication(
+        agent_card=card,
+        http_handler=DefaultRequestHandler(executor, InMemoryTaskStore()),
+    ).build()
+    return app, card.model_dump(mode="json", exclude_none=True)
+
+
+def connect(client: A2AToolClient, url: str, app, card: dict) -> None:
+    client._clients_loop = asyncio.get_running_loop()
+    client._http_clients[url] = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url=url
+    )
+    client._agent_info_cache[url] = card
+
+
+async def ask_orchestrator(fhir_tool: str, streaming: bool, cache: ResponseCache):
+    """Ask the orchestrator the same question twice; returns the FHIR agent's runs."""
+    fhir_runs = []
+    fhir_agent = Agent(
+        TestModel(call_tools=[fhir_tool], custom_output_text="patient 1 takes aspirin"),
+        name="FHIR Agent",
+    )
+
+    @fhir_agent.tool_plain
+    def find_patient() -> str:
+        fhir_runs.append("read")
+        return "aspirin"
+
+    @fhir_agent.tool_plain
+    def write_resource() -> str:
+        # What the MCP record_writes hook does when the agent calls a write tool.
+        fhir_runs.append("write")
+        note_write()
+        return "written"
+
+    delegate_client = A2AToolClient()
+    connect(delegate_client, FHIR_URL, *agent_app(fhir_agent, FHIR_URL, streaming))
+
+    orchestrator = Agent(
+        TestModel(call_tools=["delegate"], custom_output_text="aspirin"),
+        name="Orchestrator",
+    )
+
+    @orchestrator.tool_plain
+    async def delegate(query: str) -> str:
+        task = await delegate_client.create_task(FHIR_URL, query)
+        return task.artifacts[0].parts[0].text
+
+    caller = A2AToolClient()
+    connect(
+        caller,
+        ORCHESTRATOR_URL,
+        *agent_app(orchestrator, ORCHESTRATOR_URL, streaming=True, cache=cache),
+    )
+    for _ in range(2):
+        task = await caller.create_task(ORCHESTRATOR_URL, "What does patient 1 take?")
+        assert task.status == "completed"
+    return fhir_runs
+
+
+async def test_read_only_delegation_is_cached_and_keeps_other_entries():
+    cache = ResponseCache()
+    cache.put(ResponseCache.make_key("Triage Agent", "other question"), "other answer")
+
+    fhir_runs = await ask_orchestrator("find_patient", streaming=True, cache=cache)
+
+    # The repeat was answered from the cache without reaching the FHIR agent.
+    assert fhir_runs == ["read"]
+    assert (
+        cache.get(ResponseCache.make_key("Orchestrator", "what does patient 1 take"))
+        == "aspirin"
+    )
+    assert (
+        cache.get(ResponseCache.make_key("Triage Agent", "other question"))
+        == "other answer"
+    )
+
+
+@pytest.mark.parametrize("streaming", [True, False])
+async def test_delegation_that_wrote_is_not_cached(monkeypatch, streaming):
+    # Without version bumps, only the FHIR agent's report keeps the answer out.
+    bumps = []
+    monkeypatch.setattr(
+        response_cache_module, "bump_data_version", lambda: bumps.append(1)
+    )
+    cache = ResponseCache()
+
+    fhir_runs = await ask_orchestrator("write_resource", streaming, cache)
+
+    assert fhir_runs == ["write", "write"]
+    assert cache.stats()["hits"] == 0
+    assert bumps
+
+
+async def test_write_invalidates_other_entries():
+    cache = ResponseCache()
+    cache.put(ResponseCache.make_key("Triage Agent", "other question"), "other answer")
+
+    await ask_orchestrator("write_resource", streaming=True, cache=cache)
+
+    assert cache.get(ResponseCache.make_key("Triage Agent", "other question")) is None
@@ -0,0 +1,82 @@
+import httpx
+from a2a.types import Artifact, Part, Task, TaskState, TaskStatus, TextPart
+from pydantic_ai import Agent
+from pydantic_ai.models.test import TestModel
+
+from src.agents.common.server import create_agent_a2a_server
+from src.agents.common.task_store import BoundedTaskStore
+
+
+def make_task(task_id: str, state=TaskState.working, text: str = "") -> Task:
+    artifacts = [Artifact(artifact_id="a", parts=[Part(root=TextPart(text=text))])]
+    return Task(
+        id=task_id,
+        context_id="ctx",
+        status=TaskStatus(state=state),
+        artifacts=artifacts if text else None,
+    )
+
+
+async def test_finished_tasks_are_evicted_before_active_ones():
+    store = BoundedTaskStore(max_tasks=2)
+    await store.save(make_task("done", TaskState.completed))
+    await store.save(make_task("active"))
+    await store.save(make_task("new"))
+
+    assert await store.get("done") is None
+    assert await store.get("active") is not None
+    assert await store.get("new") is not None
+    assert store.evictions == 1
+
+
+async def test_least_recently_used_task_is_evicted():
+    store = BoundedTaskStore(max_tasks=2)
+    await store.save(make_task("a", TaskState.completed))
+    await store.save(make_task("b", TaskState.completed))
+    await store.get("a")
+    await store.save(make_task("c", TaskState.completed))
+
+    assert await store.get("b") is None
+    assert await store.get("a") is not None
+
+
+async def test_byte_limit_evicts_but_keeps_the_task_being_saved():
+    store = BoundedTaskStore(max_bytes=1000)
+    await store.save(make_task("small", TaskState.completed))
+    await store.save(make_task("large", TaskState.completed, text="x" * 2000))
+
+    assert await store.get("small") is None
+    assert await store.get("large") is not None
+
+
+async def test_finished_tasks_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("src.agents.common.task_store.time.monotonic", lambda: now[0])
+    store = BoundedTaskStore(ttl=60)
+    await store.save(make_task("done", TaskState.completed))
+    await store.save(make_task("active"))
+
+    now[0] += 61
+
+    assert await store.get("done") is None
+    assert await store.get("active") is not None
+    assert store.expirations == 1
+
+
+async def test_readyz_reports_task_store_stats():
+    app = create_agent_a2a_server(
+        agent=Agent(TestModel(), name="Test Agent"),
+        name="Test Agent",
+        description="Agent used by the task store tests",
+        skills=[],
+    )
+    await app.task_store.save(make_task("t1", TaskState.completed))
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app.build()), base_url="http://agent"
+    ) as client:
+        response = await client.get("/readyz")
+
+    stats = response.json()["task_store"]
+    assert stats["tasks"] == 1
+    assert stats["evictions"] == 0 and stats["expirations"] == 0
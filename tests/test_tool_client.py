@@ -0,0 +1,171 @@
+import asyncio
+import json
+import threading
+
+import httpx
+import pytest
+from a2a.server.agent_execution import AgentExecutor, RequestContext
+from a2a.server.apps import A2AStarletteApplication
+from a2a.server.events import EventQueue
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore, TaskUpdater
+from a2a.types import AgentCard, Part, TextPart
+from a2a.utils import new_task
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from src.agents.common.admission import (
+    AdmissionController,
+    AdmissionControlMiddleware,
+    AgentBusyError,
+)
+from src.agents.common.tool_client import A2AToolClient
+from src.core.config import settings
+
+AGENT_URL = "http://agent"
+
+AGENT_CARD = {
+    "name": "Test Agent",
+    "description": "Agent used by the tool client tests",
+    "url": f"{AGENT_URL}/",
+    "version": "1.0.0",
+    "defaultInputModes": ["text"],
+    "defaultOutputModes": ["text"],
+    "capabilities": {"streaming": True},
+    "skills": [],
+}
+
+
+def connect(client: A2AToolClient, app) -> None:
+    """Route the client's requests for ``AGENT_URL`` to an ASGI app."""
+    client._clients_loop = asyncio.get_running_loop()
+    client._http_clients[AGENT_URL] = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url=AGENT_URL
+    )
+    client._agent_info_cache[AGENT_URL] = AGENT_CARD
+
+
+def sse_app(status_code: int, payload: dict) -> Starlette:
+    async def endpoint(request: Request) -> Response:
+        body = await request.json()
+        return Response(
+            f"data: {json.dumps({**payload, 'id': body['id']})}\n\n",
+            status_code=status_code,
+            media_type="text/event-stream",
+        )
+
+    return Starlette(routes=[Route("/", endpoint, methods=["POST"])])
+
+
+async def collect(client: A2AToolClient) -> list:
+    return [event async for event in client.stream_task(AGENT_URL, "hello")]
+
+
+async def test_stream_task_yields_jsonrpc_error_as_final_event():
+    error = {"jsonrpc": "2.0", "error": {"code": -32001, "message": "Task not found"}}
+    client = A2AToolClient()
+    connect(client, sse_app(200, error))
+
+    events = await collect(client)
+
+    assert len(events) == 1
+    assert events[0].kind == "error"
+    assert events[0].text == "Task not found"
+    assert events[0].final
+
+
+async def test_stream_task_yields_http_error_as_final_event():
+    client = A2AToolClient()
+    connect(client, sse_app(500, {}))
+
+    events = await collect(client)
+
+    assert [(e.kind, e.final) for e in events] == [("error", True)]
+    assert "500" in events[0].text
+
+
+class EchoExecutor(AgentExecutor):
+    async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
+        task = context.current_task or new_task(context.message)
+        await event_queue.enqueue_event(task)
+        updater = TaskUpdater(event_queue, task.id, task.context_id)
+        await updater.add_artifact(
+            [Part(root=TextPart(text=f"echo: {context.get_user_input()}"))]
+        )
+        await updater.complete()
+
+    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
+        raise NotImplementedError
+
+
+def saturated_agent(controller: AdmissionController) -> Starlette:
+    return A2AStarletteApplication(
+        agent_card=AgentCard(**AGENT_CARD),
+        http_handler=DefaultRequestHandler(EchoExecutor(), InMemoryTaskStore()),
+    ).build(middleware=[Middleware(AdmissionControlMiddleware, controller=controller)])
+
+
+async def test_create_task_retries_busy_streaming_agent(monkeypatch):
+    monkeypatch.setattr(settings, "a2a_busy_max_retries", 2)
+    monkeypatch.setattr(settings, "a2a_busy_backoff", 0.01)
+    controller = AdmissionController(max_concurrent=1, max_queue=0)
+    client = A2AToolClient()
+    connect(client, saturated_agent(controller))
+
+    held = asyncio.Event()
+
+    async def hold_slot():
+        async with controller.admit():
+            held.set()
+            await asyncio.sleep(0.2)
+
+    holder = asyncio.create_task(hold_slot())
+    await held.wait()
+    result = await client.create_task(AGENT_URL, "hello")
+    await holder
+
+    assert result.status == "completed"
+    assert result.artifacts[0].parts[0].text == "echo: hello"
+    assert controller.rejected == 1
+
+
+async def test_create_task_gives_up_after_max_retries(monkeypatch):
+    monkeypatch.setattr(settings, "a2a_busy_max_retries", 0)
+    controller = AdmissionController(max_concurrent=1, max_queue=0)
+    client = A2AToolClient()
+    connect(client, saturated_agent(controller))
+
+    async with controller.admit():
+        with pytest.raises(AgentBusyError) as busy:
+            await client.create_task(AGENT_URL, "hello")
+
+    assert busy.value.retry_after >= 1
+
+
+async def test_pools_of_another_running_loop_are_closed_on_that_loop():
+    other_loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=other_loop.run_forever, daemon=True)
+    thread.start()
+    client = A2AToolClient()
+
+    async def open_pool():
+        return client._get_http_client(AGENT_URL)
+
+    try:
+        old_pool = asyncio.run_coroutine_threadsafe(open_pool(), other_loop).result()
+        new_pool = client._get_http_client(AGENT_URL)
+        for _ in range(50):
+            if old_pool.is_closed:
+                break
+            await asyncio.sleep(0.01)
+
+        assert old_pool.is_closed
+        assert new_pool is not old_pool and not new_pool.is_closed
+    finally:
+        await client.aclose()
+        other_loop.call_soon_threadsafe(other_loop.stop)
+        thread.join()
+        other_loop.close()
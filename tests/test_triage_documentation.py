@@ -0,0 +1,134 @@
+import httpx
+import pytest
+
+from src.mcp_handler import triage_mcp_server
+from src.mcp_handler.fhir_client import FHIRClient
+from src.mcp_handler.triage_mcp_server import SymptomObservation, document_triage
+
+
+class FakeFHIRClient:
+    def __init__(self, response):
+        self.response = response
+        self.posted = []
+
+    async def post(self, path, body):
+        self.posted.append((path, body))
+        return self.response
+
+
+def use_fhir_response(monkeypatch, response) -> FakeFHIRClient:
+    client = FakeFHIRClient(response)
+    monkeypatch.setattr(triage_mcp_server, "get_fhir_client", lambda: client)
+    return client
+
+
+async def triage(symptoms=("Fever",)):
+    return await document_triage(
+        first_name="Jane",
+        last_name="Doe",
+        birth_date="1980-01-01",
+        gender="female",
+        symptoms=[SymptomObservation(code_text=text) for text in symptoms],
+    )
+
+
+async def test_transaction_response_is_summarized(monkeypatch):
+    use_fhir_response(
+        monkeypatch,
+        {
+            "resourceType": "Bundle",
+            "type": "transaction-response",
+            "entry": [
+                {
+                    "response": {
+                        "status": "201 Created",
+                        "location": "Patient/p1/_history/1",
+                    }
+                },
+                {
+                    "response": {
+                        "status": "201 Created",
+                        "location": "Encounter/e1/_history/1",
+                    }
+                },
+                {"response": {"status": "201 Created", "location": "Observation/o1"}},
+            ],
+        },
+    )
+
+    assert await triage() == {
+        "patient_id": "p1",
+        "patient_created": True,
+        "encounter_id": "e1",
+        "observation_ids": ["o1"],
+    }
+
+
+async def test_operation_outcome_is_reported_as_error(monkeypatch):
+    use_fhir_response(
+        monkeypatch,
+        {
+            "resourceType": "OperationOutcome",
+            "issue": [
+                {"severity": "error", "code": "invalid", "diagnostics": "Bad date"}
+            ],
+        },
+    )
+
+    assert await triage() == {
+        "error": "FHIR transaction failed",
+        "issues": ["Bad date"],
+    }
+
+
+@pytest.mark.parametrize("entries", [[], [{"response": {"location": "Patient/p1"}}]])
+async def test_partial_response_is_reported_as_error(monkeypatch, entries):
+    use_fhir_response(monkeypatch, {"resourceType": "Bundle", "entry": entries})
+
+    result = await triage()
+
+    assert result["error"] == f"FHIR transaction returned {len(entries)} of 3 entries"
+
+
+@pytest.mark.parametrize(
+    "status_code, body, expected",
+    [
+        (
+            422,
+            {
+                "resourceType": "OperationOutcome",
+                "issue": [
+                    {
+                        "severity": "error",
+                        "code": "processing",
+                        "diagnostics": "Encounter.status is required",
+                    }
+                ],
+            },
+            {
+                "error": "FHIR transaction failed",
+                "issues": ["Encounter.status is required"],
+            },
+        ),
+        (
+            502,
+            "Bad gateway",
+            {"error": "FHIR transaction failed with HTTP 502", "issues": []},
+        ),
+    ],
+)
+async def test_rejected_transaction_is_reported_as_error(
+    monkeypatch, status_code, body, expected
+):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if isinstance(body, dict):
+            return httpx.Response(status_code, json=body)
+        return httpx.Response(status_code, text=body)
+
+    client = FHIRClient(base_url="http://fhir")
+    client._client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), base_url="http://fhir/"
+    )
+    monkeypatch.setattr(triage_mcp_server, "get_fhir_client", lambda: client)
+
+    assert await triage() == expected
@@ -0,0 +1,151 @@
+import asyncio
+import itertools
+from typing import Optional
+
+import httpx
+import pytest
+
+from src.mcp_handler import write_queue as write_queue_module
+from src.mcp_handler.write_queue import WriteBehindQueue
+
+
+class FakeFHIRServer:
+    """Answers batch Bundles with conditional-create semantics.
+
+    The first ``fail_times`` posts fail with a transport error; with
+    ``reject_status`` set, posts are rejected with that HTTP status; with
+    ``lose_response`` set, the next post is processed but its response lost.
+    """
+
+    def __init__(self):
+        self.fail_times = 0
+        self.reject_status: Optional[int] = None
+        self.lose_response = False
+        self.batches: list[dict] = []
+        self.created: dict[str, str] = {}  # ifNoneExist condition -> server ID
+        self._ids = itertools.count(1)
+
+    async def post(self, path, bundle):
+        assert path == ""
+        if self.fail_times:
+            self.fail_times -= 1
+            raise httpx.ConnectError("FHIR server unreachable")
+        if self.reject_status is not None:
+            request = httpx.Request("POST", "http://fhir/")
+            response = httpx.Response(self.reject_status, request=request)
+            raise httpx.HTTPStatusError(
+                f"HTTP {self.reject_status}", request=request, response=response
+            )
+        self.batches.append(bundle)
+        entries = []
+        for entry in bundle["entry"]:
+            condition = entry["request"]["ifNoneExist"]
+            status = "200 OK" if condition in self.created else "201 Created"
+            server_id = self.created.setdefault(condition, str(next(self._ids)))
+            location = f"{entry['request']['url']}/{server_id}/_history/1"
+            entries.append({"response": {"status": status, "location": location}})
+        if self.lose_response:
+            self.lose_response = False
+            raise httpx.ReadTimeout("response lost")
+        return {"resourceType": "Bundle", "type": "batch-response", "entry": entries}
+
+
+@pytest.fixture
+def fhir(monkeypatch) -> FakeFHIRServer:
+    server = FakeFHIRServer()
+    monkeypatch.setattr(write_queue_module, "get_fhir_client", lambda: server)
+    return server
+
+
+@pytest.fixture
+def queue(tmp_path) -> WriteBehindQueue:
+    queue = WriteBehindQueue("test", path=str(tmp_path / "writes.sqlite3"))
+    # The tests flush explicitly instead of through the background worker.
+    queue._ensure_worker = lambda: None
+    return queue
+
+
+def sent_types(fhir: FakeFHIRServer) -> list[list[str]]:
+    return [[e["request"]["url"] for e in batch["entry"]] for batch in fhir.batches]
+
+
+async def flush_all(queue: WriteBehindQueue) -> None:
+    while await queue.flush():
+        pass
+
+
+async def test_dependent_writes_follow_the_patient_with_server_ids(queue, fhir):
+    patient = await queue.enqueue("Patient", {"name": [{"family": "Doe"}]})
+    reference = f"Patient/{patient['id']}"
+    await queue.enqueue(
+        "Encounter", {"subject": {"reference": reference}}, patient["id"]
+    )
+    await queue.enqueue(
+        "Observation", {"subject": {"reference": reference}}, patient["id"]
+    )
+    await queue.enqueue("Patient", {"name": [{"family": "Roe"}]})
+
+    await flush_all(queue)
+
+    # One write per patient per batch, in the order they were made.
+    assert sent_types(fhir) == [["Patient", "Patient"], ["Encounter"], ["Observation"]]
+    encounter = fhir.batches[1]["entry"][0]["resource"]
+    assert encounter["subject"]["reference"] == "Patient/1"
+    assert await queue.resolve_id(patient["id"]) == "1"
+
+
+async def test_write_in_backoff_holds_back_later_writes_for_the_patient(queue, fhir):
+    first = await queue.enqueue("Observation", {"code": {"text": "first"}}, "p1")
+    fhir.fail_times = 1
+    await queue.flush()  # the first write fails and backs off
+    await queue.enqueue("Observation", {"code": {"text": "second"}}, "p1")
+    await queue.enqueue("Observation", {"code": {"text": "other"}}, "p2")
+
+    await flush_all(queue)
+
+    # Only the other patient's write went out; p1's second write waits.
+    assert [
+        [e["resource"]["code"]["text"] for e in b["entry"]] for b in fhir.batches
+    ] == [["other"]]
+    assert (await queue.status(first["id"]))["status"] == "pending"
+
+
+async def test_retried_write_is_sent_with_the_same_idempotency_condition(queue, fhir):
+    await queue.enqueue("Observation", {"code": {"text": "fever"}}, "p1")
+    fhir.lose_response = True
+    await queue.flush()  # created on the server, but the queue never heard back
+    queue._execute("UPDATE writes SET next_attempt_at = 0")
+
+    await flush_all(queue)
+
+    conditions = [b["entry"][0]["request"]["ifNoneExist"] for b in fhir.batches]
+    assert len(conditions) == 2 and conditions[0] == conditions[1]
+    assert len(fhir.created) == 1
+    assert (await queue.status())["done"] == 1
+
+
+async def test_lifespan_flushes_writes_left_by_an_earlier_run(queue, fhir):
+    await queue.enqueue("Observation", {"code": {"text": "fever"}}, "p1")
+
+    reopened = WriteBehindQueue("test", path=queue.path, flush_interval=0.05)
+    async with reopened.lifespan(None):
+        for _ in range(50):
+            if (await reopened.status())["done"]:
+                break
+            await asyncio.sleep(0.02)
+
+    assert (await reopened.status())["done"] == 1
+
+
+@pytest.mark.parametrize("status_code, expected", [(422, "failed"), (503, "pending")])
+async def test_rejected_batch_fails_unless_retryable(
+    queue, fhir, status_code, expected
+):
+    write = await queue.enqueue("Observation", {"code": {"text": "fever"}}, "p1")
+    fhir.reject_status = status_code
+
+    await queue.flush()
+
+    status = await queue.status(write["id"])
+    assert status["status"] == expected
+    assert str(status_code) in status["last_error"]